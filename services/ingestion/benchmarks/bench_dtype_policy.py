@@ -0,0 +1,66 @@
+"""Compare peak RSS and frame memory of the equities fetch/transform with and without dtype compaction.
+
+Usage::
+
+    python benchmarks/bench_dtype_policy.py --symbols 2000 --years 5
+
+Each mode runs in a fresh interpreter against the synthetic market (no
+``POLYGON_API_KEY``), so peak RSS is not polluted by the other run.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+_CHILD = """
+import json, resource, sys
+from datetime import datetime, timedelta
+sys.path.append({src!r})
+from ingestion.flows import fetch_equity_prices, transform_equity_prices
+from ingestion.metrics import frame_bytes
+from ingestion.synthetic import universe
+
+end = datetime(2024, 12, 31)
+raw = fetch_equity_prices.fn(universe({symbols}), start=end - timedelta(days=365 * {years}), end=end)
+curated = transform_equity_prices.fn(raw)
+print(json.dumps({{
+    "rows": len(raw),
+    "raw_bytes": frame_bytes(raw, deep=True),
+    "curated_bytes": frame_bytes(curated, deep=True),
+    "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+}}))
+"""
+
+
+def run(compact: bool, symbols: int, years: int) -> dict:
+    env = {**os.environ, "INGESTION_COMPACT_DTYPES": "true" if compact else "false"}
+    env.pop("POLYGON_API_KEY", None)
+    code = _CHILD.format(src=str(SRC), symbols=symbols, years=years)
+    output = subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=2_000)
+    parser.add_argument("--years", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {mode: run(mode == "compact", args.symbols, args.years) for mode in ("wide", "compact")}
+    for mode, result in results.items():
+        print(
+            f"{mode:<8} rows={result['rows']:>10,} raw_mb={result['raw_bytes'] / 2**20:8.1f} "
+            f"curated_mb={result['curated_bytes'] / 2**20:8.1f} peak_rss_mb={result['peak_rss_bytes'] / 2**20:8.1f}"
+        )
+    wide, compact = results["wide"], results["compact"]
+    print(f"peak RSS reduction: {1 - compact['peak_rss_bytes'] / wide['peak_rss_bytes']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
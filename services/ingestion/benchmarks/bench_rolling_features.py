@@ -0,0 +1,73 @@
+"""Compare the vectorized rolling-feature engine with the legacy groupby/lambda transform.
+
+Usage::
+
+    python benchmarks/bench_rolling_features.py --symbols 10000 --years 5 --windows 5 20 60 252
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from ingestion.features import equity_rolling_features  # noqa: E402
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def synthetic_bars(symbols: int, years: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    bars = years * TRADING_DAYS_PER_YEAR
+    rows = symbols * bars
+    returns = rng.normal(0.0, 0.02, rows)
+    return pd.DataFrame(
+        {
+            "symbol": np.repeat([f"SYM{idx:05d}" for idx in range(symbols)], bars),
+            "close": 100 * np.exp(returns.reshape(symbols, bars).cumsum(axis=1)).ravel(),
+            "volume": rng.integers(1_000_000, 1_050_000, rows).astype(np.float64),
+        }
+    )
+
+
+def legacy(frame: pd.DataFrame, windows: list[int]) -> None:
+    out = frame.copy()
+    out["return_1d"] = out.groupby("symbol")["close"].pct_change()
+    for window in windows:
+        out[f"volume_ma_{window}"] = out.groupby("symbol")["volume"].transform(
+            lambda s: s.rolling(window=window, min_periods=1).mean()
+        )
+        out[f"volatility_{window}d"] = out.groupby("symbol")["return_1d"].transform(
+            lambda s: s.rolling(window=window, min_periods=1).std()
+        )
+
+
+def vectorized(frame: pd.DataFrame, windows: list[int]) -> None:
+    equity_rolling_features(frame["symbol"], frame["close"], frame["volume"], windows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=10_000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--windows", type=int, nargs="+", default=[5, 20, 60, 252])
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    frame = synthetic_bars(args.symbols, args.years)
+    print(f"rows={len(frame):,} symbols={args.symbols:,} windows={args.windows}")
+    runners = [("vectorized", vectorized)] if args.skip_legacy else [("legacy", legacy), ("vectorized", vectorized)]
+    for name, runner in runners:
+        started = time.perf_counter()
+        runner(frame, args.windows)
+        elapsed = time.perf_counter() - started
+        print(f"{name:<11} seconds={elapsed:8.2f} rows/sec={len(frame) / elapsed:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
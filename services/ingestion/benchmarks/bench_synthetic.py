@@ -0,0 +1,47 @@
+"""Time synthetic universe generation for offline load tests.
+
+Usage::
+
+    python benchmarks/bench_synthetic.py --symbols 10000 --years 20 --seed 7
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from ingestion.synthetic import SyntheticMarket, universe  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=10_000)
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--batch-symbols", type=int, default=500)
+    args = parser.parse_args()
+
+    market = SyntheticMarket(seed=args.seed)
+    symbols = universe(args.symbols)
+    end = datetime(2024, 12, 31)
+    start = end - timedelta(days=365 * args.years)
+
+    started = time.perf_counter()
+    rows = 0
+    for batch in market.iter_equity_bars(symbols, start, end, batch_symbols=args.batch_symbols):
+        rows += len(batch)
+    bars_elapsed = time.perf_counter() - started
+    print(f"equity_bars rows={rows:,} seconds={bars_elapsed:6.2f} rows/sec={rows / bars_elapsed:>14,.0f}")
+
+    started = time.perf_counter()
+    news = market.news(symbols, articles_per_symbol=20)
+    insider = market.insider_activity(symbols)
+    print(f"news+insider rows={len(news) + len(insider):,} seconds={time.perf_counter() - started:6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""Compare the fused transform plans with the previous per-dataset pandas transforms.
+
+Usage::
+
+    python benchmarks/bench_transform_plans.py --symbols 5000 --days 500
+
+Every dataset is generated synthetically at scale, transformed by the legacy
+function and by its plan, checked for equal output, and timed. ``--report``
+prints each plan's per-step timings.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from ingestion.dtypes import compact_frame  # noqa: E402
+from ingestion.features import equity_rolling_features  # noqa: E402
+from ingestion.synthetic import SyntheticMarket, universe  # noqa: E402
+from ingestion.transforms import (  # noqa: E402
+    FUNDAMENTALS_PLAN,
+    INSIDER_PLAN,
+    MACRO_PLAN,
+    NEWS_PLAN,
+    NEWS_TOTALS_PLAN,
+    TransformPlan,
+    equity_price_plan,
+)
+
+WINDOWS = (5, 20)
+
+
+def legacy_equities(raw_df: pd.DataFrame) -> pd.DataFrame:
+    features = equity_rolling_features(raw_df["symbol"], raw_df["close"], raw_df["volume"], WINDOWS)
+    curated = raw_df[["symbol", "ts", "close"]].assign(ts=pd.to_datetime(raw_df["ts"]), **features)
+    curated = compact_frame(curated, "equity_price_factors")
+    return curated.loc[curated["return_1d"].notna()]
+
+
+def legacy_fundamentals(raw_df: pd.DataFrame) -> pd.DataFrame:
+    df = raw_df.loc[raw_df["metric"] == "revenue", ["symbol", "period_end", "value"]]
+    df = df.assign(period_end=pd.to_datetime(df["period_end"])).sort_values(["symbol", "period_end"])
+    growth = df.groupby("symbol", observed=True)["value"].pct_change()
+    df = df.assign(
+        revenue_growth=growth,
+        margin_score=growth.fillna(0).clip(-1, 1),
+        quality_rank=df.groupby("period_end")["value"].rank(ascending=False),
+    )
+    curated = df.loc[growth.notna()].rename(columns={"period_end": "as_of", "value": "revenue"})
+    return compact_frame(curated, "fundamental_quality")
+
+
+def legacy_news(raw_df: pd.DataFrame) -> pd.DataFrame:
+    aggregated = (
+        raw_df.groupby("symbol", observed=True)
+        .agg(
+            avg_sentiment=("sentiment", "mean"),
+            article_count=("headline", "count"),
+            avg_relevance=("relevance", "mean"),
+        )
+        .reset_index()
+    )
+    aggregated["as_of"] = pd.to_datetime(raw_df["event_time"]).max()
+    columns = ["symbol", "avg_sentiment", "article_count", "avg_relevance", "as_of"]
+    return compact_frame(aggregated[columns], "news_sentiment_signals")
+
+
+def legacy_news_totals(raw_df: pd.DataFrame) -> pd.DataFrame:
+    # The same per-symbol sums and counts through a pandas groupby.
+    event_time = pd.to_datetime(raw_df["event_time"], utc=True).dt.tz_localize(None)
+    return (
+        raw_df.assign(event_time=event_time)
+        .groupby("symbol", observed=True)
+        .agg(
+            article_count=("headline", "count"),
+            sentiment_sum=("sentiment", "sum"),
+            sentiment_count=("sentiment", "count"),
+            relevance_sum=("relevance", "sum"),
+            relevance_count=("relevance", "count"),
+            last_event_time=("event_time", "max"),
+        )
+        .reset_index()
+    )
+
+
+def legacy_macro(raw_df: pd.DataFrame) -> pd.DataFrame:
+    df = raw_df.assign(as_of=pd.to_datetime(raw_df["as_of"]))
+    pivot = df.pivot_table(index="as_of", columns="indicator", values="value", observed=True)
+    pivot.reset_index(inplace=True)
+    pivot["regime"] = pivot.apply(
+        lambda row: "expansion" if row.get("gdp_growth", 0) > 2 and row.get("inflation", 0) < 3 else "slowdown",
+        axis=1,
+    )
+    return compact_frame(pivot, "macro_regime_signals")
+
+
+def legacy_insider(raw_df: pd.DataFrame) -> pd.DataFrame:
+    df = raw_df.assign(transaction_date=pd.to_datetime(raw_df["transaction_date"]))
+    grouped = (
+        df.groupby(["symbol", "transaction_type"], observed=True)
+        .agg(
+            total_shares=("shares", "sum"),
+            avg_price=("price", "mean"),
+            last_transaction=("transaction_date", "max"),
+        )
+        .reset_index()
+    )
+    pivot = grouped.pivot(index="symbol", columns="transaction_type", values="total_shares").fillna(0)
+    pivot.reset_index(inplace=True)
+    pivot.rename(columns={"Buy": "buy_shares", "Sell": "sell_shares"}, inplace=True)
+    pivot["net_shares"] = pivot["buy_shares"] - pivot["sell_shares"]
+    pivot["as_of"] = grouped["last_transaction"].max()
+    columns = ["symbol", "buy_shares", "sell_shares", "net_shares", "as_of"]
+    return compact_frame(pivot[columns], "insider_buyback_activity")
+
+
+def datasets(symbols: int, days: int, seed: int = 7) -> Dict[str, pd.DataFrame]:
+    rng = np.random.default_rng(seed)
+    names = universe(symbols)
+    end = datetime(2024, 12, 31)
+    dates = pd.bdate_range(end=end, periods=days)
+    equities = SyntheticMarket(seed=seed).equity_bars(names, dates[0], end)
+
+    periods = pd.date_range(end=end, periods=max(days // 63, 4), freq="QE")
+    metrics = np.array(["revenue", "net_income", "assets", "liabilities"])
+    size = symbols * len(periods) * len(metrics)
+    fundamentals = pd.DataFrame(
+        {
+            "symbol": pd.Categorical(np.repeat(names, len(periods) * len(metrics))),
+            "cik": pd.Categorical(np.repeat([f"{idx:010d}" for idx in range(symbols)], len(periods) * len(metrics))),
+            "metric": pd.Categorical(np.tile(metrics, symbols * len(periods))),
+            "value": rng.uniform(1e8, 1e10, size),
+            "period_end": np.tile(np.repeat(periods.strftime("%Y-%m-%d"), len(metrics)), symbols),
+        }
+    ).sample(frac=1.0, random_state=seed, ignore_index=True)
+
+    articles = max(days // 50, 1)
+    news = SyntheticMarket(seed=seed).news(names, end, articles_per_symbol=articles)
+
+    indicators = np.array(["inflation", "gdp_growth", "rates", "unemployment"])
+    macro = pd.DataFrame(
+        {
+            "indicator": pd.Categorical(np.tile(indicators, days * 25)),
+            "value": rng.uniform(0.5, 5.0, days * 25 * len(indicators)),
+            "as_of": np.repeat(pd.date_range(end=end, periods=days * 25, freq="h"), len(indicators)),
+        }
+    )
+
+    trades = symbols * max(days // 25, 1)
+    insider = pd.DataFrame(
+        {
+            "symbol": pd.Categorical(rng.choice(names, trades)),
+            "insider": "Synthetic Insider",
+            "role": "Director",
+            "transaction_type": pd.Categorical(np.where(rng.random(trades) < 0.5, "Buy", "Sell")),
+            "shares": rng.integers(100, 5001, trades),
+            "transaction_date": (end - pd.to_timedelta(rng.integers(0, days, trades), unit="D")).strftime("%Y-%m-%d"),
+            "price": rng.uniform(50, 250, trades),
+            "source": "synthetic",
+        }
+    )
+    return {
+        "equities": equities,
+        "fundamentals": fundamentals,
+        "news": news,
+        "news_totals": news,
+        "macro": macro,
+        "insider": insider,
+    }
+
+
+def _normalised(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame.reset_index(drop=True)
+    return frame.assign(**{name: frame[name].astype(str) for name in frame.columns if frame[name].dtype == "category"})
+
+
+def _timed(fn: Callable[[pd.DataFrame], pd.DataFrame], frame: pd.DataFrame) -> Tuple[pd.DataFrame, float]:
+    started = time.perf_counter()
+    result = fn(frame)
+    return result, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=5_000)
+    parser.add_argument("--days", type=int, default=500)
+    parser.add_argument("--report", action="store_true", help="print per-step timings for each plan")
+    args = parser.parse_args()
+
+    frames = datasets(args.symbols, args.days)
+    cases: Dict[str, Tuple[Callable[[pd.DataFrame], pd.DataFrame], TransformPlan]] = {
+        "equities": (legacy_equities, equity_price_plan(WINDOWS)),
+        "fundamentals": (legacy_fundamentals, FUNDAMENTALS_PLAN),
+        "news": (legacy_news, NEWS_PLAN),
+        "news_totals": (legacy_news_totals, NEWS_TOTALS_PLAN),
+        "macro": (legacy_macro, MACRO_PLAN),
+        "insider": (legacy_insider, INSIDER_PLAN),
+    }
+    for name, (legacy, plan) in cases.items():
+        frame = frames[name]
+        expected, legacy_seconds = _timed(legacy, frame)
+        (actual, report), plan_seconds = _timed(plan.run, frame)
+        pd.testing.assert_frame_equal(
+            _normalised(actual), _normalised(expected), check_dtype=False, check_names=False, rtol=1e-6
+        )
+        print(
+            f"{name:<13} rows={len(frame):>11,} legacy={legacy_seconds:8.3f}s plan={plan_seconds:8.3f}s "
+            f"speedup={legacy_seconds / plan_seconds:6.2f}x"
+        )
+        if args.report:
+            print(report.format())
+
+
+if __name__ == "__main__":
+    main()
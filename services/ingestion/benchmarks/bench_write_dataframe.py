@@ -0,0 +1,71 @@
+"""Compare rows/sec for ``write_dataframe`` loaders against Postgres.
+
+Usage::
+
+    DATABASE_URL=postgresql+psycopg://... python benchmarks/bench_write_dataframe.py --rows 1000000
+
+Each loader writes the same synthetic OHLCV frame into a fresh table and the
+script prints one line per loader with elapsed seconds and rows/sec.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from ingestion.db import get_engine, write_dataframe  # noqa: E402
+
+LOADERS = {
+    "to_sql_multi": {"method": "insert"},
+    "copy_text": {"method": "copy", "copy_format": "text"},
+    "copy_binary": {"method": "copy", "copy_format": "binary"},
+}
+
+
+def synthetic_bars(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    symbols = np.array([f"SYM{idx:04d}" for idx in range(1_000)])
+    close = 100 + rng.standard_normal(rows).cumsum() * 0.01
+    return pd.DataFrame(
+        {
+            "symbol": symbols[rng.integers(0, len(symbols), rows)],
+            "ts": pd.Timestamp("2000-01-03") + pd.to_timedelta(np.arange(rows) % 5_000, unit="D"),
+            "open": close + rng.uniform(-1, 1, rows),
+            "high": close + rng.uniform(0, 2, rows),
+            "low": close - rng.uniform(0, 2, rows),
+            "close": close,
+            "volume": rng.integers(1_000_000, 1_050_000, rows),
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--loaders", nargs="+", choices=sorted(LOADERS), default=list(LOADERS))
+    args = parser.parse_args()
+
+    frame = synthetic_bars(args.rows)
+    engine = get_engine()
+    for name in args.loaders:
+        table = f"bench_write_{name}"
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        started = time.perf_counter()
+        with engine.begin() as conn:
+            write_dataframe(conn, frame, table, **LOADERS[name])
+        elapsed = time.perf_counter() - started
+        print(f"{name:<14} rows={args.rows:>9,} seconds={elapsed:8.2f} rows/sec={args.rows / elapsed:>12,.0f}")
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Archive of raw vendor frames as partitioned, compressed Parquet, for offline replay.
+
+Every fetch writes the normalised vendor response (the raw frame, before
+dedupe or transforms) as one Parquet part::
+
+    $INGESTION_ARCHIVE_DIR/<dataset>/date=YYYY-MM-DD/shard=NNN/part-<fetched_at>-<id>.parquet
+
+``date`` is the UTC fetch date, and ``shard`` is the symbol shard that
+fetched it (0 when the fetch was not sharded). Parts are written to a hidden
+temporary name and renamed into place, so readers never see a partial file.
+Their names sort by fetch time. Replay (:func:`read_archive`) reads a date
+range back in fetch order. When parts overlap, it keeps the newest row per
+natural key, so re-processing a year of history is a local, CPU-bound job.
+Archiving is off unless ``INGESTION_ARCHIVE_DIR`` is set. It needs
+``pyarrow``.
+"""
+from __future__ import annotations
+
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+try:  # pragma: no cover - optional dependency
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except Exception:  # pragma: no cover - executed when pyarrow isn't available
+    pa = None  # type: ignore
+    pq = None  # type: ignore
+
+ARCHIVE_DIR = os.getenv("INGESTION_ARCHIVE_DIR")
+ARCHIVE_COMPRESSION = os.getenv("INGESTION_ARCHIVE_COMPRESSION", "zstd")
+
+
+def archive_root(root: Optional[Path] = None) -> Optional[Path]:
+    if root is not None:
+        return Path(root)
+    return Path(ARCHIVE_DIR) if ARCHIVE_DIR else None
+
+
+def _require_pyarrow() -> None:
+    if pq is None:
+        raise RuntimeError("The raw archive needs pyarrow; install it or unset INGESTION_ARCHIVE_DIR")
+
+
+def partition_path(root: Path, dataset: str, day: date, shard: int = 0) -> Path:
+    return Path(root) / dataset / f"date={day:%Y-%m-%d}" / f"shard={shard:03d}"
+
+
+def archive_frame(
+    dataset: str,
+    frame: pd.DataFrame,
+    *,
+    shard: int = 0,
+    fetched_at: Optional[datetime] = None,
+    root: Optional[Path] = None,
+) -> Optional[Path]:
+    """Write ``frame`` as one part of ``dataset``'s archive; ``None`` when archiving is off or ``frame`` is empty."""
+
+    base = archive_root(root)
+    if base is None or frame.empty:
+        return None
+    _require_pyarrow()
+    fetched_at = fetched_at or datetime.utcnow()
+    directory = partition_path(base, dataset, fetched_at.date(), shard)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f"part-{fetched_at:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}.parquet"
+    staging = directory / f".{name}"
+    try:
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), staging, compression=ARCHIVE_COMPRESSION)
+        os.replace(staging, directory / name)
+    except BaseException:
+        staging.unlink(missing_ok=True)
+        raise
+    return directory / name
+
+
+def archived_parts(
+    dataset: str,
+    start: date,
+    end: date,
+    *,
+    shards: Optional[Sequence[int]] = None,
+    root: Optional[Path] = None,
+) -> List[Path]:
+    """Parts fetched between ``start`` and ``end`` inclusive, in fetch order."""
+
+    base = archive_root(root)
+    if base is None:
+        return []
+    wanted = {f"shard={shard:03d}" for shard in shards} if shards is not None else None
+    parts: List[Path] = []
+    day = start
+    while day <= end:
+        directory = partition_path(base, dataset, day).parent
+        if directory.is_dir():
+            day_parts = [
+                path
+                for shard_dir in directory.iterdir()
+                if shard_dir.is_dir() and (wanted is None or shard_dir.name in wanted)
+                for path in shard_dir.glob("part-*.parquet")
+            ]
+            parts.extend(sorted(day_parts, key=lambda path: path.name))
+        day += timedelta(days=1)
+    return parts
+
+
+def iter_archive(
+    dataset: str,
+    start: date,
+    end: date,
+    *,
+    shards: Optional[Sequence[int]] = None,
+    root: Optional[Path] = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield each archived part of ``dataset`` between ``start`` and ``end`` as a frame, in fetch order."""
+
+    parts = archived_parts(dataset, start, end, shards=shards, root=root)
+    if parts:
+        _require_pyarrow()
+    for path in parts:
+        yield pq.read_table(path).to_pandas()
+
+
+def read_archive(
+    dataset: str,
+    start: date,
+    end: date,
+    *,
+    key_columns: Optional[Sequence[str]] = None,
+    shards: Optional[Sequence[int]] = None,
+    root: Optional[Path] = None,
+) -> pd.DataFrame:
+    """Combine ``dataset``'s parts between ``start`` and ``end``, keeping the newest row per ``key_columns``.
+
+    The parts are concatenated once and de-duplicated once, so the cost is
+    linear in the archived rows rather than re-copying the combined frame for
+    every part.
+    """
+
+    frames = [frame for frame in iter_archive(dataset, start, end, shards=shards, root=root) if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    combined = pd.concat(frames, ignore_index=True)
+    if key_columns:
+        combined = combined.drop_duplicates(subset=list(key_columns), keep="last", ignore_index=True)
+    return combined
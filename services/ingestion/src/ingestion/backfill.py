@@ -0,0 +1,134 @@
+"""Chunked, resumable vendor backfills with per-symbol/per-chunk checkpoints."""
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+from sqlalchemy.engine import Connection
+
+from .db import db_session, read_completed_chunks, read_symbol_tail, record_checkpoint
+from .vendors import PolygonClient, VendorRequestError
+
+DEFAULT_CHUNK_DAYS = int(os.getenv("INGESTION_BACKFILL_CHUNK_DAYS", "90"))
+
+FrameLoader = Callable[[Connection, pd.DataFrame], None]
+Transform = Callable[[pd.DataFrame], pd.DataFrame]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BackfillChunk:
+    symbol: str
+    start: date
+    end: date
+
+
+@dataclass
+class SymbolBackfillResult:
+    symbol: str
+    chunks_loaded: int = 0
+    chunks_skipped: int = 0
+    rows: int = 0
+    error: Optional[str] = None
+
+
+def plan_chunks(
+    symbols: Iterable[str],
+    start: date,
+    end: date,
+    chunk_days: int = DEFAULT_CHUNK_DAYS,
+) -> List[BackfillChunk]:
+    """Split ``[start, end]`` (inclusive) into ``chunk_days`` windows per symbol, oldest first."""
+
+    if chunk_days < 1:
+        raise ValueError("chunk_days must be positive")
+    windows: List[tuple[date, date]] = []
+    cursor = start
+    while cursor <= end:
+        chunk_end = min(cursor + timedelta(days=chunk_days - 1), end)
+        windows.append((cursor, chunk_end))
+        cursor = chunk_end + timedelta(days=1)
+    return [BackfillChunk(symbol, chunk_start, chunk_end) for symbol in symbols for chunk_start, chunk_end in windows]
+
+
+def pending_chunks(chunks: Iterable[BackfillChunk], dataset: str) -> List[BackfillChunk]:
+    """Drop chunks already checkpointed for ``dataset`` so a rerun resumes where it stopped."""
+
+    with db_session() as conn:
+        completed = read_completed_chunks(conn, dataset)
+    return [chunk for chunk in chunks if (chunk.symbol, chunk.start, chunk.end) not in completed]
+
+
+def backfill_symbol(
+    client: PolygonClient,
+    symbol: str,
+    chunks: List[BackfillChunk],
+    *,
+    dataset: str,
+    raw_table: str,
+    transform: Transform,
+    load_raw: FrameLoader,
+    load_curated: FrameLoader,
+    tail_rows: int,
+) -> SymbolBackfillResult:
+    """Load ``chunks`` for one symbol in date order, one transaction per chunk.
+
+    Each response page is handed to ``load_raw`` as it arrives. Curated rows are
+    derived from the chunk plus the previous ``tail_rows`` raw bars (from the
+    prior chunk, or from ``raw_table`` when resuming) so rolling windows stay
+    continuous across chunk boundaries. The checkpoint commits with the chunk's
+    rows, so an interrupted run never leaves a half-loaded chunk marked done.
+    """
+
+    result = SymbolBackfillResult(symbol)
+    tail: Optional[pd.DataFrame] = None
+    for chunk in sorted(chunks, key=lambda item: item.start):
+        chunk_start = datetime.combine(chunk.start, datetime.min.time())
+        try:
+            with db_session() as conn:
+                if tail is None:
+                    tail = read_symbol_tail(conn, raw_table, symbol=symbol, before=chunk_start, limit=tail_rows)
+                pages: List[pd.DataFrame] = []
+                for page in client.iter_aggregate_pages(
+                    symbol, chunk_start, datetime.combine(chunk.end, datetime.min.time())
+                ):
+                    if page.empty:
+                        continue
+                    load_raw(conn, page)
+                    pages.append(page)
+                chunk_raw = pd.concat(pages, ignore_index=True) if pages else pd.DataFrame()
+                if not chunk_raw.empty:
+                    history = pd.concat([tail, chunk_raw], ignore_index=True) if not tail.empty else chunk_raw
+                    curated = transform(history)
+                    curated = curated.loc[pd.to_datetime(curated["ts"]) >= chunk_start]
+                    if not curated.empty:
+                        load_curated(conn, curated)
+                    tail = history.tail(tail_rows).reset_index(drop=True)
+                record_checkpoint(
+                    conn,
+                    dataset=dataset,
+                    symbol=symbol,
+                    chunk_start=chunk.start,
+                    chunk_end=chunk.end,
+                    row_count=len(chunk_raw),
+                )
+        except VendorRequestError as exc:
+            # Later chunks depend on this one's tail; stop here and resume on the next run.
+            logger.error("Backfill for %s stopped at %s..%s: %s", symbol, chunk.start, chunk.end, exc)
+            result.error = str(exc)
+            break
+        result.chunks_loaded += 1
+        result.rows += len(chunk_raw)
+    return result
+
+
+def group_by_symbol(chunks: Iterable[BackfillChunk]) -> Dict[str, List[BackfillChunk]]:
+    grouped: Dict[str, List[BackfillChunk]] = {}
+    for chunk in chunks:
+        grouped.setdefault(chunk.symbol, []).append(chunk)
+    return grouped
@@ -0,0 +1,199 @@
+"""Local ticker→CIK index built from the SEC bulk ``company_tickers.json`` file.
+
+The index is a single flat file: a fixed header, then the normalised tickers
+as sorted fixed-width ASCII keys, then the matching CIKs as ``uint32``. It is
+memory-mapped read-only. A lookup is a binary search over the mapped keys
+(O(log n)), and opening it in a spawned worker costs a few syscalls, with the
+pages shared through the OS cache. A refresh writes a new file and renames
+it into place, so mappings that are already open keep their snapshot.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+TICKER_INDEX_PATH = os.getenv("SEC_TICKER_INDEX_PATH")
+TICKER_INDEX_MAX_AGE_HOURS = float(os.getenv("SEC_TICKER_INDEX_MAX_AGE_HOURS", "24"))
+
+MAGIC = b"CIKIDX01"
+HEADER = np.dtype([("magic", "S8"), ("count", "<u4"), ("width", "<u4"), ("built_at", "<f8")])
+CIK_DTYPE = np.dtype("<u4")
+
+_LOGGER = logging.getLogger(__name__)
+
+TickerSource = Callable[[], Iterable[Tuple[str, int]]]
+
+
+def normalize_ticker(symbol: str) -> str:
+    """Upper-case ``symbol`` and write share classes the SEC way (``BRK.B`` → ``BRK-B``)."""
+
+    return symbol.strip().upper().replace(".", "-").replace("/", "-")
+
+
+def format_cik(cik: int) -> str:
+    return f"{int(cik):010d}"
+
+
+def default_index_path() -> Path:
+    """``SEC_TICKER_INDEX_PATH``, else ``company_tickers.idx`` under ``EDGAR_CACHE_DIR`` or the temp dir."""
+
+    if TICKER_INDEX_PATH:
+        return Path(TICKER_INDEX_PATH)
+    cache_dir = os.getenv("EDGAR_CACHE_DIR")
+    base = Path(cache_dir) if cache_dir else Path(tempfile.gettempdir()) / "ingestion"
+    return base / "company_tickers.idx"
+
+
+def _padded(size: int) -> int:
+    return -(-size // 8) * 8
+
+
+def _file_identity(path: Path) -> Tuple[int, int]:
+    # A refresh renames a new file into place, so the inode changes even within one mtime tick.
+    stat = path.stat()
+    return stat.st_ino, stat.st_mtime_ns
+
+
+@dataclass(frozen=True, eq=False)
+class TickerIndex:
+    """Read-only view over a memory-mapped index file."""
+
+    path: Path
+    keys: np.ndarray
+    ciks: np.ndarray
+    built_at: float
+    identity: Tuple[int, int]
+
+    @classmethod
+    def open(cls, path: Path) -> "TickerIndex":
+        path = Path(path)
+        identity = _file_identity(path)
+        mapped = np.memmap(path, dtype=np.uint8, mode="r")
+        header = mapped[: HEADER.itemsize].view(HEADER)[0]
+        if header["magic"] != MAGIC:
+            raise ValueError(f"{path} is not a ticker index")
+        count, width = int(header["count"]), int(header["width"])
+        keys_end = HEADER.itemsize + _padded(count * width)
+        keys = mapped[HEADER.itemsize : HEADER.itemsize + count * width].view(f"S{width}")
+        ciks = mapped[keys_end : keys_end + count * CIK_DTYPE.itemsize].view(CIK_DTYPE)
+        return cls(path, keys, ciks, float(header["built_at"]), identity)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def age_hours(self) -> float:
+        return (time.time() - self.built_at) / 3600
+
+    def lookup(self, symbol: str) -> Optional[str]:
+        return self.resolve([symbol]).get(symbol)
+
+    def resolve(self, symbols: Sequence[str]) -> Dict[str, str]:
+        """Map each resolvable symbol to its zero-padded CIK; unknown symbols are omitted."""
+
+        if not symbols or not len(self.keys):
+            return {}
+        width = self.keys.dtype.itemsize
+        wanted = [normalize_ticker(symbol).encode("ascii", "replace") for symbol in symbols]
+        probes = np.array([key if len(key) <= width else b"" for key in wanted], dtype=self.keys.dtype)
+        positions = np.minimum(np.searchsorted(self.keys, probes), len(self.keys) - 1)
+        found = (self.keys[positions] == probes) & (probes != b"")
+        return {
+            symbol: format_cik(cik)
+            for symbol, cik, hit in zip(symbols, self.ciks[positions].tolist(), found.tolist())
+            if hit
+        }
+
+
+def write_ticker_index(path: Path, pairs: Iterable[Tuple[str, int]]) -> TickerIndex:
+    """Write ``(ticker, cik)`` pairs as an index at ``path`` atomically; the first CIK per ticker wins."""
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    entries: Dict[bytes, int] = {}
+    for ticker, cik in pairs:
+        key = normalize_ticker(ticker).encode("ascii", "ignore")
+        if key:
+            entries.setdefault(key, int(cik))
+    ordered = sorted(entries)
+    width = max((len(key) for key in ordered), default=1)
+    header = np.zeros(1, dtype=HEADER)
+    header[0] = (MAGIC, len(ordered), width, time.time())
+    keys = np.array(ordered, dtype=f"S{width}").tobytes()
+    ciks = np.array([entries[key] for key in ordered], dtype=CIK_DTYPE).tobytes()
+    handle, staging = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(handle, "wb") as stream:
+            stream.write(header.tobytes())
+            stream.write(keys.ljust(_padded(len(keys)), b"\0"))
+            stream.write(ciks)
+        os.replace(staging, path)
+    except BaseException:
+        Path(staging).unlink(missing_ok=True)
+        raise
+    return TickerIndex.open(path)
+
+
+_INDEXES: Dict[Path, TickerIndex] = {}
+_INDEX_LOCK = threading.Lock()
+
+
+def load_ticker_index(path: Optional[Path] = None) -> Optional[TickerIndex]:
+    """Return the process's mapping of the index at ``path``, remapping after a refresh; ``None`` if absent."""
+
+    path = Path(path or default_index_path())
+    try:
+        identity = _file_identity(path)
+    except FileNotFoundError:
+        return None
+    with _INDEX_LOCK:
+        index = _INDEXES.get(path)
+        if index is None or index.identity != identity:
+            index = _INDEXES[path] = TickerIndex.open(path)
+        return index
+
+
+def refresh_ticker_index(
+    source: TickerSource,
+    path: Optional[Path] = None,
+    *,
+    max_age_hours: Optional[float] = None,
+    force: bool = False,
+) -> TickerIndex:
+    """Rebuild the index from ``source`` when forced, missing or older than ``max_age_hours``.
+
+    ``max_age_hours`` defaults to ``SEC_TICKER_INDEX_MAX_AGE_HOURS``. A fresh
+    index is returned as-is, so callers can use this on every run and only
+    pay for the download once per refresh period. When the rebuild fails and
+    an older index is on disk, that index is served with a warning; the
+    error is raised only when there is no index at all.
+    """
+
+    path = Path(path or default_index_path())
+    limit = TICKER_INDEX_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+    index = load_ticker_index(path)
+    if index is not None and not force and index.age_hours < limit:
+        return index
+    try:
+        write_ticker_index(path, source())
+    except Exception:
+        if index is None:
+            raise
+        _LOGGER.warning(
+            "Could not refresh the ticker index at %s; serving the copy built %.1f hours ago",
+            path,
+            index.age_hours,
+            exc_info=True,
+        )
+        return index
+    refreshed = load_ticker_index(path)
+    assert refreshed is not None
+    return refreshed
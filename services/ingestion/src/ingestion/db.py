@@ -1,15 +1,28 @@
 """Database helpers for ingestion flows."""
 from __future__ import annotations
 
+import csv
+import io
+import json
 import os
+import uuid
 from contextlib import contextmanager
-from datetime import datetime
-from typing import Iterable, Optional
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
 
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import BigInteger, Float, bindparam, create_engine, inspect, text
 from sqlalchemy.engine import Connection, Engine
 
+from .dtypes import widen_float32
+from .metrics import observe_write
+
+COPY_FORMAT = os.getenv("INGESTION_COPY_FORMAT", "text")
+COPY_CHUNK_ROWS = int(os.getenv("INGESTION_COPY_CHUNK_ROWS", "100000"))
+# Multi-row INSERTs bind one parameter per cell; stay under SQLite's 32766 cap
+# (Postgres allows 65535).
+INSERT_MAX_PARAMS = 30_000
+
 _ENGINE: Optional[Engine] = None
 
 
@@ -41,19 +54,341 @@ def write_dataframe(
     *,
     schema: Optional[str] = None,
     if_exists: str = "append",
+    method: str = "auto",
+    copy_format: Optional[str] = None,
 ) -> None:
-    """Write a dataframe to the provided connection with consistent options."""
+    """Write a dataframe to the provided connection with consistent options.
+
+    ``method="auto"`` streams the frame with ``COPY FROM STDIN`` when the
+    connection is Postgres via psycopg 3 and falls back to
+    ``to_sql(method="multi")`` elsewhere (e.g. SQLite in tests). ``copy_format``
+    selects the ``text`` or ``binary`` COPY format (default ``INGESTION_COPY_FORMAT``).
+    Rows written and write throughput are recorded per table in :mod:`ingestion.metrics`.
+    """
 
     if df.empty:
         return
-    df.to_sql(
-        table,
-        conn.connection,
-        schema=schema,
-        if_exists=if_exists,
+    if method not in {"auto", "copy", "insert"}:
+        raise ValueError(f"Unsupported write method: {method}")
+    df = widen_float32(df)
+    with observe_write(_metric_table(table, schema), len(df)):
+        if method == "copy" or (method == "auto" and supports_copy(conn)):
+            copy_dataframe(conn, df, table, schema=schema, if_exists=if_exists, copy_format=copy_format)
+            return
+        df.to_sql(
+            table,
+            conn,
+            schema=schema,
+            if_exists=if_exists,
+            index=False,
+            dtype=_column_types(df),
+            method="multi",
+            chunksize=max(1, INSERT_MAX_PARAMS // max(1, len(df.columns))),
+        )
+
+
+def _column_types(df: pd.DataFrame) -> Dict[str, Any]:
+    """Create float32 columns as double precision and compact integers as BIGINT.
+
+    Compact frames must not narrow the schema: a table first created from an
+    ``Int32`` frame would otherwise overflow on later, larger values.
+    """
+
+    types: Dict[str, Any] = {}
+    for column, dtype in df.dtypes.items():
+        if dtype == "float32":
+            types[str(column)] = Float(precision=53)
+        elif pd.api.types.is_integer_dtype(dtype):
+            types[str(column)] = BigInteger()
+    return types
+
+
+def _metric_table(table: str, schema: Optional[str]) -> str:
+    return f"{schema}.{table}" if schema else table
+
+
+def supports_copy(conn: Connection) -> bool:
+    """Return whether ``conn`` can stream rows with psycopg 3 ``COPY FROM STDIN``."""
+
+    return conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg"
+
+
+def _qualified_name(conn: Connection, table: str, schema: Optional[str]) -> str:
+    quote = conn.dialect.identifier_preparer.quote
+    return f"{quote(schema)}.{quote(table)}" if schema else quote(table)
+
+
+def _escape_copy_text(column: pd.Series) -> pd.Series:
+    return (
+        column.astype("string")
+        .str.replace("\\", "\\\\", regex=False)
+        .str.replace("\t", "\\t", regex=False)
+        .str.replace("\n", "\\n", regex=False)
+        .str.replace("\r", "\\r", regex=False)
+    )
+
+
+def _copy_text_chunk(chunk: pd.DataFrame) -> str:
+    """Render a chunk in Postgres COPY text format (tab separated, ``\\N`` for NULL)."""
+
+    chunk = chunk.copy(deep=False)
+    for column in chunk.columns:
+        dtype = chunk[column].dtype
+        if dtype == object or isinstance(dtype, (pd.StringDtype, pd.CategoricalDtype)):
+            chunk[column] = _escape_copy_text(chunk[column])
+        elif isinstance(dtype, pd.DatetimeTZDtype):
+            # date_format below has no offset, so send aware timestamps as explicit UTC.
+            chunk[column] = chunk[column].dt.tz_convert("UTC").dt.strftime("%Y-%m-%d %H:%M:%S.%f+00:00")
+    buffer = io.StringIO()
+    chunk.to_csv(
+        buffer,
+        sep="\t",
+        header=False,
         index=False,
-        method="multi",
+        na_rep="\\N",
+        quoting=csv.QUOTE_NONE,
+        escapechar=None,
+        date_format="%Y-%m-%d %H:%M:%S.%f",
+    )
+    return buffer.getvalue()
+
+
+# Postgres types the binary COPY path can send each kind of frame column as.
+_BINARY_COPY_TYPES = {
+    "bool": {"bool"},
+    "int": {"int2", "int4", "int8", "float4", "float8"},
+    "float": {"float4", "float8"},
+    "datetime": {"timestamp"},
+    "datetimetz": {"timestamptz"},
+    "text": {"text", "varchar", "bpchar"},
+}
+
+
+def _dtype_kind(dtype: Any) -> str:
+    if pd.api.types.is_bool_dtype(dtype):
+        return "bool"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "int"
+    if pd.api.types.is_float_dtype(dtype):
+        return "float"
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return "datetimetz"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "datetime"
+    return "text"
+
+
+def _table_column_types(conn: Connection, qualified_table: str) -> Dict[str, str]:
+    """Postgres type names (``pg_type.typname``) of ``qualified_table``'s columns, temporary tables included."""
+
+    rows = conn.execute(
+        text(
+            """
+            SELECT a.attname, t.typname
+            FROM pg_catalog.pg_attribute a
+            JOIN pg_catalog.pg_type t ON t.oid = a.atttypid
+            WHERE a.attrelid = CAST(:table AS regclass) AND a.attnum > 0 AND NOT a.attisdropped
+            """
+        ),
+        {"table": qualified_table},
+    )
+    return {str(name): str(type_name) for name, type_name in rows}
+
+
+def _copy_binary_types(df: pd.DataFrame, table_types: Mapping[str, str]) -> Optional[List[str]]:
+    """The binary COPY types for ``df``'s columns, taken from the target table.
+
+    ``None`` when a column's table type is one the frame's values can't be
+    sent as in binary (e.g. ``numeric``, ``date`` or a timezone mismatch);
+    the caller then falls back to text COPY, where the server parses values.
+    """
+
+    types: List[str] = []
+    for column, dtype in df.dtypes.items():
+        table_type = table_types.get(str(column))
+        if table_type not in _BINARY_COPY_TYPES[_dtype_kind(dtype)]:
+            return None
+        types.append(table_type)
+    return types
+
+
+def _python_rows(chunk: pd.DataFrame) -> Iterable[tuple[Any, ...]]:
+    converted = chunk.astype(object).where(chunk.notna(), None)
+    for row in converted.itertuples(index=False, name=None):
+        yield tuple(value.to_pydatetime() if isinstance(value, pd.Timestamp) else value for value in row)
+
+
+def copy_dataframe(
+    conn: Connection,
+    df: pd.DataFrame,
+    table: str,
+    *,
+    schema: Optional[str] = None,
+    if_exists: str = "append",
+    copy_format: Optional[str] = None,
+    chunk_rows: int = COPY_CHUNK_ROWS,
+) -> None:
+    """Stream ``df`` into Postgres with ``COPY FROM STDIN`` without touching disk.
+
+    The target table is created from the frame's dtypes when missing. Rows are
+    rendered and sent in ``chunk_rows`` slices so only one chunk of COPY payload
+    is held in memory at a time.
+    """
+
+    df.head(0).to_sql(table, conn, schema=schema, if_exists=if_exists, index=False, dtype=_column_types(df))
+    _copy_rows(conn, df, _qualified_name(conn, table, schema), copy_format=copy_format, chunk_rows=chunk_rows)
+
+
+def _copy_rows(
+    conn: Connection,
+    df: pd.DataFrame,
+    qualified_table: str,
+    *,
+    copy_format: Optional[str] = None,
+    chunk_rows: int = COPY_CHUNK_ROWS,
+) -> None:
+    copy_format = copy_format or COPY_FORMAT
+    if copy_format not in {"text", "binary"}:
+        raise ValueError(f"Unsupported COPY format: {copy_format}")
+    binary_types: Optional[List[str]] = None
+    if copy_format == "binary":
+        binary_types = _copy_binary_types(df, _table_column_types(conn, qualified_table))
+        if binary_types is None:
+            copy_format = "text"
+    quote = conn.dialect.identifier_preparer.quote
+    columns = ", ".join(quote(str(column)) for column in df.columns)
+    options = " (FORMAT BINARY)" if copy_format == "binary" else ""
+    statement = f"COPY {qualified_table} ({columns}) FROM STDIN{options}"
+    dbapi_conn = conn.connection.dbapi_connection
+    with dbapi_conn.cursor() as cursor:
+        with cursor.copy(statement) as copy:
+            if binary_types is not None:
+                copy.set_types(binary_types)
+            for offset in range(0, len(df), chunk_rows):
+                chunk = df.iloc[offset : offset + chunk_rows]
+                if binary_types is not None:
+                    for row in _python_rows(chunk):
+                        copy.write_row(row)
+                else:
+                    copy.write(_copy_text_chunk(chunk))
+
+
+def _insert_rows(conn: Connection, df: pd.DataFrame, qualified_table: str) -> None:
+    """Executemany fallback used to fill staging tables on engines without COPY."""
+
+    quote = conn.dialect.identifier_preparer.quote
+    columns = ", ".join(quote(str(column)) for column in df.columns)
+    params = ", ".join(f":p{idx}" for idx in range(len(df.columns)))
+    statement = text(f"INSERT INTO {qualified_table} ({columns}) VALUES ({params})")
+    for offset in range(0, len(df), COPY_CHUNK_ROWS):
+        chunk = df.iloc[offset : offset + COPY_CHUNK_ROWS]
+        conn.execute(
+            statement,
+            [{f"p{idx}": value for idx, value in enumerate(row)} for row in _python_rows(chunk)],
+        )
+
+
+def merge_dataframe(
+    conn: Connection,
+    df: pd.DataFrame,
+    table: str,
+    *,
+    key_columns: Sequence[str],
+    schema: Optional[str] = None,
+) -> None:
+    """Idempotently upsert ``df`` into ``table`` on its natural key.
+
+    Rows are bulk-loaded into a temporary staging table (COPY on Postgres) and
+    merged with ``INSERT ... SELECT ... ON CONFLICT (keys) DO UPDATE``, so
+    re-running a load or overlapping windows never duplicates rows. The target
+    table and a unique index on ``key_columns`` are created when missing; an
+    existing table that already holds duplicate keys must be deduplicated
+    before the index can be built.
+    """
+
+    if df.empty:
+        return
+    missing = [column for column in key_columns if column not in df.columns]
+    if missing:
+        raise ValueError(f"Merge keys {missing} not present in frame for table {table}")
+    df = widen_float32(df.drop_duplicates(subset=list(key_columns), keep="last"))
+    df.head(0).to_sql(table, conn, schema=schema, if_exists="append", index=False, dtype=_column_types(df))
+
+    quote = conn.dialect.identifier_preparer.quote
+    target = _qualified_name(conn, table, schema)
+    index_name = quote(f"ux_{table}_{'_'.join(key_columns)}")
+    keys = ", ".join(quote(column) for column in key_columns)
+    columns = [str(column) for column in df.columns]
+    column_list = ", ".join(quote(column) for column in columns)
+    staging = quote(f"_stage_{table}_{uuid.uuid4().hex[:8]}")
+
+    conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {target} ({keys})"))
+    conn.execute(text(f"CREATE TEMPORARY TABLE {staging} AS SELECT {column_list} FROM {target} WHERE 1 = 0"))
+    try:
+        with observe_write(_metric_table(table, schema), len(df)):
+            if supports_copy(conn):
+                _copy_rows(conn, df, staging)
+            else:
+                _insert_rows(conn, df, staging)
+            updates = [column for column in columns if column not in key_columns]
+            if updates:
+                assignments = ", ".join(f"{quote(column)} = EXCLUDED.{quote(column)}" for column in updates)
+                conflict = f"DO UPDATE SET {assignments}"
+            else:
+                conflict = "DO NOTHING"
+            conn.execute(
+                text(
+                    f"INSERT INTO {target} ({column_list}) SELECT {column_list} FROM {staging} "
+                    f"WHERE true ON CONFLICT ({keys}) {conflict}"
+                )
+            )
+    finally:
+        conn.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+
+
+def diff_fingerprints(conn: Connection, store: str, fingerprints: pd.DataFrame) -> Set[int]:
+    """Return the ``key_hash`` values whose ``row_hash`` is new or differs from ``store``, and record them.
+
+    ``fingerprints`` has one row per natural key (``key_hash``, ``row_hash``).
+    The candidates are bulk-loaded into a temporary staging table and
+    anti-joined against ``store`` in the database. Only the changed
+    fingerprints are upserted, so an unchanged resend writes nothing. Call
+    inside the transaction that loads the changed rows.
+    """
+
+    if fingerprints.empty:
+        return set()
+    quote = conn.dialect.identifier_preparer.quote
+    target = quote(store)
+    staging = quote(f"_stage_{store}_{uuid.uuid4().hex[:8]}")
+    conn.execute(
+        text(f"CREATE TABLE IF NOT EXISTS {target} (key_hash BIGINT PRIMARY KEY, row_hash BIGINT NOT NULL)")
+    )
+    conn.execute(text(f"CREATE TEMPORARY TABLE {staging} (key_hash BIGINT, row_hash BIGINT)"))
+    changed = (
+        f"FROM {staging} AS s LEFT JOIN {target} AS f ON f.key_hash = s.key_hash "
+        "WHERE f.row_hash IS NULL OR f.row_hash <> s.row_hash"
     )
+    try:
+        if supports_copy(conn):
+            _copy_rows(conn, fingerprints[["key_hash", "row_hash"]], staging)
+        else:
+            _insert_rows(conn, fingerprints[["key_hash", "row_hash"]], staging)
+        keys = set(conn.execute(text(f"SELECT s.key_hash {changed}")).scalars())
+        if keys:
+            conn.execute(
+                text(
+                    f"INSERT INTO {target} (key_hash, row_hash) SELECT s.key_hash, s.row_hash {changed} "
+                    "ON CONFLICT (key_hash) DO UPDATE SET row_hash = EXCLUDED.row_hash"
+                )
+            )
+    finally:
+        conn.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+    return keys
+
+
+# Databases whose ``data_freshness`` already has every column; checked once per process.
+_FRESHNESS_MIGRATED: Set[str] = set()
 
 
 def ensure_freshness_table(conn: Connection) -> None:
@@ -65,11 +400,26 @@ def ensure_freshness_table(conn: Connection) -> None:
                 last_updated TIMESTAMP NOT NULL,
                 row_count INTEGER NOT NULL,
                 status TEXT NOT NULL,
-                updated_at TIMESTAMP NOT NULL
+                updated_at TIMESTAMP NOT NULL,
+                metrics TEXT
             )
             """
         )
     )
+    database = str(conn.engine.url)
+    if database in _FRESHNESS_MIGRATED:
+        return
+    # Tables created before run metrics were recorded lack the ``metrics`` column.
+    # Only a table found complete is cached, so an ALTER that rolls back is retried.
+    if "metrics" in {column["name"] for column in inspect(conn).get_columns("data_freshness")}:
+        _FRESHNESS_MIGRATED.add(database)
+    else:
+        conn.execute(text("ALTER TABLE data_freshness ADD COLUMN metrics TEXT"))
+
+
+# Upsert assignment keeping the later of the stored and incoming values; CASE
+# rather than GREATEST so it runs on SQLite as well as Postgres.
+_LATEST_SQL = "CASE WHEN {table}.{column} > EXCLUDED.{column} THEN {table}.{column} ELSE EXCLUDED.{column} END"
 
 
 def record_data_freshness(
@@ -79,20 +429,31 @@ def record_data_freshness(
     last_updated: datetime,
     row_count: int,
     status: str = "success",
+    metrics: Optional[Mapping[str, Any]] = None,
+    advance_only: bool = False,
 ) -> None:
-    """Upsert orchestration metadata for a dataset."""
+    """Upsert orchestration metadata for a dataset.
+
+    ``metrics`` is the run's stage/vendor/write summary, stored as JSON. With
+    ``advance_only`` a ``last_updated`` older than the stored one (a rerun of
+    an earlier window) leaves the stored watermark in place.
+    """
 
     ensure_freshness_table(conn)
+    last_updated_sql = (
+        _LATEST_SQL.format(table="data_freshness", column="last_updated") if advance_only else "EXCLUDED.last_updated"
+    )
     conn.execute(
         text(
-            """
-            INSERT INTO data_freshness(dataset, last_updated, row_count, status, updated_at)
-            VALUES(:dataset, :last_updated, :row_count, :status, :updated_at)
+            f"""
+            INSERT INTO data_freshness(dataset, last_updated, row_count, status, updated_at, metrics)
+            VALUES(:dataset, :last_updated, :row_count, :status, :updated_at, :metrics)
             ON CONFLICT(dataset) DO UPDATE SET
-                last_updated = EXCLUDED.last_updated,
+                last_updated = {last_updated_sql},
                 row_count = EXCLUDED.row_count,
                 status = EXCLUDED.status,
-                updated_at = EXCLUDED.updated_at
+                updated_at = EXCLUDED.updated_at,
+                metrics = EXCLUDED.metrics
             """
         ),
         {
@@ -101,5 +462,285 @@ def record_data_freshness(
             "row_count": row_count,
             "status": status,
             "updated_at": datetime.utcnow(),
+            "metrics": json.dumps(metrics, default=str) if metrics is not None else None,
+        },
+    )
+
+
+def update_freshness_metrics(conn: Connection, *, dataset: str, metrics: Mapping[str, Any]) -> None:
+    """Replace the run summary on ``dataset``'s freshness row, once the run's stages have all been timed."""
+
+    ensure_freshness_table(conn)
+    conn.execute(
+        text("UPDATE data_freshness SET metrics = :metrics WHERE dataset = :dataset"),
+        {"dataset": dataset, "metrics": json.dumps(metrics, default=str)},
+    )
+
+
+def merge_shard_freshness(
+    conn: Connection,
+    *,
+    dataset: str,
+    shard_datasets: Sequence[str],
+    since: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Fold per-shard ``data_freshness`` rows into the row for ``dataset``.
+
+    The merged watermark is the oldest shard watermark, so the dataset never
+    reads fresher than its slowest shard, and row counts are summed. The status
+    is ``partial`` when any shard is missing or did not succeed. A shard row
+    last written before ``since`` (the start of the sharded run) is left over
+    from an earlier run and counts as missing. Per-shard metrics are kept
+    under their shard names.
+    """
+
+    ensure_freshness_table(conn)
+    statement = text(
+        "SELECT dataset, last_updated, row_count, status, metrics, updated_at FROM data_freshness "
+        "WHERE dataset IN :names"
+    ).bindparams(bindparam("names", expanding=True))
+    rows = {
+        row.dataset: row
+        for row in conn.execute(statement, {"names": list(shard_datasets)})
+        if since is None or pd.Timestamp(row.updated_at) >= pd.Timestamp(since)
+    }
+    missing = [name for name in shard_datasets if name not in rows]
+    complete = not missing and all(row.status == "success" for row in rows.values())
+    merged: Dict[str, Any] = {
+        "dataset": dataset,
+        "shards": len(shard_datasets),
+        "missing_shards": missing,
+        "row_count": sum(int(row.row_count) for row in rows.values()),
+        "status": "success" if complete else "partial",
+        "last_updated": None,
+    }
+    if not rows:
+        return merged
+    merged["last_updated"] = min(pd.Timestamp(row.last_updated).to_pydatetime() for row in rows.values())
+    record_data_freshness(
+        conn,
+        dataset=dataset,
+        last_updated=merged["last_updated"],
+        row_count=merged["row_count"],
+        status=merged["status"],
+        metrics={
+            "missing_shards": missing,
+            "shards": {name: json.loads(row.metrics) if row.metrics else None for name, row in rows.items()},
+        },
+    )
+    return merged
+
+
+def maintain_price_partitions(
+    conn: Connection,
+    *,
+    months_ahead: int = 3,
+    retain_months: Optional[int] = None,
+) -> None:
+    """Create upcoming monthly ``ohlcv`` partitions and detach expired ones.
+
+    Calls ``ohlcv_maintain_partitions`` from ``sql-scripts/create_schema.sql``,
+    which also moves rows parked in ``ohlcv_default`` into their own partitions.
+    """
+
+    conn.execute(
+        text("SELECT ohlcv_maintain_partitions(:months_ahead, CAST(:retain_months AS integer))"),
+        {"months_ahead": months_ahead, "retain_months": retain_months},
+    )
+
+
+def ensure_symbol_freshness_table(conn: Connection) -> None:
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS data_freshness_symbols (
+                dataset TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                last_updated TIMESTAMP NOT NULL,
+                updated_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (dataset, symbol)
+            )
+            """
+        )
+    )
+
+
+def record_symbol_watermarks(
+    conn: Connection,
+    *,
+    dataset: str,
+    watermarks: Mapping[str, datetime],
+) -> None:
+    """Upsert the latest loaded timestamp per symbol for a dataset; a stored later timestamp is kept."""
+
+    if not watermarks:
+        return
+    ensure_symbol_freshness_table(conn)
+    updated_at = datetime.utcnow()
+    conn.execute(
+        text(
+            f"""
+            INSERT INTO data_freshness_symbols(dataset, symbol, last_updated, updated_at)
+            VALUES(:dataset, :symbol, :last_updated, :updated_at)
+            ON CONFLICT(dataset, symbol) DO UPDATE SET
+                last_updated = {_LATEST_SQL.format(table="data_freshness_symbols", column="last_updated")},
+                updated_at = EXCLUDED.updated_at
+            """
+        ),
+        [
+            {
+                "dataset": dataset,
+                "symbol": symbol,
+                "last_updated": pd.Timestamp(last_updated).to_pydatetime(),
+                "updated_at": updated_at,
+            }
+            for symbol, last_updated in watermarks.items()
+        ],
+    )
+
+
+def read_data_freshness(conn: Connection, dataset: str) -> Optional[datetime]:
+    """Return the dataset-level watermark stored by :func:`record_data_freshness`."""
+
+    ensure_freshness_table(conn)
+    value = conn.execute(
+        text("SELECT last_updated FROM data_freshness WHERE dataset = :dataset"),
+        {"dataset": dataset},
+    ).scalar_one_or_none()
+    if value is None:
+        return None
+    return pd.Timestamp(value).to_pydatetime()
+
+
+def read_symbol_watermarks(
+    conn: Connection,
+    dataset: str,
+    symbols: Optional[Iterable[str]] = None,
+) -> Dict[str, datetime]:
+    """Return ``{symbol: last_updated}`` for a dataset, optionally limited to ``symbols``."""
+
+    ensure_symbol_freshness_table(conn)
+    rows = conn.execute(
+        text("SELECT symbol, last_updated FROM data_freshness_symbols WHERE dataset = :dataset"),
+        {"dataset": dataset},
+    ).all()
+    wanted = set(symbols) if symbols is not None else None
+    return {
+        symbol: pd.Timestamp(last_updated).to_pydatetime()
+        for symbol, last_updated in rows
+        if wanted is None or symbol in wanted
+    }
+
+
+def read_latest_symbol_times(
+    conn: Connection,
+    table: str,
+    symbols: Iterable[str],
+    *,
+    schema: Optional[str] = None,
+) -> Dict[str, datetime]:
+    """Return ``{symbol: max(ts)}`` over ``table``'s stored rows; symbols without rows are left out."""
+
+    symbol_list = list(symbols)
+    if not symbol_list or not conn.dialect.has_table(conn, table, schema=schema):
+        return {}
+    quote = conn.dialect.identifier_preparer.quote
+    rows = conn.execute(
+        text(
+            f"SELECT {quote('symbol')}, MAX({quote('ts')}) FROM {_qualified_name(conn, table, schema)} "
+            f"WHERE {quote('symbol')} IN :symbols GROUP BY {quote('symbol')}"
+        ).bindparams(bindparam("symbols", expanding=True)),
+        {"symbols": symbol_list},
+    ).all()
+    return {symbol: pd.Timestamp(latest).to_pydatetime() for symbol, latest in rows if latest is not None}
+
+
+def ensure_checkpoint_table(conn: Connection) -> None:
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS ingestion_checkpoints (
+                dataset TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                chunk_start TEXT NOT NULL,
+                chunk_end TEXT NOT NULL,
+                row_count INTEGER NOT NULL,
+                completed_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (dataset, symbol, chunk_start, chunk_end)
+            )
+            """
+        )
+    )
+
+
+def record_checkpoint(
+    conn: Connection,
+    *,
+    dataset: str,
+    symbol: str,
+    chunk_start: date,
+    chunk_end: date,
+    row_count: int,
+) -> None:
+    """Mark one backfill chunk as loaded; call inside the transaction that loaded it."""
+
+    ensure_checkpoint_table(conn)
+    conn.execute(
+        text(
+            """
+            INSERT INTO ingestion_checkpoints(dataset, symbol, chunk_start, chunk_end, row_count, completed_at)
+            VALUES(:dataset, :symbol, :chunk_start, :chunk_end, :row_count, :completed_at)
+            ON CONFLICT(dataset, symbol, chunk_start, chunk_end) DO UPDATE SET
+                row_count = EXCLUDED.row_count,
+                completed_at = EXCLUDED.completed_at
+            """
+        ),
+        {
+            "dataset": dataset,
+            "symbol": symbol,
+            "chunk_start": chunk_start.isoformat(),
+            "chunk_end": chunk_end.isoformat(),
+            "row_count": row_count,
+            "completed_at": datetime.utcnow(),
         },
     )
+
+
+def read_completed_chunks(conn: Connection, dataset: str) -> Set[Tuple[str, date, date]]:
+    """Return ``{(symbol, chunk_start, chunk_end)}`` already checkpointed for ``dataset``."""
+
+    ensure_checkpoint_table(conn)
+    rows = conn.execute(
+        text("SELECT symbol, chunk_start, chunk_end FROM ingestion_checkpoints WHERE dataset = :dataset"),
+        {"dataset": dataset},
+    ).all()
+    return {(symbol, date.fromisoformat(start), date.fromisoformat(end)) for symbol, start, end in rows}
+
+
+def read_symbol_tail(
+    conn: Connection,
+    table: str,
+    *,
+    symbol: str,
+    before: datetime,
+    limit: int,
+    schema: Optional[str] = None,
+) -> pd.DataFrame:
+    """Return the last ``limit`` rows for ``symbol`` strictly before ``before``, oldest first."""
+
+    if not conn.dialect.has_table(conn, table, schema=schema):
+        return pd.DataFrame()
+    quote = conn.dialect.identifier_preparer.quote
+    tail = pd.read_sql(
+        text(
+            f"SELECT * FROM {_qualified_name(conn, table, schema)} "
+            f"WHERE {quote('symbol')} = :symbol AND {quote('ts')} < :before "
+            f"ORDER BY {quote('ts')} DESC LIMIT :limit"
+        ),
+        conn,
+        params={"symbol": symbol, "before": before, "limit": limit},
+    )
+    if tail.empty:
+        return tail
+    tail["ts"] = pd.to_datetime(tail["ts"])
+    return tail.iloc[::-1].reset_index(drop=True)
@@ -0,0 +1,233 @@
+"""Compact dtype policies for raw and curated ingestion frames.
+
+Vendor frames arrive with object symbol columns and 64-bit numbers. Each
+table's :class:`DtypePolicy` stores repeated labels as categoricals. It uses
+float32 when the round-trip error stays within a per-column tolerance, and
+nullable 32-bit integers when every value fits. Datetimes become naive UTC.
+Database column types are unchanged. :func:`ingestion.db.write_dataframe`
+still creates float columns as double precision and integer columns as
+BIGINT, and stores float32 values at their shortest decimal form
+(:func:`widen_float32`, shared with the publisher).
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .metrics import record_frame_compaction
+
+COMPACT_DTYPES = os.getenv("INGESTION_COMPACT_DTYPES", "true").lower() in {"1", "true", "yes"}
+
+# Half a cent: prices up to ~$80k survive float32 to the quoted tick.
+PRICE_TOLERANCE = 5e-3
+# Returns, volatilities and scores are dimensionless and small.
+RATIO_TOLERANCE = 1e-6
+# Half a share, for averaged volumes.
+SHARE_TOLERANCE = 0.5
+
+_INT32 = np.iinfo(np.int32)
+
+
+@dataclass(frozen=True)
+class DtypePolicy:
+    """Target dtypes for one table's frames, by column-name glob.
+
+    ``float32`` maps a pattern to the largest absolute error the downcast may
+    introduce; a column that would exceed it stays float64 for that frame.
+    ``integers`` become ``Int32`` when every value is integral and in range,
+    else ``Int64`` if integral, else they are left alone.
+    """
+
+    categorical: Tuple[str, ...] = ("symbol",)
+    float32: Mapping[str, float] = field(default_factory=dict)
+    integers: Tuple[str, ...] = ()
+    datetimes: Tuple[str, ...] = ()
+
+    def convert(self, name: str, column: pd.Series, categories: Optional[pd.CategoricalDtype] = None) -> pd.Series:
+        if _matches(name, self.categorical):
+            return _to_categorical(column, categories)
+        if _matches(name, self.datetimes):
+            return _to_utc_naive(column)
+        if _matches(name, self.integers):
+            return _to_nullable_int(column)
+        for pattern, tolerance in self.float32.items():
+            if fnmatchcase(name, pattern):
+                return _to_float32(column, tolerance)
+        return column
+
+
+POLICIES: Dict[str, DtypePolicy] = {
+    "raw_equity_ohlcv": DtypePolicy(
+        float32={name: PRICE_TOLERANCE for name in ("open", "high", "low", "close", "vw")},
+        integers=("volume", "n"),
+        datetimes=("ts",),
+    ),
+    "equity_price_factors": DtypePolicy(
+        float32={
+            "close": PRICE_TOLERANCE,
+            "return_1d": RATIO_TOLERANCE,
+            "volatility_*": RATIO_TOLERANCE,
+            "volume_ma_*": SHARE_TOLERANCE,
+        },
+        datetimes=("ts",),
+    ),
+    "raw_fundamentals": DtypePolicy(categorical=("symbol", "cik", "metric", "fiscal_period", "form")),
+    "fundamental_quality": DtypePolicy(
+        float32={"revenue_growth": RATIO_TOLERANCE, "margin_score": RATIO_TOLERANCE},
+        integers=("quality_rank",),
+        datetimes=("as_of",),
+    ),
+    "raw_news_sentiment": DtypePolicy(float32={"relevance": RATIO_TOLERANCE, "sentiment": RATIO_TOLERANCE}),
+    "news_sentiment_signals": DtypePolicy(
+        float32={"avg_sentiment": RATIO_TOLERANCE, "avg_relevance": RATIO_TOLERANCE},
+        integers=("article_count",),
+        datetimes=("as_of",),
+    ),
+    "raw_macro_signals": DtypePolicy(categorical=("indicator",), datetimes=("as_of",)),
+    "macro_regime_signals": DtypePolicy(categorical=("regime",), datetimes=("as_of",)),
+    "raw_insider_activity": DtypePolicy(
+        categorical=("symbol", "insider", "role", "transaction_type", "source"),
+        float32={"price": PRICE_TOLERANCE},
+        integers=("shares",),
+    ),
+    "insider_buyback_activity": DtypePolicy(
+        integers=("buy_shares", "sell_shares", "net_shares"),
+        datetimes=("as_of",),
+    ),
+}
+
+
+def symbol_dtype(symbols: Iterable[str]) -> pd.CategoricalDtype:
+    """One categorical dtype for a whole universe, so per-symbol frames concatenate without reverting to object.
+
+    Categories are sorted, so sorting by symbol keeps its lexicographic order.
+    """
+
+    return pd.CategoricalDtype(sorted(set(symbols)))
+
+
+def compact_frame(
+    frame: pd.DataFrame,
+    table: str,
+    *,
+    categories: Optional[Mapping[str, pd.CategoricalDtype]] = None,
+) -> pd.DataFrame:
+    """Return ``frame`` with ``table``'s :data:`POLICIES` applied.
+
+    Unchanged columns are shared with ``frame``, not copied. ``categories``
+    pins the dtype of categorical columns (see :func:`symbol_dtype`). The
+    converted columns' memory before and after is recorded per table in
+    :mod:`ingestion.metrics`. Disabled by ``INGESTION_COMPACT_DTYPES=false``.
+    """
+
+    policy = POLICIES.get(table)
+    if policy is None or frame.empty or not COMPACT_DTYPES:
+        return frame
+    pinned = categories or {}
+    columns: Dict[str, pd.Series] = {}
+    bytes_before = bytes_after = 0
+    for name in frame.columns:
+        column = frame[name]
+        converted = policy.convert(name, column, pinned.get(name))
+        columns[name] = converted
+        if converted is not column:
+            bytes_before += _column_bytes(column)
+            bytes_after += _column_bytes(converted)
+    if not bytes_before:
+        return frame
+    compact = pd.DataFrame(columns, index=frame.index, copy=False)
+    record_frame_compaction(table, bytes_before, bytes_after)
+    return compact
+
+
+def widen_float32(frame: pd.DataFrame) -> pd.DataFrame:
+    """Widen float32 columns to the float64 of their shortest decimal form, for storing or publishing.
+
+    A compacted 185.64 becomes 185.64 again rather than 185.63999938964844.
+    Each value is rounded to 6, then 7, 8 or 9 significant digits, keeping
+    the first that maps back to the same float32: vectorised passes, with
+    no per-value string formatting.
+    """
+
+    narrow = [column for column, dtype in frame.dtypes.items() if dtype == np.float32]
+    if not narrow:
+        return frame
+    return frame.assign(**{str(column): _shortest_float64(frame[column]) for column in narrow})
+
+
+def _shortest_float64(column: pd.Series) -> pd.Series:
+    narrow = column.to_numpy()
+    values = narrow.astype(np.float64)
+    widened = values.copy()
+    pending = np.isfinite(values) & (values != 0)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        exponent = np.floor(np.log10(np.abs(np.where(pending, values, 1.0)))).astype(np.int64)
+        for digits in range(6, 10):
+            shift = digits - 1 - exponent
+            scale = 10.0 ** np.abs(shift)  # exact powers of ten, so the division below rounds correctly
+            candidate = np.where(shift >= 0, np.round(values * scale) / scale, np.round(values / scale) * scale)
+            exact = pending & (candidate.astype(np.float32) == narrow)
+            widened[exact] = candidate[exact]
+            pending &= ~exact
+            if not pending.any():
+                break
+    return pd.Series(widened, index=column.index, name=column.name, copy=False)
+
+
+def _column_bytes(column: pd.Series) -> int:
+    # Categories are shared between frames (see ``symbol_dtype``); only the codes are per frame.
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return int(column.array.codes.nbytes)
+    return int(column.memory_usage(index=False, deep=True))
+
+
+def _matches(name: str, patterns: Iterable[str]) -> bool:
+    return any(fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def _to_categorical(column: pd.Series, categories: Optional[pd.CategoricalDtype]) -> pd.Series:
+    if isinstance(column.dtype, pd.CategoricalDtype) and (categories is None or column.dtype == categories):
+        return column
+    # Values outside the pinned categories would become NaN; fall back to the frame's own categories.
+    if categories is not None and (categories.categories.get_indexer(column.dropna().unique()) >= 0).all():
+        return column.astype(categories)
+    return column.astype("category")
+
+
+def _to_utc_naive(column: pd.Series) -> pd.Series:
+    dtype = column.dtype
+    if pd.api.types.is_datetime64_dtype(dtype):
+        return column
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return column.dt.tz_convert("UTC").dt.tz_localize(None)
+    return pd.to_datetime(column, utc=True).dt.tz_localize(None)
+
+
+def _to_nullable_int(column: pd.Series) -> pd.Series:
+    dtype = column.dtype
+    if not pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        return column
+    values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+    present = values[~np.isnan(values)]
+    if not np.array_equal(present, np.trunc(present)):
+        return column
+    fits_int32 = present.size == 0 or (present.min() >= _INT32.min and present.max() <= _INT32.max)
+    target = "Int32" if fits_int32 else "Int64"
+    return column if dtype == target else column.astype(target)
+
+
+def _to_float32(column: pd.Series, tolerance: float) -> pd.Series:
+    if column.dtype != np.float64:
+        return column
+    values = column.to_numpy()
+    narrowed = values.astype(np.float32)
+    with np.errstate(invalid="ignore", over="ignore"):
+        error = np.abs(narrowed.astype(np.float64) - values)
+    if np.nanmax(error, initial=0.0) > tolerance or np.isinf(narrowed[np.isfinite(values)]).any():
+        return column
+    return pd.Series(narrowed, index=column.index, name=column.name, copy=False)
@@ -0,0 +1,194 @@
+"""Vectorized, symbol-segmented rolling features for curated equity frames."""
+from __future__ import annotations
+
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_WINDOWS: tuple[int, ...] = (5,)
+
+
+def volume_column(window: int) -> str:
+    return f"volume_ma_{window}"
+
+
+def volatility_column(window: int) -> str:
+    return f"volatility_{window}d"
+
+
+def segment_starts(codes: np.ndarray) -> np.ndarray:
+    """Return, for group-contiguous ``codes``, the index where each row's segment begins."""
+
+    size = len(codes)
+    if size == 0:
+        return np.empty(0, dtype=np.int64)
+    boundary = np.empty(size, dtype=bool)
+    boundary[0] = True
+    np.not_equal(codes[1:], codes[:-1], out=boundary[1:])
+    return np.maximum.accumulate(np.where(boundary, np.arange(size), 0))
+
+
+def _cumulative(values: np.ndarray) -> np.ndarray:
+    padded = np.empty(len(values) + 1, dtype=np.float64)
+    padded[0] = 0.0
+    np.cumsum(values, out=padded[1:])
+    return padded
+
+
+class TrailingWindows:
+    """Trailing-window bounds for group-contiguous rows, shared by every statistic.
+
+    ``lower[w][i]`` is the first padded-cumsum index inside row ``i``'s window,
+    clipped to its segment start, so a windowed total is a single gather.
+    """
+
+    def __init__(self, starts: np.ndarray, windows: Sequence[int]) -> None:
+        index_type = np.int32 if len(starts) < np.iinfo(np.int32).max else np.int64
+        upper = np.arange(1, len(starts) + 1, dtype=index_type)
+        starts = starts.astype(index_type, copy=False)
+        self.starts = starts
+        self.windows = tuple(windows)
+        self.lower = {window: np.maximum(upper - window, starts) for window in self.windows}
+        self.full_counts = {window: (upper - self.lower[window]).astype(np.float64) for window in self.windows}
+
+    def totals(self, cumulative: np.ndarray, window: int) -> np.ndarray:
+        below = cumulative.take(self.lower[window])
+        return np.subtract(cumulative[1:], below, out=below)
+
+    def counts(self, window: int, cumulative_valid: np.ndarray | None) -> np.ndarray:
+        if cumulative_valid is None:
+            return self.full_counts[window]
+        return self.totals(cumulative_valid, window)
+
+
+def _valid_counts(valid: np.ndarray) -> np.ndarray | None:
+    return None if valid.all() else _cumulative(valid.astype(np.float64))
+
+
+def grouped_pct_change(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Per-segment ``pct_change`` (no fill), matching ``groupby(...).pct_change()``."""
+
+    previous = np.empty_like(values, dtype=np.float64)
+    previous[1:] = values[:-1]
+    first = starts == np.arange(len(starts))
+    previous[first] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        np.divide(values, previous, out=previous)
+    previous -= 1.0
+    return previous
+
+
+def grouped_rolling_mean(
+    values: np.ndarray,
+    windows: TrailingWindows,
+    *,
+    min_periods: int = 1,
+) -> Dict[int, np.ndarray]:
+    """NaN-aware trailing means for every window from one cumulative pass."""
+
+    valid = ~np.isnan(values)
+    sums = _cumulative(np.where(valid, values, 0.0))
+    counts = _valid_counts(valid)
+    result: Dict[int, np.ndarray] = {}
+    for window in windows.windows:
+        count = windows.counts(window, counts)
+        mean = windows.totals(sums, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean /= count
+        mean[count < min_periods] = np.nan
+        result[window] = mean
+    return result
+
+
+def grouped_rolling_std(
+    values: np.ndarray,
+    windows: TrailingWindows,
+    *,
+    min_periods: int = 1,
+    ddof: int = 1,
+) -> Dict[int, np.ndarray]:
+    """NaN-aware trailing sample standard deviations for every window.
+
+    Values are centred on their segment mean before accumulating so the running
+    sums stay small and the ``sumsq - sum**2 / n`` identity keeps its precision.
+    One scratch array is reused for the centred values and their squares.
+    """
+
+    starts = windows.starts
+    valid = ~np.isnan(values)
+    centred = np.where(valid, values, 0.0)
+    segment_ids = np.cumsum(starts == np.arange(len(starts), dtype=starts.dtype), dtype=starts.dtype)
+    segment_ids -= 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        segment_means = np.bincount(segment_ids, weights=centred) / np.bincount(segment_ids, weights=valid)
+    centred -= np.nan_to_num(segment_means)[segment_ids]
+    del segment_ids
+    centred[~valid] = 0.0
+    sums = _cumulative(centred)
+    squares = _cumulative(np.multiply(centred, centred, out=centred))
+    del centred
+    counts = _valid_counts(valid)
+    result: Dict[int, np.ndarray] = {}
+    for window in windows.windows:
+        count = windows.counts(window, counts)
+        # variance = (sumsq - total**2 / count) / (count - ddof), evaluated in place.
+        total = windows.totals(sums, window)
+        variance = windows.totals(squares, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            total *= total
+            total /= count
+            variance -= total
+            variance /= count - ddof
+        del total
+        np.maximum(variance, 0.0, out=variance)
+        np.sqrt(variance, out=variance)
+        variance[(count < min_periods) | (count <= ddof)] = np.nan
+        result[window] = variance
+    return result
+
+
+def equity_rolling_features(
+    symbols: pd.Series,
+    close: pd.Series,
+    volume: pd.Series,
+    windows: Sequence[int] = DEFAULT_WINDOWS,
+) -> Dict[str, np.ndarray]:
+    """Compute ``return_1d`` plus volume means and return volatilities per window.
+
+    Rows are grouped by symbol (stable, so within-symbol order is preserved, as
+    with ``groupby``), every statistic is derived from shared cumulative sums in
+    one pass, and results are scattered back to the input row order. Inputs
+    are widened to float64 once and each working array is released as soon as
+    its last statistic is computed.
+    """
+
+    codes, _ = pd.factorize(symbols, sort=False)
+    # First-appearance codes are non-decreasing exactly when rows are already symbol-contiguous.
+    order = None if np.all(codes[1:] >= codes[:-1]) else np.argsort(codes, kind="stable")
+    close_values = close.to_numpy(dtype=np.float64, na_value=np.nan)
+    volume_values = volume.to_numpy(dtype=np.float64, na_value=np.nan)
+    if order is not None:
+        codes, close_values, volume_values = codes[order], close_values[order], volume_values[order]
+    starts = segment_starts(codes)
+    del codes
+
+    trailing = TrailingWindows(starts, windows)
+    returns = grouped_pct_change(close_values, starts)
+    del close_values, starts
+    volume_means = grouped_rolling_mean(volume_values, trailing)
+    del volume_values
+    volatilities = grouped_rolling_std(returns, trailing)
+
+    def unsort(values: np.ndarray) -> np.ndarray:
+        if order is None:
+            return values
+        restored = np.empty_like(values)
+        restored[order] = values
+        return restored
+
+    features = {"return_1d": unsort(returns)}
+    for window in windows:
+        features[volume_column(window)] = unsort(volume_means[window])
+        features[volatility_column(window)] = unsort(volatilities[window])
+    return features
@@ -1,22 +1,116 @@
 """Prefect flows orchestrating multi-source data ingestion."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Iterable, List, Optional
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
 
 import pandas as pd
 from prefect import flow, get_run_logger, task
+from prefect.exceptions import MissingContextError
+from sqlalchemy.engine import Connection
 
-from .db import db_session, record_data_freshness, write_dataframe
+from .archive import archive_frame, archive_root, read_archive
+from .backfill import (
+    DEFAULT_CHUNK_DAYS,
+    SymbolBackfillResult,
+    backfill_symbol,
+    group_by_symbol,
+    pending_chunks,
+    plan_chunks,
+)
+from .cdc import CDC_ENABLED, changed_rows
+from .cik_index import refresh_ticker_index
+from .db import (
+    db_session,
+    maintain_price_partitions,
+    merge_dataframe,
+    merge_shard_freshness,
+    read_latest_symbol_times,
+    read_symbol_tail,
+    read_symbol_watermarks,
+    record_data_freshness,
+    record_symbol_watermarks,
+    update_freshness_metrics,
+    write_dataframe,
+)
+from .dtypes import compact_frame, symbol_dtype
+from .metrics import current_flow_metrics, flow_metrics, instrument_stage
+from .news import (
+    NEWS_SEEN_RETENTION_DAYS,
+    apply_news_totals,
+    claim_stories,
+    news_window_start,
+    prune_seen_stories,
+    read_news_cursor,
+    sentiment_signals,
+    unseen_stories,
+)
+from .publish import publish_curated
+from .realtime import OnlineEquityFeatures, PolygonBarFeed, RealtimeReport, ReplayBarFeed, run_bar_stream
+from .sharding import DEFAULT_SHARDS, map_in_processes, partition_symbols, shard_dataset, shard_symbols
+from .streaming import stream_symbols
+from .transforms import FUNDAMENTALS_PLAN, INSIDER_PLAN, MACRO_PLAN, NEWS_PLAN, NEWS_TOTALS_PLAN, equity_price_plan
+from .xbrl import DEFAULT_CONCEPTS
 from .vendors import (
     InsiderActivityClient,
     MacroSignalsClient,
     PolygonClient,
     RavenPackClient,
     SECEdgarClient,
+    VendorRequestError,
 )
 
 DEFAULT_EQUITY_LOOKBACK_DAYS = 365
+DEFAULT_FETCH_CONCURRENCY = int(os.getenv("INGESTION_FETCH_CONCURRENCY", "1"))
+EQUITY_FEATURE_WINDOWS: tuple[int, ...] = tuple(
+    int(window) for window in os.getenv("INGESTION_EQUITY_WINDOWS", "5").split(",") if window.strip()
+)
+DEFAULT_LOAD_MODE = os.getenv("INGESTION_LOAD_MODE", "append")
+DEFAULT_PARALLEL_SOURCES = os.getenv("INGESTION_PARALLEL_SOURCES", "false").lower() in {"1", "true", "yes"}
+DEFAULT_STREAMING = os.getenv("INGESTION_STREAMING", "false").lower() in {"1", "true", "yes"}
+DEFAULT_STREAM_BATCH_ROWS = int(os.getenv("INGESTION_STREAM_BATCH_ROWS", "250000"))
+DEFAULT_REALTIME_FLUSH_ROWS = int(os.getenv("INGESTION_REALTIME_FLUSH_ROWS", "500"))
+DEFAULT_REALTIME_FLUSH_SECONDS = float(os.getenv("INGESTION_REALTIME_FLUSH_SECONDS", "5"))
+
+# Natural keys used by the ``merge`` load mode to upsert instead of append.
+# Quarterly and year-to-date facts share a ``period_end``, so filings are keyed
+# by period start too; ``form`` keeps a 10-K/A apart from the 10-K it amends.
+NATURAL_KEYS: Dict[str, tuple[str, ...]] = {
+    "raw_equity_ohlcv": ("symbol", "ts"),
+    "equity_price_factors": ("symbol", "ts"),
+    "raw_fundamentals": ("symbol", "metric", "period_start", "period_end", "form"),
+    "fundamental_quality": ("symbol", "as_of"),
+    "raw_news_sentiment": ("symbol", "event_time", "headline"),
+    "news_sentiment_signals": ("symbol", "as_of"),
+    "raw_macro_signals": ("indicator", "as_of"),
+    "macro_regime_signals": ("as_of",),
+    "raw_insider_activity": ("symbol", "insider", "transaction_type", "transaction_date"),
+    "insider_buyback_activity": ("symbol", "as_of"),
+}
+
+FUNDAMENTALS_COLUMNS = ["symbol", "cik", "metric", "value", "period_start", "period_end", "fiscal_period", "form"]
+
+_LOGGER = logging.getLogger(__name__)
+
+# Called inside the load transaction with ``(conn, raw, curated)``; returns the frames to load.
+PrepareLoad = Callable[[Connection, pd.DataFrame, pd.DataFrame], Tuple[pd.DataFrame, pd.DataFrame]]
+
+
+def _logger() -> logging.Logger | logging.LoggerAdapter:
+    """Return the Prefect run logger, falling back to the module logger outside a run."""
+
+    try:
+        return get_run_logger()
+    except MissingContextError:
+        return _LOGGER
 
 
 def _window(days: int) -> tuple[datetime, datetime]:
@@ -25,6 +119,107 @@ def _window(days: int) -> tuple[datetime, datetime]:
     return start, end
 
 
+def _rolling_overlap_days(bars: int) -> int:
+    """Calendar days that safely cover ``bars`` trading sessions plus the prior close.
+
+    Allows for weekends and a week of exchange holidays so rolling windows that
+    straddle a watermark are recomputed from complete history.
+    """
+
+    return (bars + 1) * 7 // 5 + 7
+
+
+def _after_watermarks(df: pd.DataFrame, watermarks: Mapping[str, datetime], column: str = "ts") -> pd.DataFrame:
+    """Drop rows at or before each symbol's watermark; symbols without one pass through."""
+
+    if df.empty or not watermarks:
+        return df
+    marks = pd.to_datetime(df["symbol"].map(watermarks))
+    keep = marks.isna() | (pd.to_datetime(df[column]) > marks)
+    return df.loc[keep]
+
+
+def _time_column(df: pd.DataFrame) -> Optional[str]:
+    if df.empty:
+        return None
+    for candidate in ("as_of", "ts", "timestamp"):
+        if candidate in df.columns:
+            return candidate
+    return None
+
+
+def _load_frame(
+    conn: Connection,
+    df: pd.DataFrame,
+    table: str,
+    *,
+    schema: Optional[str] = None,
+    mode: str = "append",
+) -> None:
+    keys = NATURAL_KEYS.get(table)
+    if mode == "merge" and keys:
+        merge_dataframe(conn, df, table, key_columns=keys, schema=schema)
+    else:
+        write_dataframe(conn, df, table, schema=schema)
+
+
+def _changed_rows(conn: Connection, df: pd.DataFrame, table: str, *, schema: Optional[str] = None) -> pd.DataFrame:
+    """Diff stage ahead of :func:`_load_frame`: the rows of ``df`` that are new or changed (see :mod:`ingestion.cdc`).
+
+    Tables without :data:`NATURAL_KEYS` pass through unchanged, as does everything unless ``INGESTION_CDC=true``.
+    """
+
+    keys = NATURAL_KEYS.get(table)
+    if not CDC_ENABLED or not keys or df.empty:
+        return df
+    return changed_rows(conn, df, table, key_columns=keys, schema=schema)
+
+
+def _load_changes(
+    conn: Connection,
+    df: pd.DataFrame,
+    *,
+    table: str,
+    schema: Optional[str] = None,
+    mode: str = "append",
+) -> pd.DataFrame:
+    """Load the new or changed rows of ``df`` into ``table`` and return them."""
+
+    changes = _changed_rows(conn, df, table, schema=schema)
+    if not changes.empty:
+        _load_frame(conn, changes, table, schema=schema, mode=mode)
+    return changes
+
+
+def _load_backfilled_equities(conn: Connection, curated_df: pd.DataFrame, *, mode: str = "append") -> pd.DataFrame:
+    """Load one backfilled chunk's curated bars and advance the equities watermarks in the same transaction."""
+
+    changes = _load_changes(conn, curated_df, table="equity_price_factors", schema="factor_inputs", mode=mode)
+    record_symbol_watermarks(conn, dataset="equities", watermarks=_symbol_watermarks(curated_df, "ts"))
+    record_data_freshness(
+        conn,
+        dataset="equities",
+        last_updated=pd.Timestamp(curated_df["ts"].max()).to_pydatetime(),
+        row_count=len(curated_df),
+        advance_only=True,
+    )
+    return changes
+
+
+def _store_run_metrics(dataset: str) -> None:
+    """Store the run's summary on ``dataset``'s freshness row when the flow finishes, so the load is included."""
+
+    run_metrics = current_flow_metrics()
+    if run_metrics is None:
+        return
+
+    def store(summary: Dict[str, Any]) -> None:
+        with db_session() as conn:
+            update_freshness_metrics(conn, dataset=dataset, metrics=summary)
+
+    run_metrics.on_finish(dataset, store)
+
+
 def _persist_dataset(
     dataset: str,
     raw_df: pd.DataFrame,
@@ -33,78 +228,216 @@ def _persist_dataset(
     raw_table: str,
     curated_table: str,
     curated_schema: Optional[str] = None,
+    load_mode: Optional[str] = None,
+    freshness_dataset: Optional[str] = None,
+    prepare: Optional[PrepareLoad] = None,
 ) -> None:
+    """Load raw and curated frames and record freshness in one transaction.
+
+    The current run's :class:`~ingestion.metrics.FlowMetrics` summary (fetch and
+    transform stages, vendor calls and these writes) is stored with the
+    freshness row. ``load_mode`` (default ``INGESTION_LOAD_MODE``) is ``append`` or ``merge``;
+    ``merge`` upserts on :data:`NATURAL_KEYS` so reloads stay idempotent.
+    ``freshness_dataset`` overrides the ``data_freshness`` key (a shard's own
+    row); per-symbol watermarks are always recorded under ``dataset``. Once the
+    transaction commits, the curated rows are published to the dataset's Kafka
+    topic (see :mod:`ingestion.publish`). ``prepare`` runs first inside the
+    transaction and returns the ``(raw, curated)`` frames to load instead.
+    With ``INGESTION_CDC=true``, only rows that are new or changed since their
+    last load are written and published (:func:`_changed_rows`). Freshness and
+    watermarks still cover the whole curated frame.
+    """
+
+    mode = load_mode or DEFAULT_LOAD_MODE
+    if mode not in {"append", "merge"}:
+        raise ValueError(f"Unsupported load mode: {mode}")
     with db_session() as conn:
-        if not raw_df.empty:
-            write_dataframe(conn, raw_df, raw_table)
-        if not curated_df.empty:
-            write_dataframe(conn, curated_df, curated_table, schema=curated_schema)
+        if prepare is not None:
+            raw_df, curated_df = prepare(conn, raw_df, curated_df)
+        raw_changes = _changed_rows(conn, raw_df, raw_table)
+        curated_changes = _changed_rows(conn, curated_df, curated_table, schema=curated_schema)
+        if not raw_changes.empty:
+            _load_frame(conn, raw_changes, raw_table, mode=mode)
+        if not curated_changes.empty:
+            _load_frame(conn, curated_changes, curated_table, schema=curated_schema, mode=mode)
         as_of_value = datetime.utcnow()
-        for candidate in ("as_of", "ts", "timestamp"):
-            if candidate in curated_df.columns and not curated_df.empty:
-                as_of_value = pd.to_datetime(curated_df[candidate]).max()
-                break
+        time_column = _time_column(curated_df)
+        if time_column is not None:
+            as_of_value = pd.to_datetime(curated_df[time_column]).max().to_pydatetime()
         record_data_freshness(
             conn,
-            dataset=dataset,
+            dataset=freshness_dataset or dataset,
             last_updated=as_of_value,
             row_count=int(curated_df.shape[0]),
+            advance_only=True,
         )
+        _store_run_metrics(freshness_dataset or dataset)
+        if time_column is not None:
+            record_symbol_watermarks(conn, dataset=dataset, watermarks=_symbol_watermarks(curated_df, time_column))
+    publish_curated(dataset, curated_changes)
+
+
+def _symbol_watermarks(curated_df: pd.DataFrame, time_column: str) -> Dict[str, datetime]:
+    if curated_df.empty or "symbol" not in curated_df.columns:
+        return {}
+    return pd.to_datetime(curated_df[time_column]).groupby(curated_df["symbol"], observed=True).max().to_dict()
+
+
+@task(name="replay_raw_archive")
+@instrument_stage()
+def replay_raw_archive(
+    dataset: str,
+    raw_table: str,
+    start: date,
+    end: Optional[date] = None,
+    symbols: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """Read the raw frames archived for ``dataset`` between ``start`` and ``end`` instead of calling the vendor.
+
+    The dates are UTC fetch dates, and ``end`` defaults to today. Where fetches
+    overlap, the newest row per natural key wins. ``symbols`` keeps only
+    those symbols' rows. The result is ordered by natural key, as fetches are.
+    """
+
+    if archive_root() is None:
+        raise RuntimeError("Replay needs INGESTION_ARCHIVE_DIR to point at the raw archive")
+    keys = NATURAL_KEYS.get(raw_table)
+    raw = read_archive(dataset, start, end or datetime.utcnow().date(), key_columns=keys)
+    if raw.empty:
+        _logger().warning("No archived %s data between %s and %s", dataset, start, end or "today")
+        return raw
+    if symbols is not None and "symbol" in raw.columns:
+        raw = raw.loc[raw["symbol"].isin(list(symbols))]
+    if keys:
+        raw = raw.sort_values(list(keys), kind="stable")
+    return compact_frame(raw.reset_index(drop=True), raw_table)
+
+
+@task(name="read_equity_warmup")
+@instrument_stage()
+def read_equity_warmup(raw_df: pd.DataFrame, bars: int) -> Tuple[pd.DataFrame, Dict[str, datetime]]:
+    """Read each symbol's last ``bars`` stored raw bars before its first bar in ``raw_df``.
+
+    Replayed bars start mid-history, so their rolling features are computed
+    over this tail plus the replay. Returns the tail and, per symbol, the last
+    warm-up bar's time, to drop the tail's rows from the curated output.
+    """
+
+    if raw_df.empty:
+        return raw_df.head(0), {}
+    firsts = pd.to_datetime(raw_df["ts"]).groupby(raw_df["symbol"], observed=True).min()
+    tails: List[pd.DataFrame] = []
+    with db_session() as conn:
+        for symbol, first in firsts.items():
+            tail = read_symbol_tail(conn, "raw_equity_ohlcv", symbol=symbol, before=first.to_pydatetime(), limit=bars)
+            if not tail.empty:
+                tails.append(tail.reindex(columns=raw_df.columns))
+    if not tails:
+        return raw_df.head(0), {}
+    history = pd.concat(tails, ignore_index=True)
+    marks = pd.to_datetime(history["ts"]).groupby(history["symbol"]).max().to_dict()
+    return compact_frame(history, "raw_equity_ohlcv"), marks
+
+
+def _fetch_symbol_bars(client: PolygonClient, symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
+    """Fetch one symbol, isolating vendor failures so the rest of the universe still loads."""
+
+    try:
+        return client.get_aggregates(symbol, start, end)
+    except VendorRequestError as exc:
+        _logger().error("Equity fetch failed for symbol %s: %s", symbol, exc)
+        return pd.DataFrame()
 
 
 @task(name="fetch_equity_prices")
+@instrument_stage()
 def fetch_equity_prices(
     symbols: Iterable[str],
     *,
     start: Optional[datetime] = None,
     end: Optional[datetime] = None,
+    max_workers: Optional[int] = None,
+    starts: Optional[Mapping[str, datetime]] = None,
+    shard: int = 0,
 ) -> pd.DataFrame:
-    logger = get_run_logger()
+    """Fetch daily bars for ``symbols``.
+
+    ``max_workers`` (default ``INGESTION_FETCH_CONCURRENCY``) bounds the number of
+    in-flight vendor requests; all workers share the keep-alive pool from
+    :func:`ingestion.vendors.get_session`. Results are combined in input order, so
+    the output frame is identical to a sequential fetch.
+
+    ``starts`` overrides ``start`` per symbol, which is how incremental runs
+    request only the bars after each symbol's watermark. Each symbol's bars are
+    compacted as they arrive, with one symbol categorical for the whole
+    universe, so the combined frame never exists in its wide form. The
+    combined frame is archived under ``shard`` (see :mod:`ingestion.archive`).
+    """
+
+    logger = _logger()
     if start is None or end is None:
         start, end = _window(DEFAULT_EQUITY_LOOKBACK_DAYS)
+    workers = max_workers or DEFAULT_FETCH_CONCURRENCY
     client = PolygonClient.from_env()
-    frames: List[pd.DataFrame] = []
-    for symbol in symbols:
-        frame = client.get_aggregates(symbol, start, end)
+    symbol_list = list(symbols)
+    symbol_starts = starts or {}
+    categories = {"symbol": symbol_dtype(symbol_list)}
+
+    def fetch(symbol: str) -> pd.DataFrame:
+        frame = _fetch_symbol_bars(client, symbol, symbol_starts.get(symbol, start), end)
+        return compact_frame(frame, "raw_equity_ohlcv", categories=categories)
+
+    if workers > 1 and len(symbol_list) > 1:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="polygon-fetch") as executor:
+            # Each worker runs in a copy of this context so vendor metrics reach the flow summary.
+            futures = [executor.submit(contextvars.copy_context().run, fetch, symbol) for symbol in symbol_list]
+            results = [future.result() for future in futures]
+    else:
+        results = [fetch(symbol) for symbol in symbol_list]
+    frames: List[tuple[str, pd.DataFrame]] = []
+    for symbol, frame in zip(symbol_list, results):
         if frame.empty:
             logger.warning("No equity bars returned for symbol %s", symbol)
             continue
-        frames.append(frame)
+        frames.append((symbol, frame))
     if not frames:
         return pd.DataFrame(columns=["symbol", "ts", "open", "high", "low", "close", "volume"])
-    combined = pd.concat(frames, ignore_index=True)
-    combined.sort_values(["symbol", "ts"], inplace=True)
+    # Concatenating in symbol order avoids re-sorting (and copying) the combined frame
+    # whenever each symbol's bars already arrive in time order, as vendors return them.
+    frames.sort(key=lambda item: item[0])
+    combined = pd.concat([frame for _, frame in frames], ignore_index=True)
+    presorted = len({symbol for symbol, _ in frames}) == len(frames) and all(
+        frame["ts"].is_monotonic_increasing for _, frame in frames
+    )
+    if not presorted:
+        combined.sort_values(["symbol", "ts"], inplace=True)
+    archive_frame("equities", combined, shard=shard)
     return combined
 
 
 @task(name="transform_equity_prices")
-def transform_equity_prices(raw_df: pd.DataFrame) -> pd.DataFrame:
+@instrument_stage()
+def transform_equity_prices(raw_df: pd.DataFrame, windows: Optional[Sequence[int]] = None) -> pd.DataFrame:
+    """Derive daily returns plus rolling volume means and volatilities per symbol.
+
+    ``windows`` (default ``INGESTION_EQUITY_WINDOWS``) adds ``volume_ma_{w}`` and
+    ``volatility_{w}d`` for every window in one vectorized pass (see
+    :func:`~ingestion.transforms.equity_price_plan`).
+    """
+
     if raw_df.empty:
         return raw_df
-    curated = raw_df.copy()
-    curated["return_1d"] = curated.groupby("symbol")["close"].pct_change()
-    curated["volume_ma_5"] = (
-        curated.groupby("symbol")["volume"].transform(lambda s: s.rolling(window=5, min_periods=1).mean())
-    )
-    curated["volatility_5d"] = (
-        curated.groupby("symbol")["return_1d"].transform(lambda s: s.rolling(window=5, min_periods=1).std())
-    )
-    curated.dropna(subset=["return_1d"], inplace=True)
-    curated.rename(columns={"ts": "ts"}, inplace=True)
-    curated = curated[[
-        "symbol",
-        "ts",
-        "close",
-        "return_1d",
-        "volume_ma_5",
-        "volatility_5d",
-    ]]
-    curated["ts"] = pd.to_datetime(curated["ts"])
-    return curated
+    return equity_price_plan(tuple(windows or EQUITY_FEATURE_WINDOWS))(raw_df)
 
 
 @task(name="load_equity_prices")
-def load_equity_prices(raw_df: pd.DataFrame, curated_df: pd.DataFrame) -> None:
+@instrument_stage()
+def load_equity_prices(
+    raw_df: pd.DataFrame,
+    curated_df: pd.DataFrame,
+    freshness_dataset: Optional[str] = None,
+    load_mode: Optional[str] = None,
+) -> None:
     _persist_dataset(
         "equities",
         raw_df,
@@ -112,79 +445,491 @@ def load_equity_prices(raw_df: pd.DataFrame, curated_df: pd.DataFrame) -> None:
         raw_table="raw_equity_ohlcv",
         curated_table="equity_price_factors",
         curated_schema="factor_inputs",
+        load_mode=load_mode,
+        freshness_dataset=freshness_dataset,
+    )
+
+
+@task(name="stream_equity_prices")
+@instrument_stage()
+def stream_equity_prices(
+    symbols: Iterable[str],
+    *,
+    start: datetime,
+    end: datetime,
+    starts: Optional[Mapping[str, datetime]] = None,
+    watermarks: Optional[Mapping[str, datetime]] = None,
+    max_workers: Optional[int] = None,
+    batch_rows: Optional[int] = None,
+    load_mode: Optional[str] = None,
+    freshness_dataset: Optional[str] = None,
+    shard: int = 0,
+) -> Dict[str, Any]:
+    """Fetch, transform and load equities page by page with bounded memory.
+
+    Each symbol's response pages are transformed as they arrive, with the last
+    ``max(windows)`` bars carried into the next page. Loads happen in batches
+    of about ``batch_rows`` raw rows (default ``INGESTION_STREAM_BATCH_ROWS``).
+    Each batch is one transaction that also advances its symbols' watermarks,
+    so an interrupted incremental run resumes after the last loaded batch.
+    Its curated rows are published once it commits, and its raw rows are
+    archived under ``shard``.
+    Peak memory depends on the batch size, not on universe × history.
+    """
+
+    client = PolygonClient.from_env()
+    windows = EQUITY_FEATURE_WINDOWS
+    mode = load_mode or DEFAULT_LOAD_MODE
+    symbol_list = list(symbols)
+    symbol_starts = starts or {}
+    marks = watermarks or {}
+    categories = {"symbol": symbol_dtype(symbol_list)}
+
+    def fetch_pages(symbol: str) -> Iterable[pd.DataFrame]:
+        for page in client.iter_aggregate_pages(symbol, symbol_starts.get(symbol, start), end):
+            yield compact_frame(page, "raw_equity_ohlcv", categories=categories)
+
+    def keep(symbol: str, frame: pd.DataFrame) -> pd.DataFrame:
+        return _after_watermarks(frame, {symbol: marks[symbol]}) if symbol in marks else frame
+
+    def load_batch(raw: pd.DataFrame, curated: pd.DataFrame) -> None:
+        archive_frame("equities", raw, shard=shard)
+        with db_session() as conn:
+            _load_changes(conn, raw, table="raw_equity_ohlcv", mode=mode)
+            if not curated.empty:
+                record_symbol_watermarks(conn, dataset="equities", watermarks=_symbol_watermarks(curated, "ts"))
+                curated = _load_changes(conn, curated, table="equity_price_factors", schema="factor_inputs", mode=mode)
+        publish_curated("equities", curated)
+
+    report = stream_symbols(
+        symbol_list,
+        fetch_pages,
+        transform=lambda frame: transform_equity_prices.fn(frame, windows),
+        load_batch=load_batch,
+        tail_rows=max(windows),
+        batch_rows=batch_rows or DEFAULT_STREAM_BATCH_ROWS,
+        max_workers=max_workers or DEFAULT_FETCH_CONCURRENCY,
+        keep=keep if marks else None,
     )
+    for symbol in report.failed_symbols:
+        _logger().error("Equity stream skipped symbol %s", symbol)
+    with db_session() as conn:
+        record_data_freshness(
+            conn,
+            dataset=freshness_dataset or "equities",
+            last_updated=report.last_updated or datetime.utcnow(),
+            row_count=report.curated_rows,
+            advance_only=True,
+        )
+    _store_run_metrics(freshness_dataset or "equities")
+    return asdict(report)
+
+
+@task(name="resolve_equity_watermarks")
+def resolve_equity_watermarks(symbols: Iterable[str]) -> Dict[str, datetime]:
+    """Read per-symbol watermarks; symbols without one get their newest stored bar, if any.
+
+    Bars loaded before per-symbol watermarks were recorded still count, while
+    a newly added symbol has no mark and gets the full lookback.
+    """
+
+    symbol_list = list(symbols)
+    with db_session() as conn:
+        watermarks = read_symbol_watermarks(conn, "equities", symbol_list)
+        missing = [symbol for symbol in symbol_list if symbol not in watermarks]
+        watermarks.update(read_latest_symbol_times(conn, "raw_equity_ohlcv", missing))
+    return watermarks
 
 
 @flow(name="equities_ingestion")
-def equities_ingestion_flow(symbols: Iterable[str], days: int = DEFAULT_EQUITY_LOOKBACK_DAYS) -> None:
+def equities_ingestion_flow(
+    symbols: Iterable[str],
+    days: int = DEFAULT_EQUITY_LOOKBACK_DAYS,
+    max_workers: Optional[int] = None,
+    incremental: bool = False,
+    shard: Optional[int] = None,
+    shards: int = 1,
+    streaming: Optional[bool] = None,
+    batch_rows: Optional[int] = None,
+    replay_start: Optional[date] = None,
+    replay_end: Optional[date] = None,
+) -> None:
+    """Fetch, transform and load daily bars.
+
+    With ``incremental=True`` each symbol is fetched from its stored watermark
+    minus enough overlap to recompute the rolling features, and only bars after
+    the watermark are loaded. Symbols without a watermark get the full ``days``
+    lookback.
+
+    With ``shard`` set, the run keeps only the symbols that hash to that shard
+    of ``shards`` and records freshness under the shard's own key, so every
+    shard can run on its own process or Prefect worker against the same
+    universe. :func:`merge_shard_freshness_task` folds the shard rows together.
+
+    ``streaming`` (default ``INGESTION_STREAMING``) runs
+    :func:`stream_equity_prices` instead of materialising the whole universe,
+    loading in ``batch_rows`` batches.
+
+    With ``replay_start`` set, the bars archived between ``replay_start`` and
+    ``replay_end`` are re-processed instead of fetched (see
+    :func:`replay_raw_archive`). Their rolling features are warmed up from the
+    stored bars before each symbol's first replayed bar
+    (:func:`read_equity_warmup`). They are merged on their natural keys, and
+    ``days``, ``incremental`` and ``streaming`` are ignored.
+    """
+
+    symbol_list = list(symbols)
+    freshness_dataset: Optional[str] = None
+    if shard is not None:
+        symbol_list = shard_symbols(symbol_list, shard, shards)
+        freshness_dataset = shard_dataset("equities", shard, shards)
     start, end = _window(days)
-    raw = fetch_equity_prices(symbols, start=start, end=end)
-    curated = transform_equity_prices(raw)
-    load_equity_prices(raw, curated)
+    watermarks: Dict[str, datetime] = {}
+    starts: Optional[Dict[str, datetime]] = None
+    with flow_metrics("equities"):
+        if replay_start is not None:
+            raw = replay_raw_archive("equities", "raw_equity_ohlcv", replay_start, replay_end, symbols=symbol_list)
+            history, history_marks = read_equity_warmup(raw, max(EQUITY_FEATURE_WINDOWS) + 1)
+            warmed = pd.concat([history, raw], ignore_index=True) if not history.empty else raw
+            curated = _after_watermarks(transform_equity_prices(warmed), history_marks)
+            load_equity_prices(raw, curated, freshness_dataset, load_mode="merge")
+            return
+        if incremental:
+            watermarks = resolve_equity_watermarks(symbol_list)
+            overlap = timedelta(days=_rolling_overlap_days(max(EQUITY_FEATURE_WINDOWS)))
+            starts = {symbol: mark - overlap for symbol, mark in watermarks.items()}
+        if DEFAULT_STREAMING if streaming is None else streaming:
+            stream_equity_prices(
+                symbol_list,
+                start=start,
+                end=end,
+                starts=starts,
+                watermarks=watermarks,
+                max_workers=max_workers,
+                batch_rows=batch_rows,
+                freshness_dataset=freshness_dataset,
+                shard=shard or 0,
+            )
+            return
+        raw = fetch_equity_prices(
+            symbol_list, start=start, end=end, max_workers=max_workers, starts=starts, shard=shard or 0
+        )
+        curated = transform_equity_prices(raw)
+        if watermarks:
+            raw = _after_watermarks(raw, watermarks)
+            curated = _after_watermarks(curated, watermarks)
+        load_equity_prices(raw, curated, freshness_dataset)
 
 
-def _enumerate_ciks(symbols: Iterable[str]) -> List[tuple[str, str]]:
-    return [(symbol, f"{idx+1:010d}") for idx, symbol in enumerate(symbols)]
+def _run_equities_shard(
+    shard: int,
+    *,
+    symbols: Sequence[str],
+    shards: int,
+    days: int,
+    max_workers: Optional[int],
+    incremental: bool,
+    replay_start: Optional[date] = None,
+    replay_end: Optional[date] = None,
+) -> Optional[str]:
+    """Worker-process entry point for one equities shard; returns the error, if any."""
+
+    try:
+        equities_ingestion_flow(
+            symbols,
+            days=days,
+            max_workers=max_workers,
+            incremental=incremental,
+            shard=shard,
+            shards=shards,
+            replay_start=replay_start,
+            replay_end=replay_end,
+        )
+    except Exception as exc:  # noqa: BLE001 - a failed shard must not hide the others' results
+        return f"{type(exc).__name__}: {exc}"
+    return None
+
+
+@task(name="merge_shard_freshness")
+def merge_shard_freshness_task(dataset: str, shards: int, since: Optional[datetime] = None) -> Dict[str, Any]:
+    """Merge the shard rows; rows written before ``since`` (the run start) count as missing."""
+
+    names = [shard_dataset(dataset, shard, shards) for shard in range(shards)]
+    with db_session() as conn:
+        return merge_shard_freshness(conn, dataset=dataset, shard_datasets=names, since=since)
+
+
+@flow(name="equities_sharded_ingestion")
+def sharded_equities_ingestion_flow(
+    symbols: Iterable[str],
+    shards: Optional[int] = None,
+    max_processes: Optional[int] = None,
+    days: int = DEFAULT_EQUITY_LOOKBACK_DAYS,
+    max_workers: Optional[int] = None,
+    incremental: bool = False,
+    raise_on_failure: bool = True,
+    replay_start: Optional[date] = None,
+    replay_end: Optional[date] = None,
+) -> Dict[str, Any]:
+    """Run :func:`equities_ingestion_flow` once per symbol shard in worker processes.
+
+    ``shards`` (default ``INGESTION_SHARDS``, else the CPU count) partitions the
+    universe by stable hash; each shard fetches, transforms and loads in its
+    own spawned process. To spread across nodes instead, deploy
+    ``equities_ingestion_flow`` with ``shard``/``shards`` parameters and run
+    :func:`merge_shard_freshness_task` when they finish. Returns the merged
+    freshness record plus per-shard errors. A shard that fails in this run
+    makes the merged status ``partial``, even if it left a row from an earlier run. ``replay_start``/``replay_end``
+    make every shard replay its symbols from the raw archive.
+    """
+
+    symbol_list = list(symbols)
+    shard_count = max(1, shards or DEFAULT_SHARDS)
+    run = partial(
+        _run_equities_shard,
+        symbols=symbol_list,
+        shards=shard_count,
+        days=days,
+        max_workers=max_workers,
+        incremental=incremental,
+        replay_start=replay_start,
+        replay_end=replay_end,
+    )
+    started = datetime.utcnow()
+    errors = map_in_processes(run, list(range(shard_count)), max_processes)
+    failed = {shard_dataset("equities", shard, shard_count): error for shard, error in enumerate(errors) if error}
+    report = merge_shard_freshness_task("equities", shard_count, since=started)
+    report["errors"] = failed
+    if failed:
+        _logger().error("Equity shards failed: %s", failed)
+        if raise_on_failure:
+            raise RuntimeError(f"Equity ingestion failed for shards: {', '.join(failed)}")
+    return report
+
+
+@flow(name="equities_backfill")
+def equities_backfill_flow(
+    symbols: Iterable[str],
+    start: date,
+    end: date,
+    chunk_days: int = DEFAULT_CHUNK_DAYS,
+    max_workers: Optional[int] = None,
+    load_mode: Optional[str] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Backfill daily bars for ``[start, end]`` in resumable ``chunk_days`` chunks.
+
+    Chunks already recorded in ``ingestion_checkpoints`` are skipped, so rerunning
+    after an interruption only fetches what is missing. Symbols are processed
+    concurrently (``max_workers``); each symbol's chunks run oldest first.
+    Every chunk's load advances the per-symbol watermarks and the ``equities``
+    freshness row (never backwards), so incremental runs pick up where the
+    backfill got to. Returns a per-symbol report of loaded/skipped chunks, rows and errors.
+    """
+
+    logger = _logger()
+    symbol_list = list(symbols)
+    planned = plan_chunks(symbol_list, start, end, chunk_days)
+    pending = group_by_symbol(pending_chunks(planned, "equities"))
+    planned_counts = {symbol: len(chunks) for symbol, chunks in group_by_symbol(planned).items()}
+    client = PolygonClient.from_env()
+    mode = load_mode or DEFAULT_LOAD_MODE
+    windows = EQUITY_FEATURE_WINDOWS
+
+    def run(symbol: str) -> SymbolBackfillResult:
+        return backfill_symbol(
+            client,
+            symbol,
+            pending.get(symbol, []),
+            dataset="equities",
+            raw_table="raw_equity_ohlcv",
+            transform=lambda frame: transform_equity_prices.fn(frame, windows),
+            load_raw=partial(_load_changes, table="raw_equity_ohlcv", mode=mode),
+            load_curated=partial(_load_backfilled_equities, mode=mode),
+            tail_rows=max(windows),
+        )
+
+    workers = max_workers or DEFAULT_FETCH_CONCURRENCY
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="polygon-backfill") as executor:
+        results = list(executor.map(run, symbol_list))
+    report: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        result.chunks_skipped = planned_counts.get(result.symbol, 0) - len(pending.get(result.symbol, []))
+        report[result.symbol] = asdict(result)
+    logger.info(
+        "Backfill loaded %d chunks (%d skipped, %d failed symbols)",
+        sum(item["chunks_loaded"] for item in report.values()),
+        sum(item["chunks_skipped"] for item in report.values()),
+        sum(1 for item in report.values() if item["error"]),
+    )
+    return report
+
+
+def _seed_realtime_equities(symbols: Iterable[str], before: datetime, windows: Sequence[int]) -> OnlineEquityFeatures:
+    """Warm the online features from each symbol's stored bars before ``before``."""
+
+    features = OnlineEquityFeatures(windows)
+    with db_session() as conn:
+        for symbol in symbols:
+            tail = read_symbol_tail(conn, "raw_equity_ohlcv", symbol=symbol, before=before, limit=max(windows) + 1)
+            features.seed(tail)
+    return features
+
+
+@flow(name="equities_realtime")
+def realtime_equities_flow(
+    symbols: Iterable[str],
+    replay_days: Optional[int] = None,
+    replay_interval: float = 0.0,
+    max_bars: Optional[int] = None,
+    flush_rows: Optional[int] = None,
+    flush_seconds: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Stream bar updates into the raw and curated equity tables in micro-batches.
+
+    With ``POLYGON_API_KEY`` set and no ``replay_days`` this follows Polygon's
+    websocket feed until ``max_bars`` updates (forever by default). Otherwise
+    the last ``replay_days`` (default 5) of vendor bars are replayed as a local
+    stand-in, paced by ``replay_interval`` seconds. ``return_1d``,
+    ``volume_ma_{w}`` and ``volatility_{w}d`` are maintained online per
+    symbol, warmed from stored bars. They match :func:`transform_equity_prices`.
+
+    Batches flush every ``flush_rows`` bars or ``flush_seconds`` (defaults
+    ``INGESTION_REALTIME_FLUSH_ROWS``/``INGESTION_REALTIME_FLUSH_SECONDS``).
+    They are always merged, since the current session's bar is revised until the
+    close. Each batch commits with a ``equities_realtime`` freshness row and is
+    then published. The ``equities`` watermarks are left alone, so the daily
+    run still loads the final bar and should use ``INGESTION_LOAD_MODE=merge``.
+    """
+
+    symbol_list = list(symbols)
+    windows = EQUITY_FEATURE_WINDOWS
+    client = PolygonClient.from_env()
+    categories = {"symbol": symbol_dtype(symbol_list)}
+    if client.api_key and replay_days is None:
+        # A stored bar for the live session is seeded too; the feed's updates then revise it.
+        before = datetime.utcnow()
+        feed: Iterable[Any] = PolygonBarFeed(client.api_key, symbol_list, idle_timeout=1.0)
+    else:
+        start, end = _window(replay_days or 5)
+        frames = [_fetch_symbol_bars(client, symbol, start, end) for symbol in symbol_list]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            _logger().warning("No equity bars to replay for %d symbols", len(symbol_list))
+            return asdict(RealtimeReport())
+        bars = pd.concat(frames, ignore_index=True)
+        before = pd.Timestamp(bars["ts"].min()).to_pydatetime()
+        feed = ReplayBarFeed(bars, interval=replay_interval)
+
+    def load_batch(raw: pd.DataFrame, curated: pd.DataFrame) -> None:
+        raw = compact_frame(raw, "raw_equity_ohlcv", categories=categories)
+        curated = compact_frame(curated, "equity_price_factors", categories=categories)
+        with db_session() as conn:
+            _load_changes(conn, raw, table="raw_equity_ohlcv", mode="merge")
+            if not curated.empty:
+                record_data_freshness(
+                    conn,
+                    dataset="equities_realtime",
+                    last_updated=pd.Timestamp(curated["ts"].max()).to_pydatetime(),
+                    row_count=len(curated),
+                )
+                curated = _load_changes(
+                    conn, curated, table="equity_price_factors", schema="factor_inputs", mode="merge"
+                )
+        publish_curated("equities", curated)
+
+    with flow_metrics("equities_realtime"):
+        features = _seed_realtime_equities(symbol_list, before, windows)
+        report = run_bar_stream(
+            feed,
+            features,
+            load_batch=load_batch,
+            flush_rows=flush_rows or DEFAULT_REALTIME_FLUSH_ROWS,
+            flush_seconds=flush_seconds if flush_seconds is not None else DEFAULT_REALTIME_FLUSH_SECONDS,
+            max_bars=max_bars,
+        )
+    _logger().info(
+        "Realtime equities: %d bars (%d late) in %d batches, %d curated rows",
+        report.bars,
+        report.late_bars,
+        report.batches,
+        report.curated_rows,
+    )
+    return asdict(report)
+
+
+@flow(name="ohlcv_partition_maintenance")
+def ohlcv_partition_maintenance_flow(months_ahead: int = 3, retain_months: Optional[int] = None) -> None:
+    """Keep ``ohlcv`` partitions ahead of the data; schedule daily where pg_cron is unavailable."""
+
+    with db_session() as conn:
+        maintain_price_partitions(conn, months_ahead=months_ahead, retain_months=retain_months)
+
+
+@flow(name="sec_ticker_index_refresh")
+def sec_ticker_index_refresh_flow(force: bool = True) -> int:
+    """Rebuild the local ticker→CIK index from the SEC bulk file; schedule daily. Returns the ticker count."""
+
+    client = SECEdgarClient.from_env()
+    if not client.user_agent:
+        _logger().info("SEC_API_USER_AGENT is unset; synthetic filings need no ticker index")
+        return 0
+    return len(refresh_ticker_index(client.company_tickers, force=force))
+
+
+def _resolve_ciks(client: SECEdgarClient, symbols: Iterable[str]) -> List[tuple[str, str]]:
+    """Pair each symbol with its CIK from the local ticker index; unlisted symbols are logged and dropped."""
+
+    symbol_list = list(symbols)
+    ciks = client.resolve_ciks(symbol_list)
+    missing = [symbol for symbol in symbol_list if symbol not in ciks]
+    if missing:
+        _logger().warning("No SEC CIK for %d symbols: %s", len(missing), ", ".join(missing[:20]))
+    return [(symbol, ciks[symbol]) for symbol in symbol_list if symbol in ciks]
 
 
 @task(name="fetch_fundamental_filings")
-def fetch_fundamental_filings(symbols: Iterable[str]) -> pd.DataFrame:
+@instrument_stage()
+def fetch_fundamental_filings(
+    symbols: Iterable[str],
+    concepts: Optional[Mapping[str, str]] = None,
+    ciks: Optional[Mapping[str, str]] = None,
+    shard: int = 0,
+) -> pd.DataFrame:
+    """Extract the requested XBRL ``concepts`` (default :data:`DEFAULT_CONCEPTS`) per filer.
+
+    Each companyfacts document is streamed once and only the wanted concepts are
+    materialised, regardless of how many metrics are requested. CIKs come from
+    the local ticker index (see :mod:`ingestion.cik_index`) unless ``ciks``
+    pins the symbol→CIK mapping. The raw frame is archived under ``shard``.
+    """
+
     client = SECEdgarClient.from_env()
+    wanted = concepts or DEFAULT_CONCEPTS
+    if ciks is not None:
+        pairs = [(symbol, ciks[symbol]) for symbol in symbols if symbol in ciks]
+    else:
+        pairs = _resolve_ciks(client, symbols)
     rows: List[dict] = []
-    for symbol, cik in _enumerate_ciks(symbols):
-        facts = client.get_company_facts(cik)
-        taxonomy = facts.get("facts", {})
-        revenues: List[dict] = []
-
-        for key in ("us-gaap", "IncomeStatement"):
-            container = taxonomy.get(key, {})
-            revenue_fact = container.get("Revenues", {}) if isinstance(container, dict) else {}
-            revenues = revenue_fact.get("units", {}).get("USD", [])
-            if revenues:
-                break
-
-        if not revenues:
-            for container in taxonomy.values():
-                if not isinstance(container, dict):
-                    continue
-                revenue_fact = container.get("Revenues", {})
-                if not isinstance(revenue_fact, dict):
-                    continue
-                revenues = revenue_fact.get("units", {}).get("USD", [])
-                if revenues:
-                    break
-
-        for entry in revenues:
-            rows.append(
-                {
-                    "symbol": symbol,
-                    "cik": cik,
-                    "metric": "revenue",
-                    "value": entry.get("val"),
-                    "period_end": entry.get("end"),
-                }
-            )
-    return pd.DataFrame(rows)
+    for symbol, cik in pairs:
+        for fact in client.extract_company_facts(cik, wanted):
+            rows.append({"symbol": symbol, "cik": cik, **fact})
+    raw = pd.DataFrame(rows, columns=FUNDAMENTALS_COLUMNS)
+    raw = compact_frame(raw, "raw_fundamentals")
+    archive_frame("fundamentals", raw, shard=shard)
+    return raw
 
 
 @task(name="transform_fundamentals")
+@instrument_stage()
 def transform_fundamentals(raw_df: pd.DataFrame) -> pd.DataFrame:
     if raw_df.empty:
         return raw_df
-    df = raw_df.copy()
-    df["period_end"] = pd.to_datetime(df["period_end"])
-    df.sort_values(["symbol", "period_end"], inplace=True)
-    df["revenue_growth"] = df.groupby("symbol")["value"].pct_change()
-    df["margin_score"] = df["revenue_growth"].fillna(0).clip(-1, 1)
-    df["quality_rank"] = df.groupby("period_end")["value"].rank(ascending=False)
-    curated = df.dropna(subset=["revenue_growth"])
-    curated = curated[["symbol", "period_end", "value", "revenue_growth", "margin_score", "quality_rank"]]
-    curated.rename(columns={"period_end": "as_of", "value": "revenue"}, inplace=True)
-    return curated
+    return FUNDAMENTALS_PLAN(raw_df)
 
 
 @task(name="load_fundamentals")
-def load_fundamentals(raw_df: pd.DataFrame, curated_df: pd.DataFrame) -> None:
+@instrument_stage()
+def load_fundamentals(raw_df: pd.DataFrame, curated_df: pd.DataFrame, load_mode: Optional[str] = None) -> None:
     _persist_dataset(
         "fundamentals",
         raw_df,
@@ -192,84 +937,204 @@ def load_fundamentals(raw_df: pd.DataFrame, curated_df: pd.DataFrame) -> None:
         raw_table="raw_fundamentals",
         curated_table="fundamental_quality",
         curated_schema="factor_inputs",
+        load_mode=load_mode,
     )
 
 
+def _fetch_fundamentals_shard(part: Tuple[int, List[str]], *, ciks: Mapping[str, str]) -> pd.DataFrame:
+    shard, symbols = part
+    return fetch_fundamental_filings.fn(symbols, ciks=ciks, shard=shard)
+
+
+@task(name="fetch_fundamental_filings_sharded")
+@instrument_stage()
+def fetch_fundamental_filings_sharded(
+    symbols: Iterable[str],
+    shards: int,
+    max_processes: Optional[int] = None,
+) -> pd.DataFrame:
+    """Fetch filings for each symbol shard in its own worker process and combine them.
+
+    CIKs are resolved once here, so the ticker index is refreshed at most once
+    per run rather than by every worker.
+    """
+
+    symbol_list = list(symbols)
+    ciks = dict(_resolve_ciks(SECEdgarClient.from_env(), symbol_list))
+    parts = [(shard, part) for shard, part in enumerate(partition_symbols(symbol_list, shards)) if part]
+    frames = map_in_processes(partial(_fetch_fundamentals_shard, ciks=ciks), parts, max_processes)
+    if not frames:
+        return pd.DataFrame(columns=FUNDAMENTALS_COLUMNS)
+    return compact_frame(pd.concat(frames, ignore_index=True), "raw_fundamentals")
+
+
 @flow(name="fundamentals_ingestion")
-def fundamentals_ingestion_flow(symbols: Iterable[str]) -> None:
-    raw = fetch_fundamental_filings(symbols)
-    curated = transform_fundamentals(raw)
-    load_fundamentals(raw, curated)
+def fundamentals_ingestion_flow(
+    symbols: Iterable[str],
+    shards: int = 1,
+    max_processes: Optional[int] = None,
+    replay_start: Optional[date] = None,
+    replay_end: Optional[date] = None,
+) -> None:
+    """Fetch, transform and load fundamentals.
+
+    With ``shards > 1`` the per-filer fetch (the expensive part) is spread over
+    worker processes by symbol shard. The transform ranks filers against each
+    other per period, so it still runs once over the combined frame.
+    ``replay_start``/``replay_end`` re-process archived filings instead of
+    fetching (see :func:`replay_raw_archive`).
+    """
+
+    with flow_metrics("fundamentals"):
+        if replay_start is not None:
+            raw = replay_raw_archive("fundamentals", "raw_fundamentals", replay_start, replay_end, symbols=symbols)
+            load_fundamentals(raw, transform_fundamentals(raw), load_mode="merge")
+            return
+        if shards > 1:
+            raw = fetch_fundamental_filings_sharded(symbols, shards, max_processes)
+        else:
+            raw = fetch_fundamental_filings(symbols)
+        curated = transform_fundamentals(raw)
+        load_fundamentals(raw, curated)
 
 
 @task(name="fetch_news_sentiment")
-def fetch_news_sentiment(symbols: Iterable[str]) -> pd.DataFrame:
+@instrument_stage()
+def fetch_news_sentiment(symbols: Iterable[str], since: Optional[datetime] = None) -> pd.DataFrame:
+    """Page through stories after ``since``, keeping only those not returned before.
+
+    One session checks every page against the stored fingerprints. Every page
+    the vendor returned, including repeats, is archived as one frame.
+    """
+
     client = RavenPackClient.from_env()
-    return client.get_news(symbols)
+    seen: Set[int] = set()
+    fetched = []
+    pages = []
+    with db_session() as conn:
+        for page in client.iter_news_pages(symbols, since):
+            fetched.append(page)
+            page = unseen_stories(conn, page, seen)
+            if not page.empty:
+                pages.append(page)
+    if fetched:
+        archive_frame("news_nlp", compact_frame(pd.concat(fetched, ignore_index=True), "raw_news_sentiment"))
+    if not pages:
+        return pd.DataFrame()
+    raw = pages[0] if len(pages) == 1 else pd.concat(pages, ignore_index=True)
+    return compact_frame(raw, "raw_news_sentiment")
 
 
 @task(name="transform_news_sentiment")
+@instrument_stage()
 def transform_news_sentiment(raw_df: pd.DataFrame) -> pd.DataFrame:
     if raw_df.empty:
         return raw_df
-    df = raw_df.copy()
-    df["event_time"] = pd.to_datetime(df["event_time"])
-    aggregated = (
-        df.groupby("symbol")
-        .agg(
-            avg_sentiment=("sentiment", "mean"),
-            article_count=("headline", "count"),
-            avg_relevance=("relevance", "mean"),
-        )
-        .reset_index()
-    )
-    aggregated["as_of"] = df["event_time"].max()
-    columns = ["symbol", "avg_sentiment", "article_count", "avg_relevance", "as_of"]
-    return aggregated[columns]
+    return NEWS_PLAN(raw_df)
+
+
+@task(name="news_sentiment_deltas")
+@instrument_stage()
+def news_sentiment_deltas(raw_df: pd.DataFrame) -> pd.DataFrame:
+    """Per-symbol sentiment sums and counts for this batch; the load folds them into the running totals.
+
+    The flow loads these instead of :func:`transform_news_sentiment`'s batch
+    averages, so the curated averages cover every story seen, not one run's.
+    """
+
+    if raw_df.empty:
+        return raw_df
+    return NEWS_TOTALS_PLAN(raw_df)
+
+
+def _fold_news_batch(conn: Connection, raw_df: pd.DataFrame, deltas: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Claim the batch's stories, add their deltas to the running totals and return the rows to load."""
+
+    if raw_df.empty:
+        return raw_df, pd.DataFrame()
+    claimed = claim_stories(conn, raw_df)
+    if not claimed.all():
+        # Another run loaded some of these stories after the fetch filtered them.
+        raw_df = raw_df.loc[claimed]
+        deltas = NEWS_TOTALS_PLAN(raw_df) if not raw_df.empty else deltas.iloc[:0]
+    totals = apply_news_totals(conn, deltas)
+    if not totals.empty:
+        cutoff = totals["last_event_time"].max() - timedelta(days=NEWS_SEEN_RETENTION_DAYS)
+        prune_seen_stories(conn, before=cutoff.to_pydatetime())
+    return raw_df, compact_frame(sentiment_signals(totals), "news_sentiment_signals")
 
 
 @task(name="load_news_sentiment")
-def load_news_sentiment(raw_df: pd.DataFrame, curated_df: pd.DataFrame) -> None:
+@instrument_stage()
+def load_news_sentiment(raw_df: pd.DataFrame, deltas: pd.DataFrame, load_mode: Optional[str] = None) -> None:
     _persist_dataset(
         "news_nlp",
         raw_df,
-        curated_df,
+        deltas,
         raw_table="raw_news_sentiment",
         curated_table="news_sentiment_signals",
         curated_schema="earnings_events",
+        load_mode=load_mode,
+        prepare=_fold_news_batch,
     )
 
 
+def _news_since(symbols: Sequence[str]) -> datetime:
+    with db_session() as conn:
+        return news_window_start(read_news_cursor(conn, symbols))
+
+
 @flow(name="news_ingestion")
-def news_nlp_ingestion_flow(symbols: Iterable[str]) -> None:
-    raw = fetch_news_sentiment(symbols)
-    curated = transform_news_sentiment(raw)
-    load_news_sentiment(raw, curated)
+def news_nlp_ingestion_flow(
+    symbols: Iterable[str],
+    replay_start: Optional[date] = None,
+    replay_end: Optional[date] = None,
+) -> None:
+    """Ingest stories since the news cursor and update per-symbol sentiment incrementally.
+
+    Each run pages from shortly before the newest stored ``event_time``. It
+    drops stories already seen and adds only the new ones to the running
+    sums and counts in ``news_sentiment_totals`` (see :mod:`ingestion.news`).
+    The curated rows are the refreshed averages of the symbols that had new
+    stories.
+
+    ``replay_start``/``replay_end`` fold archived stories instead of fetching
+    (see :func:`replay_raw_archive`). Stories already in ``news_seen_stories``
+    are still skipped, so clear it and ``news_sentiment_totals`` first to
+    rebuild the totals.
+    """
+
+    symbol_list = list(symbols)
+    with flow_metrics("news_nlp"):
+        if replay_start is not None:
+            raw = replay_raw_archive("news_nlp", "raw_news_sentiment", replay_start, replay_end, symbols=symbol_list)
+            load_news_sentiment(raw, news_sentiment_deltas(raw), load_mode="merge")
+            return
+        raw = fetch_news_sentiment(symbol_list, since=_news_since(symbol_list))
+        deltas = news_sentiment_deltas(raw)
+        load_news_sentiment(raw, deltas)
 
 
 @task(name="fetch_macro_signals")
+@instrument_stage()
 def fetch_macro_signals() -> pd.DataFrame:
     client = MacroSignalsClient.from_env()
-    return client.latest_signals()
+    raw = compact_frame(client.latest_signals(), "raw_macro_signals")
+    archive_frame("macro_signals", raw)
+    return raw
 
 
 @task(name="transform_macro_signals")
+@instrument_stage()
 def transform_macro_signals(raw_df: pd.DataFrame) -> pd.DataFrame:
     if raw_df.empty:
         return raw_df
-    df = raw_df.copy()
-    df["as_of"] = pd.to_datetime(df["as_of"])
-    pivot = df.pivot_table(index="as_of", columns="indicator", values="value")
-    pivot.reset_index(inplace=True)
-    pivot["regime"] = pivot.apply(
-        lambda row: "expansion" if row.get("gdp_growth", 0) > 2 and row.get("inflation", 0) < 3 else "slowdown",
-        axis=1,
-    )
-    return pivot
+    return MACRO_PLAN(raw_df)
 
 
 @task(name="load_macro_signals")
-def load_macro_signals(raw_df: pd.DataFrame, curated_df: pd.DataFrame) -> None:
+@instrument_stage()
+def load_macro_signals(raw_df: pd.DataFrame, curated_df: pd.DataFrame, load_mode: Optional[str] = None) -> None:
     _persist_dataset(
         "macro_signals",
         raw_df,
@@ -277,54 +1142,42 @@ def load_macro_signals(raw_df: pd.DataFrame, curated_df: pd.DataFrame) -> None:
         raw_table="raw_macro_signals",
         curated_table="macro_regime_signals",
         curated_schema="macro_regimes",
+        load_mode=load_mode,
     )
 
 
 @flow(name="macro_ingestion")
-def macro_signals_ingestion_flow() -> None:
-    raw = fetch_macro_signals()
-    curated = transform_macro_signals(raw)
-    load_macro_signals(raw, curated)
+def macro_signals_ingestion_flow(replay_start: Optional[date] = None, replay_end: Optional[date] = None) -> None:
+    with flow_metrics("macro_signals"):
+        if replay_start is not None:
+            raw = replay_raw_archive("macro_signals", "raw_macro_signals", replay_start, replay_end)
+            load_macro_signals(raw, transform_macro_signals(raw), load_mode="merge")
+            return
+        raw = fetch_macro_signals()
+        curated = transform_macro_signals(raw)
+        load_macro_signals(raw, curated)
 
 
 @task(name="fetch_insider_activity")
+@instrument_stage()
 def fetch_insider_activity(symbols: Iterable[str]) -> pd.DataFrame:
     client = InsiderActivityClient.from_env()
-    return client.latest_activity(symbols)
+    raw = compact_frame(client.latest_activity(symbols), "raw_insider_activity")
+    archive_frame("insider_buyback", raw)
+    return raw
 
 
 @task(name="transform_insider_activity")
+@instrument_stage()
 def transform_insider_activity(raw_df: pd.DataFrame) -> pd.DataFrame:
     if raw_df.empty:
         return raw_df
-    df = raw_df.copy()
-    df["transaction_date"] = pd.to_datetime(df["transaction_date"])
-    grouped = (
-        df.groupby(["symbol", "transaction_type"])
-        .agg(
-            total_shares=("shares", "sum"),
-            avg_price=("price", "mean"),
-            last_transaction=("transaction_date", "max"),
-        )
-        .reset_index()
-    )
-    pivot = grouped.pivot(index="symbol", columns="transaction_type", values="total_shares").fillna(0)
-    pivot.reset_index(inplace=True)
-    pivot.rename(columns={"Buy": "buy_shares", "Sell": "sell_shares"}, inplace=True)
-    buy_series = pivot["buy_shares"] if "buy_shares" in pivot.columns else pd.Series(0, index=pivot.index)
-    sell_series = pivot["sell_shares"] if "sell_shares" in pivot.columns else pd.Series(0, index=pivot.index)
-    pivot["net_shares"] = buy_series - sell_series
-    pivot["as_of"] = grouped["last_transaction"].max()
-    if "buy_shares" not in pivot:
-        pivot["buy_shares"] = 0
-    if "sell_shares" not in pivot:
-        pivot["sell_shares"] = 0
-    columns = ["symbol", "buy_shares", "sell_shares", "net_shares", "as_of"]
-    return pivot[columns]
+    return INSIDER_PLAN(raw_df)
 
 
 @task(name="load_insider_activity")
-def load_insider_activity(raw_df: pd.DataFrame, curated_df: pd.DataFrame) -> None:
+@instrument_stage()
+def load_insider_activity(raw_df: pd.DataFrame, curated_df: pd.DataFrame, load_mode: Optional[str] = None) -> None:
     _persist_dataset(
         "insider_buyback",
         raw_df,
@@ -332,20 +1185,152 @@ def load_insider_activity(raw_df: pd.DataFrame, curated_df: pd.DataFrame) -> Non
         raw_table="raw_insider_activity",
         curated_table="insider_buyback_activity",
         curated_schema="earnings_events",
+        load_mode=load_mode,
     )
 
 
 @flow(name="insider_ingestion")
-def insider_buyback_ingestion_flow(symbols: Iterable[str]) -> None:
-    raw = fetch_insider_activity(symbols)
-    curated = transform_insider_activity(raw)
-    load_insider_activity(raw, curated)
+def insider_buyback_ingestion_flow(
+    symbols: Iterable[str],
+    replay_start: Optional[date] = None,
+    replay_end: Optional[date] = None,
+) -> None:
+    with flow_metrics("insider_buyback"):
+        if replay_start is not None:
+            raw = replay_raw_archive(
+                "insider_buyback", "raw_insider_activity", replay_start, replay_end, symbols=symbols
+            )
+            load_insider_activity(raw, transform_insider_activity(raw), load_mode="merge")
+            return
+        raw = fetch_insider_activity(symbols)
+        curated = transform_insider_activity(raw)
+        load_insider_activity(raw, curated)
+
+
+def _parse_source_limits(value: str) -> Dict[str, int]:
+    limits: Dict[str, int] = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        source, limit = item.split("=", 1)
+        limits[source.strip()] = max(1, int(limit))
+    return limits
+
+
+# Max concurrent runs of each source per process, e.g. ``equities=1,news=2`` (default 1).
+SOURCE_CONCURRENCY_LIMITS: Dict[str, int] = _parse_source_limits(os.getenv("INGESTION_SOURCE_LIMITS", ""))
+_SOURCE_SLOTS: Dict[str, threading.BoundedSemaphore] = {}
+_SOURCE_SLOTS_LOCK = threading.Lock()
+
+
+def _source_slot(source: str) -> threading.BoundedSemaphore:
+    """Process-wide semaphore bounding concurrent runs of one source against its vendor."""
+
+    with _SOURCE_SLOTS_LOCK:
+        slot = _SOURCE_SLOTS.get(source)
+        if slot is None:
+            slot = threading.BoundedSemaphore(SOURCE_CONCURRENCY_LIMITS.get(source, 1))
+            _SOURCE_SLOTS[source] = slot
+        return slot
+
+
+@dataclass
+class SourceRunStatus:
+    source: str
+    status: str = "pending"
+    started_at: Optional[datetime] = None
+    duration_seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def _run_source(source: str, run: Callable[[], Any]) -> SourceRunStatus:
+    """Run one source sub-flow under its concurrency slot, capturing the outcome."""
+
+    status = SourceRunStatus(source)
+    with _source_slot(source):
+        status.started_at = datetime.utcnow()
+        started = time.perf_counter()
+        try:
+            run()
+        except Exception as exc:  # noqa: BLE001 - one failed source must not abort the others
+            _logger().exception("Source %s failed", source)
+            status.status = "failed"
+            status.error = f"{type(exc).__name__}: {exc}"
+        else:
+            status.status = "completed"
+        status.duration_seconds = time.perf_counter() - started
+    return status
 
 
 @flow(name="enterprise_multi_source_ingestion")
-def enterprise_ingestion_flow(symbols: Iterable[str]) -> None:
-    equities_ingestion_flow(symbols)
-    fundamentals_ingestion_flow(symbols)
-    news_nlp_ingestion_flow(symbols)
-    macro_signals_ingestion_flow()
-    insider_buyback_ingestion_flow(symbols)
+def enterprise_ingestion_flow(
+    symbols: Iterable[str],
+    parallel: Optional[bool] = None,
+    max_parallel_sources: Optional[int] = None,
+    equity_max_workers: Optional[int] = None,
+    raise_on_failure: bool = True,
+    shards: int = 1,
+    replay_start: Optional[date] = None,
+    replay_end: Optional[date] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Run every source sub-flow and return a combined per-source status report.
+
+    Sources run one after another unless ``parallel`` (or
+    ``INGESTION_PARALLEL_SOURCES=true``) is set. They are independent and I/O
+    bound, so in parallel they run on up to ``max_parallel_sources`` threads
+    and wall time tracks the slowest source.
+    Each thread runs in a copy of the caller's context, so Prefect still records
+    the sub-flows as children of this run. ``INGESTION_SOURCE_LIMITS`` caps how
+    many runs of a given source may overlap in one process.
+
+    A failing source no longer stops the others; failures are collected in the
+    report and, with ``raise_on_failure``, raised once every source finished.
+
+    ``shards > 1`` runs equities as :func:`sharded_equities_ingestion_flow` and
+    spreads the fundamentals fetch over the same number of worker processes.
+
+    ``replay_start``/``replay_end`` run every source from the raw archive
+    instead of the vendors.
+    """
+
+    logger = _logger()
+    symbol_list = list(symbols)
+    replay = {"replay_start": replay_start, "replay_end": replay_end}
+    sources: Dict[str, Callable[[], Any]] = {
+        "equities": lambda: (
+            sharded_equities_ingestion_flow(symbol_list, shards=shards, max_workers=equity_max_workers, **replay)
+            if shards > 1
+            else equities_ingestion_flow(symbol_list, max_workers=equity_max_workers, **replay)
+        ),
+        "fundamentals": lambda: fundamentals_ingestion_flow(symbol_list, shards=shards, **replay),
+        "news_nlp": lambda: news_nlp_ingestion_flow(symbol_list, **replay),
+        "macro_signals": lambda: macro_signals_ingestion_flow(**replay),
+        "insider_buyback": lambda: insider_buyback_ingestion_flow(symbol_list, **replay),
+    }
+    run_parallel = DEFAULT_PARALLEL_SOURCES if parallel is None else parallel
+    started = time.perf_counter()
+    if run_parallel:
+        workers = max(1, min(max_parallel_sources or len(sources), len(sources)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingestion-source") as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, _run_source, source, run)
+                for source, run in sources.items()
+            ]
+            statuses = [future.result() for future in futures]
+    else:
+        statuses = [_run_source(source, run) for source, run in sources.items()]
+    wall_seconds = time.perf_counter() - started
+
+    report = {status.source: asdict(status) for status in statuses}
+    failed = [status.source for status in statuses if status.status == "failed"]
+    logger.info(
+        "Ingested %d sources in %.1fs (%s, sum of sources %.1fs); failed: %s",
+        len(statuses),
+        wall_seconds,
+        "parallel" if run_parallel else "sequential",
+        sum(status.duration_seconds for status in statuses),
+        ", ".join(failed) or "none",
+    )
+    if failed and raise_on_failure:
+        raise RuntimeError(f"Ingestion failed for sources: {', '.join(failed)}")
+    return report
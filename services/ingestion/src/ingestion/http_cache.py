@@ -0,0 +1,156 @@
+"""Persistent conditional-request cache for large, rarely changing vendor documents."""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Optional
+
+DEFAULT_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(2 * 1024**3)))
+
+
+@dataclass
+class HTTPCache:
+    """On-disk cache of gzip-compressed response bodies with ETag/Last-Modified validators.
+
+    Bodies live as ``<key>.gz`` files under ``directory``; validators, sizes and
+    last-access times live in a small SQLite index so several worker processes
+    can share one cache. Total compressed size is bounded by ``max_bytes`` with
+    least-recently-used eviction.
+    """
+
+    directory: Path
+    max_bytes: int = DEFAULT_MAX_BYTES
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.directory = Path(self.directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+
+    @classmethod
+    def from_env(cls, variable: str) -> Optional["HTTPCache"]:
+        """Build a cache rooted at ``$variable`` or return ``None`` when it is unset."""
+
+        directory = os.getenv(variable)
+        return cls(Path(directory)) if directory else None
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.directory / "index.sqlite", timeout=30)
+
+    def _body_path(self, key: str) -> Path:
+        return self.directory / f"{key}.gz"
+
+    def conditional_headers(self, key: str) -> Dict[str, str]:
+        """Validators to send so the server can answer ``304 Not Modified``."""
+
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT etag, last_modified FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or not self._body_path(key).exists():
+            return {}
+        headers: Dict[str, str] = {}
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def open(self, key: str) -> Optional[IO[bytes]]:
+        """Open the cached body as a decompressing binary stream, or ``None`` on a miss."""
+
+        try:
+            handle = gzip.open(self._body_path(key), "rb")
+        except FileNotFoundError:
+            return None
+        with closing(self._connect()) as conn, conn:
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        return handle
+
+    def load_json(self, key: str) -> Optional[Any]:
+        handle = self.open(key)
+        if handle is None:
+            return None
+        with handle:
+            return json.load(handle)
+
+    def store(
+        self,
+        key: str,
+        body: bytes,
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Compress and persist ``body`` atomically, then evict down to ``max_bytes``."""
+
+        self.store_stream(key, [body], etag=etag, last_modified=last_modified)
+
+    def store_stream(
+        self,
+        key: str,
+        chunks: Iterable[bytes],
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Like :meth:`store` but compresses ``chunks`` as they arrive, never holding the full body."""
+
+        path = self._body_path(key)
+        partial = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with gzip.open(partial, "wb", compresslevel=6) as handle:
+                for chunk in chunks:
+                    handle.write(chunk)
+            os.replace(partial, path)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT INTO entries(key, etag, last_modified, size, last_access)
+                VALUES(?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    size = excluded.size,
+                    last_access = excluded.last_access
+                """,
+                (key, etag, last_modified, path.stat().st_size, time.time()),
+            )
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop least-recently-used entries until the cache fits in ``max_bytes``."""
+
+        with self._lock, closing(self._connect()) as conn, conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._body_path(key).unlink(missing_ok=True)
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+
+    def total_bytes(self) -> int:
+        with closing(self._connect()) as conn:
+            return int(conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0])
@@ -0,0 +1,71 @@
+"""Incremental parsing of record arrays out of JSON response bodies.
+
+Vendor pages wrap their records in one top-level array, for example
+``{"results": [...], "next_url": ...}``. :func:`iter_records` yields those
+records one at a time while reading the (already decompressed) body stream.
+The raw bytes and the parsed document are never both held in memory, and
+only one record is built at a time. Top-level scalars such as pagination
+cursors are collected into ``metadata`` as they go past.
+"""
+from __future__ import annotations
+
+import json
+from typing import IO, Any, Dict, Iterator, MutableMapping, Optional, Tuple, Type
+
+try:  # pragma: no cover - optional dependency
+    import ijson  # type: ignore
+except Exception:  # pragma: no cover - executed when ijson isn't available
+    ijson = None  # type: ignore
+
+# Raised when a body is not valid (or not complete) JSON, whichever parser is in use.
+JSON_ERRORS: Tuple[Type[Exception], ...] = (ValueError,) if ijson is None else (ValueError, ijson.JSONError)
+
+_SCALAR_EVENTS = frozenset({"string", "number", "boolean", "null"})
+_START_EVENTS = frozenset({"start_map", "start_array"})
+_END_EVENTS = frozenset({"end_map", "end_array"})
+
+
+def _iter_streamed_records(stream: IO[bytes], key: str, metadata: MutableMapping[str, Any]) -> Iterator[Any]:
+    item = f"{key}.item"
+    builder: Optional[Any] = None
+    depth = 0
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if event in _START_EVENTS:
+                depth += 1
+            elif event in _END_EVENTS:
+                depth -= 1
+                if not depth:
+                    yield builder.value
+                    builder = None
+        elif prefix == item and event in _START_EVENTS:
+            builder = ijson.common.ObjectBuilder()
+            builder.event(event, value)
+            depth = 1
+        elif prefix == item and event in _SCALAR_EVENTS:
+            yield value
+        elif event in _SCALAR_EVENTS and "." not in prefix and prefix:
+            metadata[prefix] = value
+
+
+def iter_records(
+    stream: IO[bytes],
+    key: str,
+    metadata: Optional[MutableMapping[str, Any]] = None,
+) -> Iterator[Any]:
+    """Yield each element of the top-level ``key`` array in ``stream``.
+
+    Top-level scalar fields are stored in ``metadata``. Those after the array
+    (Polygon puts ``next_url`` last) are only there once the iterator is
+    exhausted. Uses incremental parsing when ``ijson`` is installed and falls
+    back to a full ``json.load`` otherwise.
+    """
+
+    fields: MutableMapping[str, Any] = metadata if metadata is not None else {}
+    if ijson is not None:
+        yield from _iter_streamed_records(stream, key, fields)
+        return
+    document: Dict[str, Any] = json.load(stream)
+    fields.update({name: value for name, value in document.items() if not isinstance(value, (dict, list))})
+    yield from document.get(key) or []
@@ -0,0 +1,471 @@
+"""Ingestion throughput/latency metrics with a Prometheus text exporter and per-flow summaries."""
+from __future__ import annotations
+
+import bisect
+import contextvars
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+import pandas as pd
+
+try:  # pragma: no cover - optional dependency
+    import resource  # type: ignore
+except Exception:  # pragma: no cover - executed where resource isn't available (Windows)
+    resource = None  # type: ignore
+
+F = TypeVar("F", bound=Callable[..., Any])
+Labels = Tuple[Tuple[str, str], ...]
+
+LATENCY_BUCKETS: Tuple[float, ...] = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+METRICS_PORT = os.getenv("INGESTION_METRICS_PORT")
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _labels(**labels: str) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    items = [*labels, *extra]
+    if not items:
+        return ""
+    rendered = ",".join(f'{key}="{_escape(value)}"' for key, value in items)
+    return "{" + rendered + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+@dataclass
+class _Histogram:
+    buckets: Tuple[float, ...]
+    counts: List[int] = field(init=False)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and histograms rendered in Prometheus text format.
+
+    Kept dependency-free on purpose: the exporter only has to serve a handful
+    of families, and every worker process owns its own registry.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+
+    def _declare(self, name: str, kind: str, documentation: str) -> None:
+        self._help.setdefault(name, (kind, documentation))
+
+    def inc(self, name: str, value: float = 1.0, documentation: str = "", **labels: str) -> None:
+        with self._lock:
+            self._declare(name, "counter", documentation)
+            series = self._counters.setdefault(name, {})
+            key = _labels(**labels)
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, documentation: str = "", **labels: str) -> None:
+        with self._lock:
+            self._declare(name, "gauge", documentation)
+            self._gauges.setdefault(name, {})[_labels(**labels)] = value
+
+    def max_gauge(self, name: str, value: float, documentation: str = "", **labels: str) -> None:
+        with self._lock:
+            self._declare(name, "gauge", documentation)
+            series = self._gauges.setdefault(name, {})
+            key = _labels(**labels)
+            series[key] = max(series.get(key, value), value)
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        documentation: str = "",
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+        **labels: str,
+    ) -> None:
+        with self._lock:
+            self._declare(name, "histogram", documentation)
+            series = self._histograms.setdefault(name, {})
+            key = _labels(**labels)
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(buckets)
+            histogram.observe(value)
+
+    def value(self, name: str, **labels: str) -> Optional[float]:
+        """Return the current counter or gauge value (histograms report their count)."""
+
+        key = _labels(**labels)
+        with self._lock:
+            for family in (self._counters, self._gauges):
+                if key in family.get(name, {}):
+                    return family[name][key]
+            histogram = self._histograms.get(name, {}).get(key)
+            return float(histogram.count) if histogram is not None else None
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format (version 0.0.4)."""
+
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._help):
+                kind, documentation = self._help[name]
+                if documentation:
+                    lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "histogram":
+                    for labels, histogram in sorted(self._histograms.get(name, {}).items()):
+                        cumulative = 0
+                        for bound, count in zip(histogram.buckets, histogram.counts):
+                            cumulative += count
+                            lines.append(f"{name}_bucket{_format_labels(labels, [('le', repr(bound))])} {cumulative}")
+                        lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {histogram.count}")
+                        lines.append(f"{name}_sum{_format_labels(labels)} {histogram.total}")
+                        lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+                    continue
+                family = self._counters if kind == "counter" else self._gauges
+                for labels, value in sorted(family.get(name, {}).items()):
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+@dataclass
+class FlowMetrics:
+    """Per-run rollup of stage, vendor and write statistics for one dataset.
+
+    :func:`flow_metrics` makes it current for the flow's context. Loaders
+    register an :meth:`on_finish` callback that stores :meth:`summary` in the
+    ``data_freshness`` row once every stage, the load included, has been
+    timed, so every run records where its time went.
+    """
+
+    dataset: str
+    started: float = field(default_factory=time.perf_counter)
+    stages: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    vendors: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    writes: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    memory: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    transforms: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    changes: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    _finishers: Dict[str, Callable[[Dict[str, Any]], None]] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    @staticmethod
+    def _add(bucket: Dict[str, Dict[str, float]], key: str, **values: float) -> None:
+        entry = bucket.setdefault(key, {})
+        for name, value in values.items():
+            entry[name] = entry.get(name, 0) + value
+
+    def record_stage(
+        self,
+        stage: str,
+        *,
+        seconds: float,
+        rows_in: int,
+        rows_out: int,
+        peak_bytes: int,
+        peak_rss_bytes: int = 0,
+    ) -> None:
+        with self._lock:
+            self._add(self.stages, stage, seconds=seconds, rows_in=rows_in, rows_out=rows_out)
+            entry = self.stages[stage]
+            entry["peak_frame_bytes"] = max(entry.get("peak_frame_bytes", 0), peak_bytes)
+            entry["peak_rss_bytes"] = max(entry.get("peak_rss_bytes", 0), peak_rss_bytes)
+
+    def record_request(self, vendor: str, *, seconds: float, retries: int, nbytes: int) -> None:
+        with self._lock:
+            self._add(self.vendors, vendor, requests=1, seconds=seconds, retries=retries, bytes=nbytes)
+
+    def record_write(self, table: str, *, rows: int, seconds: float) -> None:
+        with self._lock:
+            self._add(self.writes, table, rows=rows, seconds=seconds)
+            entry = self.writes[table]
+            entry["rows_per_second"] = entry["rows"] / entry["seconds"] if entry["seconds"] > 0 else 0.0
+
+    def record_compaction(self, table: str, *, bytes_before: int, bytes_after: int) -> None:
+        with self._lock:
+            self._add(self.memory, table, bytes_before=bytes_before, bytes_after=bytes_after)
+            entry = self.memory[table]
+            entry["reduction"] = 1 - entry["bytes_after"] / entry["bytes_before"] if entry["bytes_before"] else 0.0
+
+    def record_transform_step(self, plan: str, step: str, *, seconds: float, rows_in: int, rows_out: int) -> None:
+        with self._lock:
+            self._add(self.transforms, f"{plan}.{step}", seconds=seconds, rows_in=rows_in, rows_out=rows_out)
+
+    def record_changes(self, table: str, *, rows: int, changed: int) -> None:
+        with self._lock:
+            self._add(self.changes, table, rows=rows, changed=changed)
+            entry = self.changes[table]
+            entry["skipped_ratio"] = 1 - entry["changed"] / entry["rows"] if entry["rows"] else 0.0
+
+    def on_finish(self, key: str, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Call ``callback(summary)`` when the flow's context exits successfully; one callback per ``key``."""
+
+        with self._lock:
+            self._finishers[key] = callback
+
+    def finish(self) -> None:
+        with self._lock:
+            finishers = list(self._finishers.items())
+            self._finishers.clear()
+        if not finishers:
+            return
+        summary = self.summary()
+        for key, callback in finishers:
+            try:
+                callback(summary)
+            except Exception:  # noqa: BLE001 - the run's data is already committed; only its metrics are lost
+                _LOGGER.warning("Could not store run metrics for %s", key, exc_info=True)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {name: dict(values) for name, values in self.stages.items()}
+            bottleneck = max(stages, key=lambda name: stages[name]["seconds"]) if stages else None
+            return {
+                "dataset": self.dataset,
+                "elapsed_seconds": time.perf_counter() - self.started,
+                "bottleneck_stage": bottleneck,
+                "stages": stages,
+                "vendors": {name: dict(values) for name, values in self.vendors.items()},
+                "writes": {name: dict(values) for name, values in self.writes.items()},
+                "memory": {name: dict(values) for name, values in self.memory.items()},
+                "transforms": {name: dict(values) for name, values in self.transforms.items()},
+                "changes": {name: dict(values) for name, values in self.changes.items()},
+            }
+
+
+_CURRENT_FLOW: contextvars.ContextVar[Optional[FlowMetrics]] = contextvars.ContextVar(
+    "ingestion_flow_metrics", default=None
+)
+
+
+def current_flow_metrics() -> Optional[FlowMetrics]:
+    return _CURRENT_FLOW.get()
+
+
+@contextmanager
+def flow_metrics(dataset: str) -> Iterator[FlowMetrics]:
+    """Collect a :class:`FlowMetrics` for everything run in this context.
+
+    Worker threads only contribute when they run in a copy of this context
+    (``contextvars.copy_context().run``), as the flows' thread pools do.
+    When the block completes, the :meth:`FlowMetrics.on_finish` callbacks run
+    with the final summary.
+    """
+
+    ensure_exporter()
+    metrics = FlowMetrics(dataset)
+    token = _CURRENT_FLOW.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _CURRENT_FLOW.reset(token)
+    metrics.finish()
+
+
+def frame_bytes(frame: Any, *, deep: bool = False) -> int:
+    """Memory held by ``frame``'s arrays; ``deep`` also sizes the Python objects in object columns (O(rows))."""
+
+    if isinstance(frame, pd.DataFrame):
+        return int(frame.memory_usage(index=True, deep=deep).sum())
+    return 0
+
+
+def peak_rss_bytes() -> int:
+    """The process's peak resident set size so far (0 where ``resource`` is unavailable)."""
+
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def _frame_rows(values: Sequence[Any]) -> int:
+    return sum(len(value) for value in values if isinstance(value, pd.DataFrame))
+
+
+def instrument_stage(stage: Optional[str] = None) -> Callable[[F], F]:
+    """Time a fetch/transform/load callable and record rows in/out and memory.
+
+    Memory is the largest input or output frame (shallow, so it costs
+    nothing per row) and the process's peak RSS when the stage ends.
+
+    Apply it beneath ``@task`` so Prefect still sees the original signature.
+    """
+
+    def decorate(fn: F) -> F:
+        name = stage or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            inputs = [*args, *kwargs.values()]
+            started = time.perf_counter()
+            result = fn(*args, **kwargs)
+            seconds = time.perf_counter() - started
+            rows_in = _frame_rows(inputs)
+            rows_out = _frame_rows([result])
+            peak = max([frame_bytes(value) for value in [*inputs, result]], default=0)
+            rss = peak_rss_bytes()
+            REGISTRY.observe("ingestion_stage_seconds", seconds, "Wall time per pipeline stage", stage=name)
+            REGISTRY.inc("ingestion_stage_rows_in_total", rows_in, "Rows passed into a stage", stage=name)
+            REGISTRY.inc("ingestion_stage_rows_out_total", rows_out, "Rows returned by a stage", stage=name)
+            REGISTRY.max_gauge("ingestion_frame_peak_bytes", peak, "Largest frame seen by a stage", stage=name)
+            REGISTRY.max_gauge("ingestion_peak_rss_bytes", rss, "Process peak RSS after a stage", stage=name)
+            metrics = current_flow_metrics()
+            if metrics is not None:
+                metrics.record_stage(
+                    name, seconds=seconds, rows_in=rows_in, rows_out=rows_out, peak_bytes=peak, peak_rss_bytes=rss
+                )
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def record_vendor_request(vendor: str, endpoint: str, *, seconds: float, retries: int, nbytes: int) -> None:
+    """Record one logical vendor call (all of its attempts) from ``_retry_request``."""
+
+    labels = {"vendor": vendor, "endpoint": endpoint}
+    REGISTRY.observe("ingestion_vendor_request_seconds", seconds, "Vendor call latency including retries", **labels)
+    REGISTRY.inc("ingestion_vendor_retries_total", retries, "Vendor request retries", **labels)
+    REGISTRY.inc("ingestion_vendor_bytes_total", nbytes, "Response bytes downloaded from vendors", **labels)
+    metrics = current_flow_metrics()
+    if metrics is not None:
+        metrics.record_request(vendor, seconds=seconds, retries=retries, nbytes=nbytes)
+
+
+@contextmanager
+def observe_write(table: str, rows: int) -> Iterator[None]:
+    """Time a bulk write of ``rows`` rows into ``table``."""
+
+    started = time.perf_counter()
+    yield
+    seconds = time.perf_counter() - started
+    REGISTRY.observe("ingestion_write_seconds", seconds, "Time spent writing a frame", table=table)
+    REGISTRY.inc("ingestion_rows_written_total", rows, "Rows written to the database", table=table)
+    if seconds > 0:
+        REGISTRY.set_gauge(
+            "ingestion_write_rows_per_second", rows / seconds, "Throughput of the last write", table=table
+        )
+    metrics = current_flow_metrics()
+    if metrics is not None:
+        metrics.record_write(table, rows=rows, seconds=seconds)
+
+
+def record_frame_compaction(table: str, bytes_before: int, bytes_after: int) -> None:
+    """Record the bytes of a ``table`` frame's converted columns before and after its dtype policy."""
+
+    labels = {"table": table}
+    REGISTRY.inc("ingestion_frame_bytes_before_total", bytes_before, "Column bytes before dtype compaction", **labels)
+    REGISTRY.inc("ingestion_frame_bytes_after_total", bytes_after, "Column bytes after dtype compaction", **labels)
+    metrics = current_flow_metrics()
+    if metrics is not None:
+        metrics.record_compaction(table, bytes_before=bytes_before, bytes_after=bytes_after)
+
+
+def record_transform_step(plan: str, step: str, *, seconds: float, rows_in: int, rows_out: int) -> None:
+    """Record one step of a transform plan run (see :mod:`ingestion.transforms`)."""
+
+    labels = {"plan": plan, "step": step}
+    REGISTRY.observe("ingestion_transform_step_seconds", seconds, "Wall time per transform plan step", **labels)
+    metrics = current_flow_metrics()
+    if metrics is not None:
+        metrics.record_transform_step(plan, step, seconds=seconds, rows_in=rows_in, rows_out=rows_out)
+
+
+def record_changes(table: str, *, rows: int, changed: int) -> None:
+    """Record how many of a frame's ``rows`` the change-data-capture stage forwarded to ``table``."""
+
+    documentation = "Rows compared against the change-data-capture fingerprints, by outcome"
+    REGISTRY.inc("ingestion_cdc_rows_total", changed, documentation, table=table, outcome="changed")
+    REGISTRY.inc("ingestion_cdc_rows_total", rows - changed, documentation, table=table, outcome="unchanged")
+    metrics = current_flow_metrics()
+    if metrics is not None:
+        metrics.record_changes(table, rows=rows, changed=changed)
+
+
+class _ExporterHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - silence per-scrape logging
+        return
+
+
+_EXPORTER: Optional[ThreadingHTTPServer] = None
+_EXPORTER_LOCK = threading.Lock()
+_EXPORTER_DISABLED = False
+
+
+def start_exporter(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve :data:`REGISTRY` for Prometheus scrapes on a daemon thread (idempotent)."""
+
+    global _EXPORTER
+    with _EXPORTER_LOCK:
+        if _EXPORTER is None:
+            server = ThreadingHTTPServer((host, port), _ExporterHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True).start()
+            _EXPORTER = server
+        return _EXPORTER
+
+
+def disable_exporter() -> None:
+    """Never bind the exporter in this process; the initializer for worker processes.
+
+    Workers share the parent's ``INGESTION_METRICS_PORT``, which the parent (or
+    another worker) already holds. Their stage summaries still reach the
+    ``data_freshness`` rows.
+    """
+
+    global _EXPORTER_DISABLED
+    _EXPORTER_DISABLED = True
+
+
+def ensure_exporter() -> None:
+    """Start the exporter once per process when ``INGESTION_METRICS_PORT`` is set.
+
+    A port that is already bound is logged and skipped, so metrics never stop a run.
+    """
+
+    global _EXPORTER_DISABLED
+    if not METRICS_PORT or _EXPORTER is not None or _EXPORTER_DISABLED:
+        return
+    try:
+        start_exporter(int(METRICS_PORT))
+    except OSError:
+        _LOGGER.warning("Metrics exporter not started on port %s", METRICS_PORT, exc_info=True)
+        _EXPORTER_DISABLED = True
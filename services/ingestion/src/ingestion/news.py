@@ -0,0 +1,256 @@
+"""Incremental news state: story fingerprints, a persistent seen-set and running sentiment totals.
+
+A run pages through the vendor from a cursor a little before the newest
+stored ``event_time``. Each story gets a 64-bit fingerprint of its
+``(symbol, event_time, headline)``. Stories already in ``news_seen_stories``
+are dropped before the transform. At load time the remaining fingerprints
+are claimed with ``INSERT ... ON CONFLICT DO NOTHING RETURNING``, so a story
+is counted once even when the overlap window or two runs return it again.
+``news_sentiment_totals`` keeps running sums and counts per symbol. A load
+adds only the new stories' deltas and derives the averages from the totals,
+so its cost scales with new articles, not with history.
+"""
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection
+
+from .db import INSERT_MAX_PARAMS
+
+NEWS_OVERLAP_MINUTES = float(os.getenv("INGESTION_NEWS_OVERLAP_MINUTES", "60"))
+NEWS_LOOKBACK_HOURS = float(os.getenv("INGESTION_NEWS_LOOKBACK_HOURS", "24"))
+NEWS_SEEN_RETENTION_DAYS = float(os.getenv("INGESTION_NEWS_SEEN_RETENTION_DAYS", "7"))
+
+STORY_KEY = ("symbol", "event_time", "headline")
+TOTAL_COLUMNS = ("article_count", "sentiment_sum", "sentiment_count", "relevance_sum", "relevance_count")
+SIGNAL_COLUMNS = ("symbol", "avg_sentiment", "article_count", "avg_relevance", "as_of")
+
+
+def event_times(values: Iterable) -> pd.Series:
+    """Parse vendor ``event_time`` values (ISO 8601, any offset) as naive UTC nanosecond timestamps."""
+
+    return pd.to_datetime(pd.Series(values), utc=True, format="ISO8601").dt.tz_localize(None).dt.as_unit("ns")
+
+
+def story_hashes(frame: pd.DataFrame) -> np.ndarray:
+    """Signed 64-bit fingerprint of each row's :data:`STORY_KEY`, stable across processes and runs."""
+
+    key = pd.DataFrame(
+        {
+            "symbol": frame["symbol"].astype(str).to_numpy(dtype=object),
+            "event_time": event_times(frame["event_time"]).to_numpy(),
+            "headline": frame["headline"].astype(str).to_numpy(dtype=object),
+        }
+    )
+    return pd.util.hash_pandas_object(key, index=False).to_numpy().view(np.int64)
+
+
+def ensure_news_tables(conn: Connection) -> None:
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS news_seen_stories (
+                story_hash BIGINT PRIMARY KEY,
+                event_time TIMESTAMP NOT NULL
+            )
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS news_sentiment_totals (
+                symbol TEXT PRIMARY KEY,
+                article_count BIGINT NOT NULL,
+                sentiment_sum DOUBLE PRECISION NOT NULL,
+                sentiment_count BIGINT NOT NULL,
+                relevance_sum DOUBLE PRECISION NOT NULL,
+                relevance_count BIGINT NOT NULL,
+                last_event_time TIMESTAMP NOT NULL,
+                updated_at TIMESTAMP NOT NULL
+            )
+            """
+        )
+    )
+
+
+def _chunks(values: List, size: int) -> Iterable[List]:
+    for offset in range(0, len(values), size):
+        yield values[offset : offset + size]
+
+
+def stored_story_hashes(conn: Connection, hashes: np.ndarray) -> Set[int]:
+    """Return the members of ``hashes`` already recorded in ``news_seen_stories``."""
+
+    ensure_news_tables(conn)
+    statement = text("SELECT story_hash FROM news_seen_stories WHERE story_hash IN :hashes").bindparams(
+        bindparam("hashes", expanding=True)
+    )
+    found: Set[int] = set()
+    for chunk in _chunks(hashes.tolist(), INSERT_MAX_PARAMS):
+        found.update(conn.execute(statement, {"hashes": chunk}).scalars())
+    return found
+
+
+def unseen_stories(conn: Connection, page: pd.DataFrame, seen: Set[int]) -> pd.DataFrame:
+    """Drop rows of ``page`` already returned in this run (``seen``, updated in place) or already stored."""
+
+    if page.empty:
+        return page
+    hashes = story_hashes(page)
+    fresh = ~pd.Series(hashes).duplicated().to_numpy()
+    fresh &= np.fromiter((value not in seen for value in hashes.tolist()), dtype=bool, count=len(hashes))
+    stored = stored_story_hashes(conn, hashes[fresh])
+    if stored:
+        fresh &= np.fromiter((value not in stored for value in hashes.tolist()), dtype=bool, count=len(hashes))
+    seen.update(hashes[fresh].tolist())
+    return page.loc[fresh]
+
+
+def claim_stories(conn: Connection, frame: pd.DataFrame) -> np.ndarray:
+    """Record ``frame``'s stories as seen; return a mask of the rows this call inserted.
+
+    A story claimed by an earlier load, by a concurrent run, or by an earlier
+    row of ``frame`` is masked out, so it never reaches the running totals
+    twice. Call inside the transaction that loads the claimed rows.
+    """
+
+    if frame.empty:
+        return np.zeros(0, dtype=bool)
+    ensure_news_tables(conn)
+    hashes = story_hashes(frame)
+    times = [value.to_pydatetime() for value in event_times(frame["event_time"])]
+    claimed: Set[int] = set()
+    rows = INSERT_MAX_PARAMS // 2
+    for offset in range(0, len(hashes), rows):
+        chunk = hashes[offset : offset + rows].tolist()
+        values = ", ".join(f"(:h{idx}, :t{idx})" for idx in range(len(chunk)))
+        params = {f"h{idx}": value for idx, value in enumerate(chunk)}
+        params.update({f"t{idx}": value for idx, value in enumerate(times[offset : offset + rows])})
+        statement = text(
+            f"INSERT INTO news_seen_stories(story_hash, event_time) VALUES {values} "
+            "ON CONFLICT(story_hash) DO NOTHING RETURNING story_hash"
+        )
+        claimed.update(conn.execute(statement, params).scalars())
+    mask = np.fromiter((value in claimed for value in hashes.tolist()), dtype=bool, count=len(hashes))
+    return mask & ~pd.Series(hashes).duplicated().to_numpy()
+
+
+def prune_seen_stories(conn: Connection, *, before: datetime) -> int:
+    """Forget fingerprints older than ``before``; the cursor never pages back that far again."""
+
+    ensure_news_tables(conn)
+    result = conn.execute(text("DELETE FROM news_seen_stories WHERE event_time < :before"), {"before": before})
+    return int(result.rowcount or 0)
+
+
+def read_news_cursor(conn: Connection, symbols: Iterable[str]) -> Optional[datetime]:
+    """Newest ``event_time`` folded into the totals for any of ``symbols``, or ``None`` before the first load."""
+
+    ensure_news_tables(conn)
+    statement = text("SELECT MAX(last_event_time) FROM news_sentiment_totals WHERE symbol IN :symbols").bindparams(
+        bindparam("symbols", expanding=True)
+    )
+    newest: Optional[pd.Timestamp] = None
+    for chunk in _chunks(list(symbols), INSERT_MAX_PARAMS):
+        value = conn.execute(statement, {"symbols": chunk}).scalar_one_or_none()
+        if value is not None:
+            stamp = pd.Timestamp(value)
+            newest = stamp if newest is None or stamp > newest else newest
+    return newest.to_pydatetime() if newest is not None else None
+
+
+def news_window_start(cursor: Optional[datetime], *, now: Optional[datetime] = None) -> datetime:
+    """Where the next run pages from.
+
+    It starts ``INGESTION_NEWS_OVERLAP_MINUTES`` before ``cursor`` to pick up
+    late-published stories, or ``INGESTION_NEWS_LOOKBACK_HOURS`` back on the
+    first run.
+    """
+
+    if cursor is None:
+        return (now or datetime.utcnow()) - timedelta(hours=NEWS_LOOKBACK_HOURS)
+    return cursor - timedelta(minutes=NEWS_OVERLAP_MINUTES)
+
+
+def apply_news_totals(conn: Connection, deltas: pd.DataFrame) -> pd.DataFrame:
+    """Add per-symbol ``deltas`` to ``news_sentiment_totals``; return the updated totals of those symbols."""
+
+    columns = ["symbol", *TOTAL_COLUMNS, "last_event_time"]
+    if deltas.empty:
+        return pd.DataFrame(columns=columns)
+    ensure_news_tables(conn)
+    updated_at = datetime.utcnow()
+    conn.execute(
+        text(
+            """
+            INSERT INTO news_sentiment_totals(
+                symbol, article_count, sentiment_sum, sentiment_count,
+                relevance_sum, relevance_count, last_event_time, updated_at
+            )
+            VALUES(
+                :symbol, :article_count, :sentiment_sum, :sentiment_count,
+                :relevance_sum, :relevance_count, :last_event_time, :updated_at
+            )
+            ON CONFLICT(symbol) DO UPDATE SET
+                article_count = news_sentiment_totals.article_count + EXCLUDED.article_count,
+                sentiment_sum = news_sentiment_totals.sentiment_sum + EXCLUDED.sentiment_sum,
+                sentiment_count = news_sentiment_totals.sentiment_count + EXCLUDED.sentiment_count,
+                relevance_sum = news_sentiment_totals.relevance_sum + EXCLUDED.relevance_sum,
+                relevance_count = news_sentiment_totals.relevance_count + EXCLUDED.relevance_count,
+                last_event_time = CASE
+                    WHEN EXCLUDED.last_event_time > news_sentiment_totals.last_event_time
+                    THEN EXCLUDED.last_event_time
+                    ELSE news_sentiment_totals.last_event_time
+                END,
+                updated_at = EXCLUDED.updated_at
+            """
+        ),
+        [
+            {
+                "symbol": str(row.symbol),
+                "article_count": int(row.article_count),
+                "sentiment_sum": float(row.sentiment_sum),
+                "sentiment_count": int(row.sentiment_count),
+                "relevance_sum": float(row.relevance_sum),
+                "relevance_count": int(row.relevance_count),
+                "last_event_time": pd.Timestamp(row.last_event_time).to_pydatetime(),
+                "updated_at": updated_at,
+            }
+            for row in deltas[columns].itertuples(index=False)
+        ],
+    )
+    statement = text(f"SELECT {', '.join(columns)} FROM news_sentiment_totals WHERE symbol IN :symbols").bindparams(
+        bindparam("symbols", expanding=True)
+    )
+    rows: List = []
+    for chunk in _chunks([str(symbol) for symbol in deltas["symbol"]], INSERT_MAX_PARAMS):
+        rows.extend(conn.execute(statement, {"symbols": chunk}).all())
+    totals = pd.DataFrame(rows, columns=columns)
+    totals["last_event_time"] = pd.to_datetime(totals["last_event_time"])
+    return totals.sort_values("symbol", ignore_index=True)
+
+
+def sentiment_signals(totals: pd.DataFrame) -> pd.DataFrame:
+    """Curated ``news_sentiment_signals`` rows from running totals; ``as_of`` is each symbol's newest story."""
+
+    if totals.empty:
+        return pd.DataFrame(columns=list(SIGNAL_COLUMNS))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_sentiment = totals["sentiment_sum"].to_numpy(dtype=float) / totals["sentiment_count"].to_numpy(dtype=float)
+        avg_relevance = totals["relevance_sum"].to_numpy(dtype=float) / totals["relevance_count"].to_numpy(dtype=float)
+    return pd.DataFrame(
+        {
+            "symbol": totals["symbol"].to_numpy(),
+            "avg_sentiment": avg_sentiment,
+            "article_count": totals["article_count"].to_numpy(dtype=np.int64),
+            "avg_relevance": avg_relevance,
+            "as_of": pd.to_datetime(totals["last_event_time"]).to_numpy(),
+        }
+    )
@@ -0,0 +1,239 @@
+"""Publish curated rows to per-dataset Kafka topics after each load.
+
+Downstream services (scenarios, serving) consume ``<prefix><dataset>`` topics
+and update incrementally instead of re-querying whole tables. Each message
+holds up to ``INGESTION_PUBLISH_BATCH_ROWS`` rows of one symbol as a JSON
+array, keyed by symbol. All of a symbol's rows therefore land on one
+partition, in load order. The producer batches (``linger.ms``) and
+compresses (``compression.type``) messages on the wire.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+import pandas as pd
+
+from .dtypes import widen_float32
+from .metrics import REGISTRY, instrument_stage
+
+logger = logging.getLogger(__name__)
+
+try:  # pragma: no cover - optional dependency
+    from confluent_kafka import Producer  # type: ignore
+except Exception:  # pragma: no cover - executed when confluent-kafka isn't installed
+    Producer = None  # type: ignore
+
+KAFKA_BROKER = os.getenv("KAFKA_BROKER")
+TOPIC_PREFIX = os.getenv("INGESTION_TOPIC_PREFIX", "ingestion.")
+PUBLISH_BATCH_ROWS = int(os.getenv("INGESTION_PUBLISH_BATCH_ROWS", "500"))
+KAFKA_COMPRESSION = os.getenv("INGESTION_KAFKA_COMPRESSION", "lz4")
+KAFKA_LINGER_MS = int(os.getenv("INGESTION_KAFKA_LINGER_MS", "50"))
+FLUSH_TIMEOUT_SECONDS = float(os.getenv("INGESTION_PUBLISH_FLUSH_TIMEOUT", "30"))
+
+Headers = List[Tuple[str, bytes]]
+DeliveryCallback = Callable[[Any, Any], None]
+
+
+class MessageProducer(Protocol):
+    """The subset of ``confluent_kafka.Producer`` the publisher relies on."""
+
+    def produce(
+        self,
+        topic: str,
+        value: Optional[bytes] = None,
+        key: Optional[bytes] = None,
+        headers: Optional[Headers] = None,
+        on_delivery: Optional[DeliveryCallback] = None,
+    ) -> None: ...
+
+    def poll(self, timeout: float = 0) -> int: ...
+
+    def flush(self, timeout: float = -1) -> int: ...
+
+
+def kafka_config(bootstrap_servers: str) -> Dict[str, Any]:
+    return {
+        "bootstrap.servers": bootstrap_servers,
+        "client.id": "ingestion-publisher",
+        "enable.idempotence": True,
+        "acks": "all",
+        "compression.type": KAFKA_COMPRESSION,
+        "linger.ms": KAFKA_LINGER_MS,
+        "batch.size": 1_000_000,
+    }
+
+
+def topic_for(dataset: str) -> str:
+    return f"{TOPIC_PREFIX}{dataset}"
+
+
+@dataclass
+class CuratedPublisher:
+    """Turn curated frames into symbol-keyed, row-batched messages on ``producer``."""
+
+    producer: MessageProducer
+    batch_rows: int = PUBLISH_BATCH_ROWS
+    flush_timeout: float = FLUSH_TIMEOUT_SECONDS
+
+    def publish(self, dataset: str, frame: pd.DataFrame, *, key_column: str = "symbol") -> int:
+        """Publish ``frame`` to :func:`topic_for` ``dataset`` and wait for delivery; return the message count.
+
+        Frames without ``key_column`` are keyed by ``dataset`` so they keep a
+        single ordered partition. Delivery failures are logged and counted, not
+        raised. The rows are already committed to Postgres, which stays the
+        source of truth for a consumer that needs to resync.
+        """
+
+        if frame.empty:
+            return 0
+        topic = topic_for(dataset)
+        headers: Headers = [("dataset", dataset.encode("utf-8")), ("content-type", b"application/json")]
+        started = time.perf_counter()
+        # Delivery reports may be served on another publishing thread's poll; count per call.
+        errors: List[Any] = []
+        on_delivery = partial(_collect_error, errors)
+        messages = nbytes = 0
+        for key, value in self._messages(frame, key_column, dataset):
+            self._produce(topic, key, value, headers, on_delivery)
+            messages += 1
+            nbytes += len(value)
+        undelivered = self.producer.flush(self.flush_timeout)
+        failures = len(errors) + undelivered
+        labels = {"dataset": dataset}
+        REGISTRY.inc("ingestion_published_rows_total", len(frame), "Curated rows published", **labels)
+        REGISTRY.inc("ingestion_published_messages_total", messages, "Messages published", **labels)
+        REGISTRY.inc("ingestion_published_bytes_total", nbytes, "Uncompressed message bytes published", **labels)
+        REGISTRY.observe("ingestion_publish_seconds", time.perf_counter() - started, "Time to publish a load", **labels)
+        if failures:
+            REGISTRY.inc("ingestion_publish_failures_total", failures, "Messages not delivered", **labels)
+            logger.error("%d of %d messages for %s were not delivered to %s", failures, messages, dataset, topic)
+        return messages
+
+    def _messages(self, frame: pd.DataFrame, key_column: str, dataset: str) -> Iterator[Tuple[bytes, bytes]]:
+        step = max(1, self.batch_rows)
+        frame = widen_float32(frame)
+        if key_column in frame.columns:
+            groups: Iterable[Tuple[Any, pd.DataFrame]] = frame.groupby(key_column, observed=True, sort=False)
+        else:
+            groups = [(dataset, frame)]
+        for key, group in groups:
+            encoded_key = str(key).encode("utf-8")
+            for offset in range(0, len(group), step):
+                chunk = group.iloc[offset : offset + step]
+                body = chunk.to_json(orient="records", date_format="iso", date_unit="us", double_precision=15)
+                yield encoded_key, body.encode("utf-8")
+
+    def _produce(self, topic: str, key: bytes, value: bytes, headers: Headers, on_delivery: DeliveryCallback) -> None:
+        while True:
+            try:
+                self.producer.produce(topic, value=value, key=key, headers=headers, on_delivery=on_delivery)
+                break
+            except BufferError:
+                # Local queue full: serve delivery reports until librdkafka drains some of it.
+                self.producer.poll(0.5)
+        self.producer.poll(0)
+
+
+def _collect_error(errors: List[Any], error: Any, message: Any) -> None:
+    if error is not None:
+        errors.append(error)
+
+
+@dataclass
+class BrokerMessage:
+    topic: str
+    partition: int
+    offset: int
+    key: Optional[bytes]
+    value: Optional[bytes]
+    headers: Headers
+
+
+@dataclass
+class InMemoryBroker:
+    """In-process stand-in for a Kafka cluster plus producer, for tests and local runs.
+
+    Keys are hashed to ``partitions`` like Kafka's partitioner, so per-key
+    ordering can be asserted. Delivery is immediate.
+    """
+
+    partitions: int = 3
+    _topics: Dict[str, List[List[BrokerMessage]]] = field(default_factory=dict, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def produce(
+        self,
+        topic: str,
+        value: Optional[bytes] = None,
+        key: Optional[bytes] = None,
+        headers: Optional[Headers] = None,
+        on_delivery: Optional[DeliveryCallback] = None,
+    ) -> None:
+        with self._lock:
+            log = self._topics.setdefault(topic, [[] for _ in range(self.partitions)])
+            partition = zlib.crc32(key) % self.partitions if key is not None else 0
+            message = BrokerMessage(topic, partition, len(log[partition]), key, value, list(headers or []))
+            log[partition].append(message)
+        if on_delivery is not None:
+            on_delivery(None, message)
+
+    def poll(self, timeout: float = 0) -> int:
+        return 0
+
+    def flush(self, timeout: float = -1) -> int:
+        return 0
+
+    def topics(self) -> List[str]:
+        with self._lock:
+            return sorted(self._topics)
+
+    def messages(self, topic: str) -> List[BrokerMessage]:
+        """Every message on ``topic``, partition by partition in offset order."""
+
+        with self._lock:
+            return [message for partition in self._topics.get(topic, []) for message in partition]
+
+
+_PUBLISHER: Optional[CuratedPublisher] = None
+_PUBLISHER_LOCK = threading.Lock()
+_CONFIGURED = False
+
+
+def get_publisher() -> Optional[CuratedPublisher]:
+    """Return the process-wide publisher, or ``None`` when ``KAFKA_BROKER`` is unset or confluent-kafka is missing."""
+
+    global _PUBLISHER, _CONFIGURED
+    with _PUBLISHER_LOCK:
+        if not _CONFIGURED:
+            _CONFIGURED = True
+            if KAFKA_BROKER and Producer is not None:
+                _PUBLISHER = CuratedPublisher(Producer(kafka_config(KAFKA_BROKER)))
+            elif KAFKA_BROKER:
+                logger.warning("KAFKA_BROKER is set but confluent-kafka is not installed; not publishing")
+        return _PUBLISHER
+
+
+def set_publisher(publisher: Optional[CuratedPublisher]) -> None:
+    """Install ``publisher`` for this process (``None`` disables publishing)."""
+
+    global _PUBLISHER, _CONFIGURED
+    with _PUBLISHER_LOCK:
+        _PUBLISHER = publisher
+        _CONFIGURED = True
+
+
+@instrument_stage()
+def publish_curated(dataset: str, frame: pd.DataFrame) -> int:
+    """Publish a committed load's curated rows when a publisher is configured."""
+
+    publisher = get_publisher()
+    if publisher is None:
+        return 0
+    return publisher.publish(dataset, frame)
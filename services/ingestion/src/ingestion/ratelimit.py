@@ -0,0 +1,145 @@
+"""Process-wide, adaptive token-bucket rate limiting for vendor APIs."""
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+# Requests per second per vendor; override with ``VENDOR_RATE_LIMITS=polygon=20,sec_edgar=5``.
+DEFAULT_RATE_LIMITS: Dict[str, float] = {
+    "polygon": 50.0,
+    "sec_edgar": 10.0,
+    "ravenpack": 20.0,
+}
+FALLBACK_RATE_LIMIT = 10.0
+MAX_RETRY_AFTER_SECONDS = float(os.getenv("VENDOR_MAX_RETRY_AFTER", "60"))
+
+
+def _parse_rate_limits(value: str) -> Dict[str, float]:
+    limits: Dict[str, float] = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        vendor, rate = item.split("=", 1)
+        limits[vendor.strip()] = float(rate)
+    return limits
+
+
+RATE_LIMITS: Dict[str, float] = {**DEFAULT_RATE_LIMITS, **_parse_rate_limits(os.getenv("VENDOR_RATE_LIMITS", ""))}
+
+
+@dataclass
+class TokenBucket:
+    """Thread-safe token bucket whose rate adapts to vendor throttling (AIMD).
+
+    ``acquire`` reserves a token and sleeps outside the lock until it is due,
+    so waiting threads are served in arrival order. ``throttled`` halves the
+    current rate and pauses every caller for the server-requested delay.
+    Tokens do not accrue during a pause, so callers queued behind it leave
+    one per ``1 / rate`` after it ends instead of all at once;
+    ``succeeded`` climbs back towards ``max_rate`` in small additive steps, so
+    sustained throughput settles just under the vendor's real limit.
+    """
+
+    max_rate: float
+    burst: Optional[float] = None
+    min_rate: Optional[float] = None
+    increase_step: float = 0.05
+    decrease_factor: float = 0.5
+    clock: Callable[[], float] = time.monotonic
+    sleep: Callable[[float], None] = time.sleep
+    rate: float = field(init=False)
+    _tokens: float = field(init=False, repr=False)
+    _updated: float = field(init=False, repr=False)
+    _paused_until: float = field(init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.max_rate <= 0:
+            raise ValueError("max_rate must be positive")
+        self.burst = self.burst if self.burst is not None else max(1.0, self.max_rate)
+        self.min_rate = self.min_rate if self.min_rate is not None else self.max_rate / 50
+        self.rate = self.max_rate
+        self._tokens = self.burst
+        self._updated = self.clock()
+        self._paused_until = self._updated
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - max(self._updated, self._paused_until)
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = max(self._updated, now)
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available; returns the seconds waited."""
+
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self._tokens -= 1.0
+            wait = max(self._paused_until - now, 0.0) + max(-self._tokens, 0.0) / self.rate
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def throttled(self, delay: float) -> None:
+        """Record a 429/503: cut the rate and pause all callers for ``delay`` seconds."""
+
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            # One request may go when the pause ends; the rest follow at the reduced rate.
+            self._tokens = min(self._tokens, 1.0)
+            self._paused_until = max(self._paused_until, now + delay)
+
+    def succeeded(self) -> None:
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(self.clock())
+                self.rate = min(self.max_rate, self.rate + self.max_rate * self.increase_step)
+
+
+_LIMITERS: Dict[str, TokenBucket] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def rate_limiter(vendor: str) -> TokenBucket:
+    """Return the limiter shared by every client, thread and task talking to ``vendor``."""
+
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(vendor)
+        if limiter is None:
+            limiter = TokenBucket(RATE_LIMITS.get(vendor, FALLBACK_RATE_LIMIT))
+            _LIMITERS[vendor] = limiter
+        return limiter
+
+
+def retry_after_seconds(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Parse a ``Retry-After`` header (delta-seconds or HTTP-date), capped at ``VENDOR_MAX_RETRY_AFTER``."""
+
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            moment = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        seconds = (moment - (now or datetime.now(timezone.utc))).total_seconds()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER_SECONDS)
+
+
+def backoff_seconds(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter: uniform in ``[0, min(cap, base * 2**(attempt-1))]``."""
+
+    return random.uniform(0.0, min(cap, base * 2 ** (attempt - 1)))
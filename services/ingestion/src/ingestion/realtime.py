@@ -0,0 +1,341 @@
+"""Real-time equity bars with O(1) online rolling features and micro-batched loads.
+
+A feed yields :class:`Bar` updates for the current daily bar of each symbol.
+A later update with the same timestamp revises that bar.
+:class:`OnlineEquityFeatures` keeps, per symbol, the previous close and one
+ring buffer per window for volumes and returns. Means and sample variances
+are maintained with add/remove Welford updates, so each update costs
+O(windows) regardless of history. The results match
+``transform_equity_prices``: ``return_1d``, ``volume_ma_{w}`` and
+``volatility_{w}d``.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Mapping, Optional, Sequence
+
+import pandas as pd
+
+from .features import volatility_column, volume_column
+
+logger = logging.getLogger(__name__)
+
+try:  # pragma: no cover - optional dependency
+    from websockets.sync.client import connect as websocket_connect  # type: ignore
+except Exception:  # pragma: no cover - executed when websockets isn't installed
+    websocket_connect = None  # type: ignore
+
+POLYGON_STREAM_URL = "wss://socket.polygon.io/stocks"
+# Polygon stamps daily aggregates with the New York session midnight, in UTC.
+SESSION_TZ = ZoneInfo("America/New_York")
+
+BatchLoader = Callable[[pd.DataFrame, pd.DataFrame], None]
+
+
+@dataclass(frozen=True)
+class Bar:
+    symbol: str
+    ts: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+@dataclass
+class RollingWindow:
+    """Last ``size`` values (NaN allowed) with the count, mean and M2 of the valid ones.
+
+    The value evicted by the latest :meth:`push` is kept so :meth:`revise` can
+    replace the newest value without a rescan.
+    """
+
+    size: int
+    values: Deque[float] = field(init=False)
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    _evicted: Optional[float] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.values = deque()
+
+    def push(self, value: float) -> None:
+        self._evicted = None
+        if len(self.values) == self.size:
+            self._evicted = self.values.popleft()
+            self._remove(self._evicted)
+        self.values.append(value)
+        self._add(value)
+
+    def revise(self, value: float) -> None:
+        """Replace the most recently pushed value with ``value``."""
+
+        self._remove(self.values.pop())
+        if self._evicted is not None:
+            self.values.appendleft(self._evicted)
+            self._add(self._evicted)
+        self.push(value)
+
+    def _add(self, value: float) -> None:
+        if math.isnan(value):
+            return
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def _remove(self, value: float) -> None:
+        if math.isnan(value):
+            return
+        if self.count == 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.count -= 1
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+
+    def average(self) -> float:
+        return self.mean if self.count else math.nan
+
+    def stdev(self, ddof: int = 1) -> float:
+        return math.sqrt(self.m2 / (self.count - ddof)) if self.count > ddof else math.nan
+
+
+def _pct_change(close: float, previous: float) -> float:
+    """``close / previous - 1`` with numpy's semantics (no exception on a zero close)."""
+
+    if previous == 0:
+        return math.nan if close == 0 or math.isnan(close) else math.copysign(math.inf, close)
+    return close / previous - 1.0
+
+
+@dataclass
+class _SymbolState:
+    windows: Sequence[int]
+    last_ts: Optional[datetime] = None
+    previous_close: float = math.nan
+    # Close before the latest bar, so a revision of that bar can recompute its return.
+    prior_close: float = math.nan
+    volumes: Dict[int, RollingWindow] = field(init=False)
+    returns: Dict[int, RollingWindow] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.volumes = {window: RollingWindow(window) for window in self.windows}
+        self.returns = {window: RollingWindow(window) for window in self.windows}
+
+    def apply(self, bar: Bar, *, revision: bool = False) -> Dict[str, Any]:
+        if not revision:
+            self.prior_close = self.previous_close
+        return_1d = _pct_change(bar.close, self.prior_close)
+        row: Dict[str, Any] = {"symbol": bar.symbol, "ts": bar.ts, "close": bar.close, "return_1d": return_1d}
+        for window in self.windows:
+            volumes, returns = self.volumes[window], self.returns[window]
+            if revision:
+                volumes.revise(float(bar.volume))
+                returns.revise(return_1d)
+            else:
+                volumes.push(float(bar.volume))
+                returns.push(return_1d)
+            row[volume_column(window)] = volumes.average()
+            row[volatility_column(window)] = returns.stdev()
+        self.previous_close = bar.close
+        self.last_ts = bar.ts
+        return row
+
+
+class OnlineEquityFeatures:
+    """Per-symbol online state producing curated equity rows one bar at a time."""
+
+    def __init__(self, windows: Sequence[int]) -> None:
+        self.windows = tuple(windows)
+        self._states: Dict[str, _SymbolState] = {}
+        self.late_bars = 0
+
+    def update(self, bar: Bar) -> Optional[Dict[str, Any]]:
+        """Apply ``bar`` and return its curated row, or ``None`` if it has no return or is late.
+
+        An update for the symbol's latest timestamp revises that bar in place.
+        Older timestamps are counted in :attr:`late_bars` and ignored.
+        """
+
+        state = self._states.get(bar.symbol)
+        if state is None:
+            state = self._states[bar.symbol] = _SymbolState(self.windows)
+        elif bar.ts < state.last_ts:
+            self.late_bars += 1
+            logger.debug("Dropping late %s bar for %s; latest is %s", bar.ts, bar.symbol, state.last_ts)
+            return None
+        row = state.apply(bar, revision=bar.ts == state.last_ts)
+        return row if not math.isnan(row["return_1d"]) else None
+
+    def seed(self, history: pd.DataFrame) -> None:
+        """Warm the state from raw bars, e.g. each symbol's last ``max(windows) + 1`` rows."""
+
+        for bar in bars_from_frame(history):
+            self.update(bar)
+
+
+def bars_from_frame(frame: pd.DataFrame) -> Iterator[Bar]:
+    if frame.empty:
+        return
+    ordered = frame.sort_values("ts", kind="stable")
+    columns = [ordered[name].tolist() for name in ("symbol", "ts", "open", "high", "low", "close", "volume")]
+    for symbol, ts, open_, high, low, close, volume in zip(*columns):
+        yield Bar(str(symbol), pd.Timestamp(ts).to_pydatetime(), open_, high, low, close, float(volume))
+
+
+@dataclass
+class ReplayBarFeed:
+    """Local stand-in for a live feed: replays raw bars in time order, optionally paced.
+
+    ``interval`` seconds are slept between bars (0 replays as fast as possible).
+    """
+
+    frame: pd.DataFrame
+    interval: float = 0.0
+
+    def __iter__(self) -> Iterator[Optional[Bar]]:
+        for bar in bars_from_frame(self.frame):
+            if self.interval:
+                time.sleep(self.interval)
+            yield bar
+
+
+@dataclass
+class PolygonBarFeed:
+    """Daily bars built from Polygon's per-minute aggregate (``AM``) websocket stream.
+
+    Each minute aggregate updates the symbol's bar for its session (open from
+    the first minute, high/low extremes, last close, summed volume), stamped
+    like the REST daily bars, and the revised daily bar is yielded. ``None`` is yielded after
+    ``idle_timeout`` seconds without messages so callers can flush on time.
+    """
+
+    api_key: str
+    symbols: Sequence[str]
+    url: str = POLYGON_STREAM_URL
+    idle_timeout: float = 1.0
+    _days: Dict[str, Bar] = field(default_factory=dict, init=False, repr=False)
+
+    def __iter__(self) -> Iterator[Optional[Bar]]:
+        if websocket_connect is None:
+            raise RuntimeError("PolygonBarFeed requires the 'websockets' package")
+        with websocket_connect(self.url) as socket:
+            socket.send(json.dumps({"action": "auth", "params": self.api_key}))
+            socket.send(json.dumps({"action": "subscribe", "params": ",".join(f"AM.{s}" for s in self.symbols)}))
+            while True:
+                try:
+                    payload = socket.recv(timeout=self.idle_timeout)
+                except TimeoutError:
+                    yield None
+                    continue
+                for event in json.loads(payload):
+                    if event.get("ev") == "AM":
+                        yield self._roll_minute(event)
+
+    def _roll_minute(self, event: Mapping[str, Any]) -> Bar:
+        symbol = event["sym"]
+        local = datetime.fromtimestamp(event["s"] / 1000, tz=SESSION_TZ)
+        midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        session = midnight.astimezone(timezone.utc).replace(tzinfo=None)
+        current = self._days.get(symbol)
+        if current is None or current.ts != session:
+            current = Bar(symbol, session, event["o"], event["h"], event["l"], event["c"], event["v"])
+        else:
+            current = Bar(
+                symbol,
+                session,
+                current.open,
+                max(current.high, event["h"]),
+                min(current.low, event["l"]),
+                event["c"],
+                current.volume + event["v"],
+            )
+        self._days[symbol] = current
+        return current
+
+
+@dataclass
+class RealtimeReport:
+    bars: int = 0
+    late_bars: int = 0
+    batches: int = 0
+    curated_rows: int = 0
+    last_updated: Optional[datetime] = None
+
+
+def run_bar_stream(
+    feed: Iterable[Optional[Bar]],
+    features: OnlineEquityFeatures,
+    *,
+    load_batch: BatchLoader,
+    flush_rows: int,
+    flush_seconds: float,
+    max_bars: Optional[int] = None,
+    clock: Callable[[], float] = time.monotonic,
+) -> RealtimeReport:
+    """Consume ``feed`` and hand micro-batches of ``(raw, curated)`` frames to ``load_batch``.
+
+    A batch is flushed once ``flush_rows`` bars are buffered or ``flush_seconds``
+    have passed since the batch started (checked on every update and on idle
+    ``None`` ticks), and at the end of the feed. Revisions within a batch keep
+    only the latest row per ``(symbol, ts)``, so loads should upsert.
+    """
+
+    report = RealtimeReport()
+    raw_rows: Dict[tuple, Dict[str, Any]] = {}
+    curated_rows: Dict[tuple, Dict[str, Any]] = {}
+    started: Optional[float] = None
+
+    def flush() -> None:
+        nonlocal started
+        started = None
+        if not raw_rows:
+            return
+        raw = pd.DataFrame(list(raw_rows.values()))
+        curated = pd.DataFrame(list(curated_rows.values()))
+        raw_rows.clear()
+        curated_rows.clear()
+        load_batch(raw, curated)
+        report.batches += 1
+        report.curated_rows += len(curated)
+        if not curated.empty:
+            latest = pd.Timestamp(curated["ts"].max()).to_pydatetime()
+            report.last_updated = max(report.last_updated or latest, latest)
+
+    for bar in feed:
+        if bar is not None:
+            report.bars += 1
+            key = (bar.symbol, bar.ts)
+            row = features.update(bar)
+            if features.late_bars == report.late_bars:
+                raw_rows[key] = {
+                    "symbol": bar.symbol,
+                    "ts": bar.ts,
+                    "open": bar.open,
+                    "high": bar.high,
+                    "low": bar.low,
+                    "close": bar.close,
+                    "volume": bar.volume,
+                }
+                if row is not None:
+                    curated_rows[key] = row
+            report.late_bars = features.late_bars
+            if started is None:
+                started = clock()
+        if started is not None and (len(raw_rows) >= flush_rows or clock() - started >= flush_seconds):
+            flush()
+        if max_bars is not None and report.bars >= max_bars:
+            break
+    flush()
+    return report
@@ -0,0 +1,188 @@
+"""Per-endpoint circuit breakers and hedged requests for vendor calls."""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+BREAKER_FAILURE_RATIO = float(os.getenv("VENDOR_BREAKER_FAILURE_RATIO", "0.5"))
+BREAKER_MIN_CALLS = int(os.getenv("VENDOR_BREAKER_MIN_CALLS", "10"))
+BREAKER_WINDOW = int(os.getenv("VENDOR_BREAKER_WINDOW", "50"))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv("VENDOR_BREAKER_COOLDOWN", "30"))
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_POOL_SIZE = int(os.getenv("VENDOR_HEDGE_POOL_SIZE", "64"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitBreaker:
+    """Failure-ratio circuit breaker over a sliding window of recent calls.
+
+    Once at least ``min_calls`` outcomes are recorded and the failure share
+    reaches ``failure_ratio``, the breaker opens and ``allow_request`` refuses
+    calls for ``cooldown`` seconds. After that a single
+    probe is let through (half-open): success closes the breaker and clears
+    the window, failure opens it for another cool-down. Callers must record an
+    outcome for every allowed request, whatever it raised, or the probe stays
+    outstanding and the endpoint is refused for good.
+    """
+
+    name: str
+    failure_ratio: float = BREAKER_FAILURE_RATIO
+    min_calls: int = BREAKER_MIN_CALLS
+    window: int = BREAKER_WINDOW
+    cooldown: float = BREAKER_COOLDOWN_SECONDS
+    clock: Callable[[], float] = time.monotonic
+    state: str = field(default=CLOSED, init=False)
+    _outcomes: Deque[bool] = field(init=False, repr=False)
+    _opened_at: float = field(default=0.0, init=False, repr=False)
+    _probing: bool = field(default=False, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._outcomes = deque(maxlen=self.window)
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() - self._opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self._probing = False
+                self._outcomes.clear()
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._open()
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_ratio:
+                self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opened_at = self.clock()
+        self._probing = False
+
+
+@dataclass
+class LatencyTracker:
+    """Recent request latencies for one endpoint, used to pick the hedge delay."""
+
+    samples: int = 200
+    _latencies: Deque[float] = field(init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._latencies = deque(maxlen=self.samples)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def percentile(self, q: float = HEDGE_PERCENTILE) -> Optional[float]:
+        """Return the ``q`` quantile, or ``None`` until ``HEDGE_MIN_SAMPLES`` latencies are known."""
+
+        with self._lock:
+            if len(self._latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_TRACKERS: Dict[str, LatencyTracker] = {}
+_REGISTRY_LOCK = threading.Lock()
+_HEDGE_POOL: Optional[ThreadPoolExecutor] = None
+
+
+def circuit_breaker(endpoint: str) -> CircuitBreaker:
+    """Return the process-wide breaker for ``endpoint`` (e.g. ``"polygon:aggregates"``)."""
+
+    with _REGISTRY_LOCK:
+        breaker = _BREAKERS.get(endpoint)
+        if breaker is None:
+            breaker = _BREAKERS[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+
+def latency_tracker(endpoint: str) -> LatencyTracker:
+    with _REGISTRY_LOCK:
+        tracker = _TRACKERS.get(endpoint)
+        if tracker is None:
+            tracker = _TRACKERS[endpoint] = LatencyTracker()
+        return tracker
+
+
+def _hedge_pool() -> ThreadPoolExecutor:
+    global _HEDGE_POOL
+    with _REGISTRY_LOCK:
+        if _HEDGE_POOL is None:
+            _HEDGE_POOL = ThreadPoolExecutor(max_workers=HEDGE_POOL_SIZE, thread_name_prefix="vendor-hedge")
+        return _HEDGE_POOL
+
+
+def hedged_call(
+    call: Callable[[], T],
+    hedge_after: float,
+    *,
+    discard: Optional[Callable[[T], Any]] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> T:
+    """Run ``call``; if it has not finished after ``hedge_after`` seconds, race a second copy.
+
+    The first successful result wins. ``discard`` receives the loser's result
+    once it completes (e.g. to close a streamed response). Only use this for
+    idempotent calls. If both copies fail, the primary's error is raised.
+    """
+
+    pool = executor or _hedge_pool()
+    primary = pool.submit(call)
+    done, _ = wait([primary], timeout=hedge_after)
+    if done:
+        # Fast failures are not slow requests; they go to the caller's retry policy.
+        return primary.result()
+    backup = pool.submit(call)
+    pending = {primary, backup}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                for loser in (done | pending) - {future}:
+                    _discard_when_done(loser, discard)
+                return future.result()
+    return primary.result()
+
+
+def _discard_when_done(future: "Future[T]", discard: Optional[Callable[[T], Any]]) -> None:
+    if discard is None:
+        return
+
+    def _callback(done: "Future[T]") -> None:
+        if done.exception() is None:
+            discard(done.result())
+
+    future.add_done_callback(_callback)
@@ -0,0 +1,181 @@
+"""Bounded-memory fetch→transform→load for per-symbol time series."""
+from __future__ import annotations
+
+import contextvars
+import logging
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from .vendors import VendorRequestError
+
+PageSource = Callable[[str], Iterable[pd.DataFrame]]
+Transform = Callable[[pd.DataFrame], pd.DataFrame]
+RowFilter = Callable[[str, pd.DataFrame], pd.DataFrame]
+BatchLoader = Callable[[pd.DataFrame, pd.DataFrame], None]
+
+logger = logging.getLogger(__name__)
+
+# Pages a fetching symbol may hold ready ahead of the consumer.
+PAGES_AHEAD = 2
+_DONE = object()
+PageItem = Union[Tuple[pd.DataFrame, pd.DataFrame], BaseException, object]
+
+
+@dataclass
+class StreamReport:
+    symbols: int = 0
+    batches: int = 0
+    raw_rows: int = 0
+    curated_rows: int = 0
+    last_updated: Optional[datetime] = None
+    failed_symbols: List[str] = field(default_factory=list)
+
+
+def transform_pages(
+    pages: Iterable[pd.DataFrame],
+    transform: Transform,
+    tail_rows: int,
+    time_column: str = "ts",
+) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """Yield ``(raw_page, curated_page)`` for one symbol's pages, oldest first.
+
+    The last ``tail_rows`` raw rows are carried into the next page's transform
+    and their curated rows dropped again, so rolling features match a single
+    transform over the whole history while only one page is held at a time.
+    """
+
+    tail: Optional[pd.DataFrame] = None
+    for page in pages:
+        if page.empty:
+            continue
+        history = page if tail is None else pd.concat([tail, page], ignore_index=True)
+        curated = transform(history)
+        if tail is not None and not curated.empty:
+            curated = curated.loc[pd.to_datetime(curated[time_column]) > tail[time_column].iloc[-1]]
+        tail = history.tail(tail_rows).reset_index(drop=True)
+        yield page, curated
+
+
+def _concat(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def stream_symbols(
+    symbols: Sequence[str],
+    fetch_pages: PageSource,
+    *,
+    transform: Transform,
+    load_batch: BatchLoader,
+    tail_rows: int,
+    batch_rows: int,
+    max_workers: int = 1,
+    keep: Optional[RowFilter] = None,
+    time_column: str = "ts",
+) -> StreamReport:
+    """Fetch, transform and load ``symbols`` with memory bounded by ``batch_rows``.
+
+    Up to ``max_workers`` symbols are fetched and transformed concurrently (each
+    in a copy of the caller's context), with at most twice that many symbols
+    in flight. Each symbol's pages go to the buffer as they are transformed,
+    with only the rolling-window tail carried between them, and every symbol
+    holds at most ``PAGES_AHEAD`` pages ready. Pages are buffered in input
+    order and handed to ``load_batch`` once ``batch_rows`` raw rows have
+    accumulated, so a symbol with a long history spans several batches.
+    ``keep`` filters each page's raw and curated rows before buffering, e.g. to
+    drop rows at or before a watermark. A vendor failure skips the rest of
+    that symbol only.
+    """
+
+    report = StreamReport()
+    stopped = threading.Event()
+
+    def put(pages: "queue.Queue[PageItem]", item: PageItem) -> bool:
+        while not stopped.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def process(symbol: str, pages: "queue.Queue[PageItem]") -> None:
+        try:
+            for raw, curated in transform_pages(fetch_pages(symbol), transform, tail_rows, time_column):
+                if keep is not None:
+                    raw, curated = keep(symbol, raw), keep(symbol, curated)
+                if not put(pages, (raw, curated)):
+                    return
+        except BaseException as exc:  # noqa: BLE001 - handed to the consumer, which decides what is fatal
+            put(pages, exc)
+            return
+        put(pages, _DONE)
+
+    raw_buffer: List[pd.DataFrame] = []
+    curated_buffer: List[pd.DataFrame] = []
+    buffered = 0
+
+    def flush() -> None:
+        nonlocal buffered
+        if not raw_buffer and not curated_buffer:
+            return
+        raw, curated = _concat(raw_buffer), _concat(curated_buffer)
+        raw_buffer.clear()
+        curated_buffer.clear()
+        buffered = 0
+        if raw.empty and curated.empty:
+            return
+        load_batch(raw, curated)
+        report.batches += 1
+        report.raw_rows += len(raw)
+        report.curated_rows += len(curated)
+        if not curated.empty:
+            latest = pd.to_datetime(curated[time_column]).max().to_pydatetime()
+            report.last_updated = max(report.last_updated or latest, latest)
+
+    def consume(symbol: str, pages: "queue.Queue[PageItem]") -> None:
+        nonlocal buffered
+        report.symbols += 1
+        while True:
+            item = pages.get()
+            if item is _DONE:
+                return
+            if isinstance(item, VendorRequestError):
+                logger.error("Streaming fetch failed for symbol %s: %s", symbol, item)
+                report.failed_symbols.append(symbol)
+                return
+            if isinstance(item, BaseException):
+                raise item
+            raw, curated = item
+            raw_buffer.append(raw)
+            curated_buffer.append(curated)
+            buffered += len(raw)
+            if buffered >= batch_rows:
+                flush()
+
+    workers = max(1, max_workers)
+    in_flight: Deque[Tuple[str, "queue.Queue[PageItem]"]] = deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stream-fetch") as executor:
+        try:
+            for symbol in symbols:
+                pages: "queue.Queue[PageItem]" = queue.Queue(maxsize=PAGES_AHEAD)
+                executor.submit(contextvars.copy_context().run, process, symbol, pages)
+                in_flight.append((symbol, pages))
+                if len(in_flight) >= 2 * workers:
+                    consume(*in_flight.popleft())
+            while in_flight:
+                consume(*in_flight.popleft())
+        finally:
+            # On an error, release workers blocked on pages nobody will read.
+            stopped.set()
+    flush()
+    return report
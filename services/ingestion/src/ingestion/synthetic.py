@@ -0,0 +1,347 @@
+"""Seeded, vectorized synthetic vendor data for offline runs and load tests."""
+from __future__ import annotations
+
+import hashlib
+import os
+import zlib
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:  # pragma: no cover - optional dependency
+    import pyarrow as pa  # type: ignore
+except Exception:  # pragma: no cover - executed when pyarrow isn't available
+    pa = None  # type: ignore
+
+EQUITY_COLUMNS = ["ts", "open", "high", "low", "close", "volume", "symbol"]
+# Price paths start here, so any window is a slice of one path per symbol.
+EQUITY_EPOCH_YEAR = 1970
+# Each symbol's base price is its level at the start of this year.
+EQUITY_ANCHOR_YEAR = 2020
+
+
+def _stream_key(*parts: Any) -> int:
+    return zlib.crc32("|".join(str(part) for part in parts).encode("utf-8"))
+
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _mix(keys: np.ndarray) -> np.ndarray:
+    """SplitMix64 finaliser: a well-distributed uint64 hash of each key (wraps like C)."""
+
+    keys = keys ^ (keys >> np.uint64(30))
+    keys *= np.uint64(0xBF58476D1CE4E5B9)
+    keys ^= keys >> np.uint64(27)
+    keys *= np.uint64(0x94D049BB133111EB)
+    keys ^= keys >> np.uint64(31)
+    return keys
+
+
+def _uniform_pair(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Two uniform draws in (0, 1] per key, from the two 32-bit halves of one hash.
+
+    They are float32: ample for synthetic prices, and NumPy's float32
+    log/sin/cos are several times faster than float64.
+    """
+
+    hashed = _mix(keys)
+    scale = np.float32(2.0**-32)
+    low = ((hashed & np.uint64(0xFFFFFFFF)).astype(np.float32) + np.float32(0.5)) * scale
+    high = ((hashed >> np.uint64(32)).astype(np.float32) + np.float32(0.5)) * scale
+    return low, high
+
+
+def _normal_pair(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Two independent standard normal draws per key (Box-Muller over one hash)."""
+
+    first, second = _uniform_pair(keys)
+    radius = np.sqrt(np.float32(-2.0) * np.log(first))
+    angle = np.float32(2.0 * np.pi) * second
+    return radius * np.cos(angle), radius * np.sin(angle)
+
+
+def _business_days(start: Any, end: Any) -> pd.DatetimeIndex:
+    """Weekdays from ``start`` to ``end`` inclusive, as ``pd.bdate_range`` but without its per-day offsets."""
+
+    first = np.datetime64(pd.Timestamp(start).normalize().date(), "D")
+    last = np.datetime64(pd.Timestamp(end).normalize().date(), "D")
+    dates = np.arange(first, last + 1, dtype="datetime64[D]")
+    return pd.DatetimeIndex(dates[np.is_busday(dates)].astype("datetime64[ns]"))
+
+
+def _repeat_symbols(symbols: Sequence[str], times: int) -> Any:
+    """Each symbol ``times`` times, as the default string column (dictionary-decoded through Arrow when available)."""
+
+    if pa is None:
+        return np.repeat(np.array(symbols, dtype=object), times)
+    codes = pa.array(np.repeat(np.arange(len(symbols), dtype=np.int32), times))
+    return pa.DictionaryArray.from_arrays(codes, pa.array(symbols, pa.string())).cast(pa.large_string()).to_pandas()
+
+
+@lru_cache(maxsize=None)
+def _year_days(year: int) -> pd.DatetimeIndex:
+    return _business_days(f"{year}-01-01", f"{year}-12-31")
+
+
+@lru_cache(maxsize=None)
+def _days_per_year(last_year: int) -> np.ndarray:
+    """Business days in each year from :data:`EQUITY_EPOCH_YEAR` to ``last_year``."""
+
+    return np.array([len(_year_days(year)) for year in range(EQUITY_EPOCH_YEAR, last_year + 1)])
+
+
+@dataclass
+class SyntheticMarket:
+    """Reproducible synthetic market generator.
+
+    Every draw is keyed by ``(seed, stream, symbol/date)`` rather than by call
+    order, so a symbol's bars are identical whether it is generated alone,
+    concurrently, or as part of a 10k-symbol universe, and over any window
+    that contains them. ``seed=None`` draws a fresh seed per instance.
+    """
+
+    seed: Optional[int] = None
+    _seed: int = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._seed = self.seed if self.seed is not None else int(np.random.SeedSequence().entropy % (2**63))
+
+    def rng(self, *stream: Any) -> np.random.Generator:
+        return np.random.default_rng([self._seed, _stream_key(*stream)])
+
+    def _keys(self, stream: str, symbols: Sequence[str]) -> np.ndarray:
+        """One uint64 key per symbol for ``stream``; combined with a counter it keys a draw."""
+
+        seed = str(self._seed).encode("ascii")
+        digests = b"".join(
+            hashlib.blake2b(f"{stream}|{symbol}".encode("utf-8"), digest_size=8, key=seed).digest()
+            for symbol in symbols
+        )
+        return np.frombuffer(digests, dtype="<u8").astype(np.uint64)
+
+    def equity_bars(self, symbols: Iterable[str], start: datetime, end: datetime) -> pd.DataFrame:
+        """Daily OHLCV bars on business days for every symbol in ``symbols``, ordered by symbol then day.
+
+        Prices follow a per-symbol geometric random walk from
+        :data:`EQUITY_EPOCH_YEAR`. Every draw is a hash of ``(seed, stream,
+        symbol, day)`` (counter-based, so no generator is built per symbol or
+        year). Each year's innovations are shifted to sum to that year's total,
+        a per-``(symbol, year)`` draw, so the walk reaches any year without
+        generating the days before it, and a bar has the same value in every
+        window that contains it. The arithmetic runs one year at a time on a
+        ``(symbols, days)`` block.
+        """
+
+        symbol_list = list(symbols)
+        days = _business_days(start, end)
+        if not symbol_list or days.empty:
+            return pd.DataFrame(columns=EQUITY_COLUMNS)
+        columns = {name: np.empty((len(symbol_list), len(days))) for name in ("open", "high", "low", "close")}
+        volume = np.empty((len(symbol_list), len(days)), dtype=np.int64)
+        filled = 0
+        for block in self._equity_year_blocks(symbol_list, days):
+            width = block["close"].shape[1]
+            for name, values in columns.items():
+                values[:, filled : filled + width] = block[name]
+            volume[:, filled : filled + width] = block["volume"]
+            filled += width
+        return pd.DataFrame(
+            {
+                "ts": np.tile(days.to_numpy(), len(symbol_list)),
+                **{name: values.ravel() for name, values in columns.items()},
+                "volume": volume.ravel(),
+                "symbol": _repeat_symbols(symbol_list, len(days)),
+            }
+        )
+
+    def _equity_year_blocks(self, symbols: Sequence[str], days: pd.DatetimeIndex) -> Iterator[Dict[str, Any]]:
+        """Yield the window's bars one calendar year at a time as ``(symbols, days in year)`` arrays."""
+
+        first_year, last_year = days[0].year, days[-1].year
+        if first_year < EQUITY_EPOCH_YEAR:
+            raise ValueError(f"Synthetic bars start in {EQUITY_EPOCH_YEAR}, not {first_year}")
+        per_year = _days_per_year(max(last_year, EQUITY_ANCHOR_YEAR))
+        elapsed = np.concatenate([[0], np.cumsum(per_year)])  # business days before each year since the epoch
+        anchor = EQUITY_ANCHOR_YEAR - EQUITY_EPOCH_YEAR
+        volatility = 0.02
+
+        base = 20 + _uniform_pair(self._keys("equity-base", symbols))[0] * 380
+        drift = 0.0002 + 0.0004 * _normal_pair(self._keys("equity-drift", symbols))[0]
+        years = np.arange(1, len(per_year) + 1, dtype=np.uint64)
+        totals = _normal_pair(self._keys("equity-total", symbols)[:, None] + years * _GOLDEN)[0]
+        totals *= np.sqrt(per_year)
+        # Walk position at the start of every year, relative to the anchor year's start.
+        walked = np.concatenate([np.zeros((len(symbols), 1)), np.cumsum(totals, axis=1)], axis=1)
+        walked -= walked[:, [anchor]]
+
+        step_keys = self._keys("equity-step", symbols)[:, None]
+        bar_keys = self._keys("equity-bar", symbols)[:, None]
+        wick_keys = self._keys("equity-wick", symbols)[:, None]
+        for year in range(first_year, last_year + 1):
+            index = year - EQUITY_EPOCH_YEAR
+            count = int(per_year[index])
+            counters = np.arange(elapsed[index] + 1, elapsed[index] + count + 1, dtype=np.uint64) * _GOLDEN
+            draws = _normal_pair(step_keys + counters)[0]
+            innovations = draws - draws.mean(axis=1, keepdims=True) + totals[:, [index]] / count
+            path = walked[:, [index]] + np.cumsum(innovations, axis=1)
+            steps = np.arange(elapsed[index] - elapsed[anchor], elapsed[index] - elapsed[anchor] + count + 1)
+            log_close = np.log(base)[:, None] + drift[:, None] * steps + volatility * np.concatenate(
+                [walked[:, [index]], path], axis=1
+            )
+
+            year_days = _year_days(year)
+            inside = (year_days >= days[0]) & (year_days <= days[-1])
+            lo, hi = int(np.argmax(inside)), int(len(inside) - np.argmax(inside[::-1]))
+            counters = counters[lo:hi]
+            gaps, volume_noise = _normal_pair(bar_keys + counters)
+            upper_wicks, lower_wicks = _uniform_pair(wick_keys + counters)
+            close = np.exp(log_close[:, lo + 1 : hi + 1])
+            open_ = np.exp(log_close[:, lo:hi] + 0.25 * volatility * gaps)
+            high = np.maximum(open_, close) * (1 + 0.5 * volatility * upper_wicks)
+            low = np.minimum(open_, close) * (1 - 0.5 * volatility * lower_wicks)
+            yield {
+                "ts": year_days[lo:hi],
+                "open": np.round(open_, 2),
+                "high": np.round(high, 2),
+                "low": np.round(low, 2),
+                "close": np.round(close, 2),
+                "volume": np.exp(13.8 + 0.35 * volume_noise).astype(np.int64),
+            }
+
+    def iter_equity_bars(
+        self,
+        symbols: Sequence[str],
+        start: datetime,
+        end: datetime,
+        *,
+        batch_symbols: int = 500,
+    ) -> Iterator[pd.DataFrame]:
+        """Yield :meth:`equity_bars` in ``(symbol batch, year)`` chunks to bound memory for huge universes.
+
+        Each chunk is ordered by symbol then day; only one chunk's arrays exist at a time.
+        """
+
+        days = _business_days(start, end)
+        if days.empty:
+            return
+        for offset in range(0, len(symbols), batch_symbols):
+            batch = list(symbols[offset : offset + batch_symbols])
+            for block in self._equity_year_blocks(batch, days):
+                yield pd.DataFrame(
+                    {
+                        "ts": np.tile(block["ts"].to_numpy(), len(batch)),
+                        **{name: block[name].ravel() for name in ("open", "high", "low", "close", "volume")},
+                        "symbol": _repeat_symbols(batch, len(block["ts"])),
+                    }
+                )
+
+    def company_facts(self, cik: str, as_of: Optional[date] = None) -> Dict[str, Any]:
+        as_of = as_of or datetime.utcnow().date()
+        rng = self.rng("companyfacts", cik, as_of)
+        value = int(1_000_000_000 + rng.integers(-50_000_000, 50_000_000))
+        quarter = (as_of.month - 1) // 3
+        fact = {
+            "start": date(as_of.year, 3 * quarter + 1, 1).isoformat(),
+            "end": as_of.isoformat(),
+            "val": value,
+            "fp": f"Q{quarter + 1}",
+            "form": "10-Q",
+        }
+        return {
+            "cik": cik,
+            "facts": {
+                "IncomeStatement": {
+                    "Revenues": {
+                        "label": "Revenues",
+                        "units": {"USD": [fact]},
+                    }
+                }
+            },
+        }
+
+    def news(
+        self,
+        symbols: Iterable[str],
+        as_of: Optional[datetime] = None,
+        *,
+        articles_per_symbol: int = 1,
+    ) -> pd.DataFrame:
+        as_of = as_of or datetime.utcnow()
+        symbol_list = list(symbols)
+        symbol_array = np.repeat(np.array(symbol_list, dtype=object), articles_per_symbol)
+        draws = np.empty((2, len(symbol_list), articles_per_symbol))
+        for row, symbol in enumerate(symbol_list):
+            rng = self.rng("news", symbol, as_of.date())
+            draws[0, row] = rng.random(articles_per_symbol)
+            draws[1, row] = rng.uniform(-1, 1, articles_per_symbol)
+        headlines = pd.Series(symbol_array, dtype=object).radd("Synthetic headline for ")
+        if articles_per_symbol > 1:
+            article = np.tile(np.arange(articles_per_symbol), len(symbol_list))
+            headlines = headlines + " #" + pd.Series(article).astype(str)
+        return pd.DataFrame(
+            {
+                "symbol": symbol_array,
+                "headline": headlines.to_numpy(dtype=object),
+                "relevance": draws[0].ravel(),
+                "sentiment": draws[1].ravel(),
+                "event_time": as_of.isoformat(),
+            }
+        )
+
+    def macro_signals(self, as_of: Optional[datetime] = None) -> pd.DataFrame:
+        as_of = as_of or datetime.utcnow()
+        rng = self.rng("macro", as_of.date())
+        low = np.array([1.5, 1.0, 2.5])
+        high = np.array([3.5, 3.0, 5.0])
+        return pd.DataFrame(
+            {
+                "indicator": ["inflation", "gdp_growth", "rates"],
+                "value": rng.uniform(low, high),
+                "as_of": as_of,
+            }
+        )
+
+    def insider_activity(self, symbols: Iterable[str], as_of: Optional[datetime] = None) -> pd.DataFrame:
+        as_of = as_of or datetime.utcnow()
+        symbol_array = np.array(list(symbols), dtype=object)
+        size = len(symbol_array)
+        buys = np.empty(size, dtype=bool)
+        shares = np.empty(size, dtype=np.int64)
+        prices = np.empty(size)
+        for row, symbol in enumerate(symbol_array):
+            rng = self.rng("insider", symbol, as_of.date())
+            buys[row] = rng.random() < 0.5
+            shares[row] = rng.integers(100, 5001)
+            prices[row] = rng.uniform(50, 250)
+        return pd.DataFrame(
+            {
+                "symbol": symbol_array,
+                "insider": "Synthetic Insider",
+                "role": "Director",
+                "transaction_type": np.where(buys, "Buy", "Sell").astype(object),
+                "shares": shares,
+                "transaction_date": as_of.date(),
+                "price": prices,
+                "source": "synthetic",
+            }
+        )
+
+
+@lru_cache(maxsize=1)
+def default_market() -> SyntheticMarket:
+    """Process-wide generator seeded from ``INGESTION_SYNTHETIC_SEED`` (random when unset)."""
+
+    seed = os.getenv("INGESTION_SYNTHETIC_SEED")
+    return SyntheticMarket(seed=int(seed) if seed else None)
+
+
+def universe(size: int, prefix: str = "SYN") -> List[str]:
+    """Deterministic ticker names for load-testing universes."""
+
+    width = max(4, len(str(size - 1)))
+    return [f"{prefix}{idx:0{width}d}" for idx in range(size)]
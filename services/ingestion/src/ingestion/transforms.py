@@ -0,0 +1,439 @@
+"""Declarative transform plans compiled into fused, vectorized passes.
+
+A :class:`TransformPlan` lists a dataset's steps (:func:`derive`,
+:func:`where`, :func:`sort_by`, :func:`aggregate`) with the columns each one
+reads and writes. Compiling walks the steps backwards once to find the
+columns live after every step. Only input columns that something downstream
+reads are projected (projection pushdown), every column is dropped after its
+last reader, and derive steps that feed nothing are skipped.
+
+Execution keeps a dict of columns instead of building a frame per step.
+Consecutive filters are fused into one row selection, a plan sorts at most
+once, and only the output frame is materialised. Trailing filters run after
+dtype compaction, so rows are copied at their narrow dtypes. Each step's
+time and row counts are recorded in :mod:`ingestion.metrics` and returned in
+a :class:`PlanReport`.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .dtypes import compact_frame
+from .features import equity_rolling_features, grouped_pct_change, segment_starts, volatility_column, volume_column
+from .metrics import record_transform_step
+from .news import event_times
+
+Columns = Dict[str, pd.Series]
+StepFn = Callable[[Columns], Any]
+# ``None`` stands for "every column": the output of a plan whose columns depend on the data.
+Live = Optional[FrozenSet[str]]
+
+
+@dataclass(frozen=True)
+class Step:
+    kind: str
+    name: str
+    reads: Tuple[str, ...]
+    writes: Optional[Tuple[str, ...]] = ()
+    fn: Optional[StepFn] = None
+
+
+def derive(name: str, reads: Sequence[str], writes: Sequence[str], fn: StepFn) -> Step:
+    """Add or replace ``writes``; ``fn`` returns a mapping of row-aligned arrays, Series or scalars."""
+
+    return Step("derive", name, tuple(reads), tuple(writes), fn)
+
+
+def where(name: str, reads: Sequence[str], fn: StepFn) -> Step:
+    """Keep the rows for which ``fn`` returns true."""
+
+    return Step("filter", name, tuple(reads), (), fn)
+
+
+def sort_by(*keys: str) -> Step:
+    """Stable ascending sort with missing keys last, like ``sort_values``; a plan holds at most one."""
+
+    return Step("sort", "sort", tuple(keys))
+
+
+def aggregate(name: str, reads: Sequence[str], writes: Optional[Sequence[str]], fn: StepFn) -> Step:
+    """Replace every row with ``fn``'s result; ``writes=None`` when its columns depend on the data."""
+
+    return Step("aggregate", name, tuple(reads), tuple(writes) if writes is not None else None, fn)
+
+
+@dataclass
+class StepTiming:
+    step: str
+    seconds: float
+    rows_in: int
+    rows_out: int
+
+
+@dataclass
+class PlanReport:
+    plan: str
+    projected: Tuple[str, ...]
+    steps: List[StepTiming] = field(default_factory=list)
+
+    @property
+    def seconds(self) -> float:
+        return sum(timing.seconds for timing in self.steps)
+
+    def format(self) -> str:
+        lines = [f"{self.plan}: {self.seconds * 1000:.1f} ms, projected {', '.join(self.projected)}"]
+        for timing in self.steps:
+            rows = f"{timing.rows_in:>12,} -> {timing.rows_out:,} rows"
+            lines.append(f"  {timing.step:<22} {timing.seconds * 1000:10.2f} ms  {rows}")
+        return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class _CompiledPlan:
+    projection: Live
+    steps: Tuple[Step, ...]
+    live_after: Tuple[Live, ...]
+
+
+def _union(live: Live, columns: Sequence[str]) -> Live:
+    return None if live is None else live | frozenset(columns)
+
+
+@dataclass(frozen=True)
+class TransformPlan:
+    """A dataset's steps plus its output columns, renames and dtype policy table.
+
+    ``output=None`` emits every column live at the end, for plans whose
+    columns depend on the data (e.g. one per macro indicator).
+    """
+
+    name: str
+    steps: Tuple[Step, ...]
+    output: Optional[Tuple[str, ...]]
+    rename: Mapping[str, str] = field(default_factory=dict)
+    table: Optional[str] = None
+
+    @cached_property
+    def compiled(self) -> _CompiledPlan:
+        if sum(step.kind == "sort" for step in self.steps) > 1:
+            raise ValueError(f"Transform plan {self.name!r} sorts more than once")
+        live: Live = frozenset(self.output) if self.output is not None else None
+        steps: List[Step] = []
+        live_after: List[Live] = []
+        for step in reversed(self.steps):
+            if step.kind == "derive":
+                if live is not None and not live.intersection(step.writes or ()):
+                    continue
+                after = live
+                live = None if live is None else (live - frozenset(step.writes or ())) | frozenset(step.reads)
+            elif step.kind == "aggregate":
+                if live is not None and step.writes is not None and not live <= frozenset(step.writes):
+                    missing = ", ".join(sorted(live - frozenset(step.writes)))
+                    raise ValueError(f"Transform plan {self.name!r} reads {missing} after aggregate {step.name!r}")
+                after = live
+                live = frozenset(step.reads)
+            else:
+                after = live
+                live = _union(live, step.reads)
+            steps.append(step)
+            live_after.append(after)
+        return _CompiledPlan(live, tuple(reversed(steps)), tuple(reversed(live_after)))
+
+    @property
+    def projection(self) -> Live:
+        """Input columns the plan reads (``None`` when it needs all of them)."""
+
+        return self.compiled.projection
+
+    def __call__(self, frame: pd.DataFrame) -> pd.DataFrame:
+        return self.run(frame)[0]
+
+    def run(self, frame: pd.DataFrame) -> Tuple[pd.DataFrame, PlanReport]:
+        """Execute the plan over ``frame`` and return the output with its per-step timings."""
+
+        plan = self.compiled
+        names = [name for name in frame.columns if plan.projection is None or name in plan.projection]
+        missing = sorted((plan.projection or frozenset()) - set(frame.columns))
+        if missing:
+            raise KeyError(f"Transform plan {self.name!r} needs columns missing from its input: {missing}")
+        report = PlanReport(self.name, tuple(names))
+        rows = len(frame)
+
+        def timed(step: str, started: float, rows_in: int, rows_out: int) -> None:
+            seconds = time.perf_counter() - started
+            report.steps.append(StepTiming(step, seconds, rows_in, rows_out))
+            record_transform_step(self.name, step, seconds=seconds, rows_in=rows_in, rows_out=rows_out)
+
+        started = time.perf_counter()
+        columns: Columns = {name: frame[name].reset_index(drop=True) for name in names}
+        timed("project", started, rows, rows)
+        mask: Optional[np.ndarray] = None
+        for step, live in zip(plan.steps, plan.live_after):
+            if step.kind != "filter" and mask is not None:
+                started = time.perf_counter()
+                selected = np.flatnonzero(mask)
+                columns = {name: _take(column, selected) for name, column in columns.items()}
+                timed("select", started, rows, len(selected))
+                rows, mask = len(selected), None
+            started = time.perf_counter()
+            rows_in = rows
+            assert step.fn is not None or step.kind == "sort"
+            if step.kind == "filter":
+                kept = np.asarray(step.fn(columns), dtype=bool)
+                mask = kept if mask is None else mask & kept
+            elif step.kind == "sort":
+                order = _sort_order([columns[key] for key in step.reads])
+                columns = {name: _take(column, order) for name, column in columns.items()}
+            elif step.kind == "derive":
+                values = step.fn(columns)
+                for name in step.writes or ():
+                    columns[name] = _column(values[name], name, rows)
+            else:
+                values = step.fn(columns)
+                names_out = step.writes if step.writes is not None else tuple(values)
+                rows = len(next(iter(values.values()))) if values else 0
+                columns = {name: _column(values[name], name, rows) for name in names_out}
+            if live is not None:
+                columns = {name: column for name, column in columns.items() if name in live}
+            timed(step.name, started, rows_in, int(mask.sum()) if mask is not None else rows)
+
+        started = time.perf_counter()
+        output = self.output if self.output is not None else tuple(columns)
+        result = pd.DataFrame({self.rename.get(name, name): columns[name] for name in output}, copy=False)
+        if self.table is not None:
+            result = compact_frame(result, self.table)
+        if mask is not None:
+            result = result.loc[mask]
+        timed("output", started, rows, len(result))
+        return result, report
+
+
+def _column(value: Any, name: str, rows: int) -> pd.Series:
+    if isinstance(value, pd.Series):
+        return value if isinstance(value.index, pd.RangeIndex) else value.reset_index(drop=True)
+    return pd.Series(value, index=pd.RangeIndex(rows), name=name)
+
+
+def _take(column: pd.Series, positions: np.ndarray) -> pd.Series:
+    return column.iloc[positions].reset_index(drop=True)
+
+
+def _sort_order(keys: Sequence[pd.Series]) -> np.ndarray:
+    """Stable lexicographic order of ``keys``, each reduced to sorted factor codes with missing values last."""
+
+    codes = []
+    for key in keys:
+        key_codes, uniques = pd.factorize(key, sort=True)
+        codes.append(np.where(key_codes < 0, len(uniques), key_codes))
+    if len(codes) == 1:
+        return np.argsort(codes[0], kind="stable")
+    return np.lexsort(codes[::-1])
+
+
+def _float_values(column: pd.Series) -> np.ndarray:
+    return column.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _parse(column: str) -> Step:
+    return derive(f"parse_{column}", [column], [column], lambda columns: {column: pd.to_datetime(columns[column])})
+
+
+@lru_cache(maxsize=None)
+def equity_price_plan(windows: Tuple[int, ...]) -> TransformPlan:
+    features = ["return_1d"]
+    for window in windows:
+        features += [volume_column(window), volatility_column(window)]
+
+    def rolling_features(columns: Columns) -> Dict[str, np.ndarray]:
+        return equity_rolling_features(columns["symbol"], columns["close"], columns["volume"], windows)
+
+    return TransformPlan(
+        "equities",
+        steps=(
+            _parse("ts"),
+            derive("rolling_features", ["symbol", "close", "volume"], features, rolling_features),
+            where("has_return", ["return_1d"], lambda columns: columns["return_1d"].notna()),
+        ),
+        output=("symbol", "ts", "close", *features),
+        table="equity_price_factors",
+    )
+
+
+def _revenue_growth(columns: Columns) -> Dict[str, Any]:
+    # Rows are sorted by symbol, so each symbol is one contiguous segment.
+    codes, _ = pd.factorize(columns["symbol"])
+    growth = grouped_pct_change(_float_values(columns["value"]), segment_starts(codes))
+    return {"revenue_growth": growth, "margin_score": np.clip(np.nan_to_num(growth, nan=0.0), -1, 1)}
+
+
+FUNDAMENTALS_PLAN = TransformPlan(
+    "fundamentals",
+    steps=(
+        where("revenue_only", ["metric"], lambda columns: columns["metric"] == "revenue"),
+        _parse("period_end"),
+        sort_by("symbol", "period_end"),
+        derive("revenue_growth", ["symbol", "value"], ["revenue_growth", "margin_score"], _revenue_growth),
+        derive(
+            "quality_rank",
+            ["period_end", "value"],
+            ["quality_rank"],
+            lambda columns: {"quality_rank": columns["value"].groupby(columns["period_end"]).rank(ascending=False)},
+        ),
+        where("has_growth", ["revenue_growth"], lambda columns: columns["revenue_growth"].notna()),
+    ),
+    output=("symbol", "period_end", "value", "revenue_growth", "margin_score", "quality_rank"),
+    rename={"period_end": "as_of", "value": "revenue"},
+    table="fundamental_quality",
+)
+
+
+def _group_sums(codes: np.ndarray, values: np.ndarray, groups: int) -> Tuple[np.ndarray, np.ndarray]:
+    valid = (codes >= 0) & ~np.isnan(values)
+    sums = np.bincount(codes[valid], weights=values[valid], minlength=groups)
+    return sums, np.bincount(codes[valid], minlength=groups)
+
+
+def _group_means(codes: np.ndarray, values: np.ndarray, groups: int) -> np.ndarray:
+    sums, counts = _group_sums(codes, values, groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return sums / counts
+
+
+def _news_by_symbol(columns: Columns) -> Dict[str, Any]:
+    codes, symbols = pd.factorize(columns["symbol"], sort=True)
+    groups = len(symbols)
+    headlines = (codes >= 0) & columns["headline"].notna().to_numpy()
+    return {
+        "symbol": symbols,
+        "avg_sentiment": _group_means(codes, _float_values(columns["sentiment"]), groups),
+        "article_count": np.bincount(codes[headlines], minlength=groups),
+        "avg_relevance": _group_means(codes, _float_values(columns["relevance"]), groups),
+        "as_of": pd.to_datetime(columns["event_time"]).max(),
+    }
+
+
+NEWS_PLAN = TransformPlan(
+    "news",
+    steps=(
+        aggregate(
+            "aggregate_by_symbol",
+            ["symbol", "sentiment", "headline", "relevance", "event_time"],
+            ["symbol", "avg_sentiment", "article_count", "avg_relevance", "as_of"],
+            _news_by_symbol,
+        ),
+    ),
+    output=("symbol", "avg_sentiment", "article_count", "avg_relevance", "as_of"),
+    table="news_sentiment_signals",
+)
+
+
+def _news_totals_by_symbol(columns: Columns) -> Dict[str, Any]:
+    # Sums and counts rather than means, so each batch folds into the running totals (see ``ingestion.news``).
+    codes, symbols = pd.factorize(columns["symbol"], sort=True)
+    groups = len(symbols)
+    valid = codes >= 0
+    headlines = valid & columns["headline"].notna().to_numpy()
+    sentiment_sum, sentiment_count = _group_sums(codes, _float_values(columns["sentiment"]), groups)
+    relevance_sum, relevance_count = _group_sums(codes, _float_values(columns["relevance"]), groups)
+    times = event_times(columns["event_time"]).to_numpy()
+    return {
+        "symbol": symbols,
+        "article_count": np.bincount(codes[headlines], minlength=groups),
+        "sentiment_sum": sentiment_sum,
+        "sentiment_count": sentiment_count,
+        "relevance_sum": relevance_sum,
+        "relevance_count": relevance_count,
+        "last_event_time": pd.Series(times[valid]).groupby(codes[valid]).max().to_numpy(),
+    }
+
+
+NEWS_TOTALS_COLUMNS = (
+    "symbol",
+    "article_count",
+    "sentiment_sum",
+    "sentiment_count",
+    "relevance_sum",
+    "relevance_count",
+    "last_event_time",
+)
+
+NEWS_TOTALS_PLAN = TransformPlan(
+    "news_totals",
+    steps=(
+        aggregate(
+            "aggregate_by_symbol",
+            ["symbol", "sentiment", "headline", "relevance", "event_time"],
+            NEWS_TOTALS_COLUMNS,
+            _news_totals_by_symbol,
+        ),
+    ),
+    output=NEWS_TOTALS_COLUMNS,
+)
+
+
+def _pivot_indicators(columns: Columns) -> Dict[str, Any]:
+    frame = pd.DataFrame({name: columns[name] for name in ("as_of", "indicator", "value")}, copy=False)
+    pivot = frame.pivot_table(index="as_of", columns="indicator", values="value", observed=True)
+    return {"as_of": pivot.index.to_series(), **{str(name): pivot[name] for name in pivot.columns}}
+
+
+def _regime(columns: Columns) -> Dict[str, Any]:
+    # Missing indicators count as 0, as before; NaN readings compare false.
+    rows = len(columns["as_of"])
+    growth = _float_values(columns["gdp_growth"]) if "gdp_growth" in columns else np.zeros(rows)
+    inflation = _float_values(columns["inflation"]) if "inflation" in columns else np.zeros(rows)
+    return {"regime": np.where((growth > 2) & (inflation < 3), "expansion", "slowdown")}
+
+
+MACRO_PLAN = TransformPlan(
+    "macro",
+    steps=(
+        _parse("as_of"),
+        aggregate("pivot_indicators", ["as_of", "indicator", "value"], None, _pivot_indicators),
+        derive("regime", ["gdp_growth", "inflation"], ["regime"], _regime),
+    ),
+    output=None,
+    table="macro_regime_signals",
+)
+
+
+def _insider_by_symbol(columns: Columns) -> Dict[str, Any]:
+    kind = columns["transaction_type"]
+    typed = kind.notna().to_numpy()
+    codes, symbols = pd.factorize(columns["symbol"].loc[typed], sort=True)
+    shares = _float_values(columns["shares"])[typed]
+    kind = kind.loc[typed].to_numpy()
+
+    def total(label: str) -> np.ndarray:
+        rows = (codes >= 0) & (kind == label) & ~np.isnan(shares)
+        return np.bincount(codes[rows], weights=shares[rows], minlength=len(symbols))
+
+    buys, sells = total("Buy"), total("Sell")
+    return {
+        "symbol": symbols,
+        "buy_shares": buys,
+        "sell_shares": sells,
+        "net_shares": buys - sells,
+        "as_of": pd.to_datetime(columns["transaction_date"].loc[typed]).max(),
+    }
+
+
+INSIDER_PLAN = TransformPlan(
+    "insider",
+    steps=(
+        aggregate(
+            "net_by_symbol",
+            ["symbol", "transaction_type", "shares", "transaction_date"],
+            ["symbol", "buy_shares", "sell_shares", "net_shares", "as_of"],
+            _insider_by_symbol,
+        ),
+    ),
+    output=("symbol", "buy_shares", "sell_shares", "net_shares", "as_of"),
+    table="insider_buyback_activity",
+)
@@ -1,43 +1,303 @@
 """Vendor SDK wrappers with retry + monitoring hooks."""
 from __future__ import annotations
 
+import io
+import json
 import os
-import random
+import threading
 import time
+import zlib
+from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import Any, Dict, Iterable, List, Optional
+from datetime import datetime
+from functools import partial
+from typing import (
+    IO,
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+from urllib.parse import urlsplit
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as URLLibHTTPError
+from urllib3.util import make_headers
+
+from .cik_index import format_cik, normalize_ticker, refresh_ticker_index
+from .http_cache import HTTPCache
+from .jsonstream import JSON_ERRORS, iter_records
+from .metrics import record_vendor_request
+from .ratelimit import TokenBucket, backoff_seconds, rate_limiter, retry_after_seconds
+from .resilience import circuit_breaker, hedged_call, latency_tracker
+from .synthetic import default_market
+from .xbrl import DEFAULT_CONCEPTS, DEFAULT_UNITS, extract_facts
 
 DEFAULT_TIMEOUT = float(os.getenv("VENDOR_HTTP_TIMEOUT", "10"))
 MAX_RETRIES = int(os.getenv("VENDOR_HTTP_RETRIES", "3"))
+HEDGE_REQUESTS = os.getenv("VENDOR_HEDGE_REQUESTS", "false").lower() in {"1", "true", "yes"}
 BACKOFF_SECONDS = float(os.getenv("VENDOR_HTTP_BACKOFF", "1.5"))
+MAX_BACKOFF_SECONDS = 30.0
+THROTTLE_STATUSES = frozenset({429, 503})
+POOL_MAXSIZE = int(os.getenv("VENDOR_HTTP_POOL_SIZE", "32"))
+STREAM_CHUNK_BYTES = 1 << 16
+AGGREGATES_PAGE_LIMIT = 50_000
+# Every encoding urllib3 can decode here: gzip and deflate, plus br/zstd when brotli/zstandard are installed.
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+NEWS_PAGE_LIMIT = 1_000
+
+# Failures while a streamed body is read after ``_retry_request`` returned: a dropped or timed-out connection,
+# a truncated or corrupt compressed stream, or JSON that ends early.
+_BODY_ERRORS: Tuple[type, ...] = (
+    requests.RequestException,
+    URLLibHTTPError,
+    OSError,
+    EOFError,
+    zlib.error,
+    *JSON_ERRORS,
+)
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+T = TypeVar("T")
 
 
 class VendorRequestError(RuntimeError):
     """Raised when a vendor call fails after retries."""
 
 
-def _retry_request(method: str, url: str, **kwargs: Any) -> requests.Response:
+class CircuitOpenError(VendorRequestError):
+    """Raised without calling the vendor while the endpoint's circuit breaker is open."""
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide keep-alive session shared by every vendor client.
+
+    The adapter pool is sized by ``VENDOR_HTTP_POOL_SIZE`` so concurrent fetches
+    reuse TCP/TLS connections instead of opening one per request. Requests
+    advertise :data:`ACCEPT_ENCODING`, so vendors can send compressed bodies.
+    """
+
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+                adapter = HTTPAdapter(pool_connections=POOL_MAXSIZE, pool_maxsize=POOL_MAXSIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _SESSION = session
+    return _SESSION
+
+
+def _send(method: str, url: str, limiter: Optional[TokenBucket], **kwargs: Any) -> requests.Response:
+    if limiter is not None:
+        limiter.acquire()
+    return get_session().request(method, url, timeout=DEFAULT_TIMEOUT, **kwargs)
+
+
+def _close_response(response: requests.Response) -> None:
+    response.close()
+
+
+def _response_bytes(response: Optional[requests.Response], *, streamed: bool) -> int:
+    """Body size without forcing a streamed response to download (uses ``Content-Length``)."""
+
+    if response is None:
+        return 0
+    if streamed:
+        return int(response.headers.get("Content-Length") or 0)
+    return len(response.content)
+
+
+def _retry_request(
+    method: str,
+    url: str,
+    *,
+    limiter: Optional[TokenBucket] = None,
+    endpoint: Optional[str] = None,
+    **kwargs: Any,
+) -> requests.Response:
+    """Issue a request through the shared session, retrying transient failures.
+
+    Every attempt first takes a token from ``limiter``. A 429/503 honours
+    ``Retry-After`` (falling back to jittered exponential backoff) and, with a
+    limiter, slows down every caller of that vendor rather than just this one.
+
+    ``endpoint`` names the circuit breaker that guards the call: once too many
+    recent calls failed with a transport error or 5xx, requests raise
+    :class:`CircuitOpenError` without touching the network until the cool-down
+    probe succeeds. With ``VENDOR_HEDGE_REQUESTS`` enabled, a GET still pending
+    after the endpoint's p95 latency is raced against a second copy.
+
+    Latency across all attempts, retries and downloaded bytes are recorded per
+    vendor/endpoint in :mod:`ingestion.metrics`.
+    """
+
+    vendor, _, endpoint_name = (endpoint or urlsplit(url).netloc).partition(":")
+    call_started = time.perf_counter()
+
+    def record(attempts: int, response: Optional[requests.Response] = None) -> None:
+        record_vendor_request(
+            vendor,
+            endpoint_name or "default",
+            seconds=time.perf_counter() - call_started,
+            retries=attempts - 1,
+            nbytes=_response_bytes(response, streamed=bool(kwargs.get("stream"))),
+        )
+
     last_error: Optional[BaseException] = None
+    breaker = circuit_breaker(endpoint) if endpoint else None
+    latencies = latency_tracker(endpoint) if endpoint else None
     for attempt in range(1, MAX_RETRIES + 1):
+        if breaker is not None and not breaker.allow_request():
+            record(attempt)
+            raise CircuitOpenError(f"Circuit open for {endpoint}; not calling {url}") from last_error
+        hedge_after = latencies.percentile() if HEDGE_REQUESTS and method == "GET" and latencies else None
+        throttle_delay: Optional[float] = None
+        response: Optional[requests.Response] = None
+        outcome_recorded = False
+        started = time.monotonic()
         try:
-            response = requests.request(method, url, timeout=DEFAULT_TIMEOUT, **kwargs)
+            if hedge_after is None:
+                response = _send(method, url, limiter, **kwargs)
+            else:
+                response = hedged_call(
+                    lambda: _send(method, url, limiter, **kwargs), hedge_after, discard=_close_response
+                )
+            if latencies is not None:
+                latencies.record(time.monotonic() - started)
+            if breaker is not None:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                outcome_recorded = True
+            if response.status_code in THROTTLE_STATUSES:
+                retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+                jitter = backoff_seconds(attempt, BACKOFF_SECONDS, MAX_BACKOFF_SECONDS)
+                throttle_delay = jitter if retry_after is None else retry_after + jitter / 4
+                if limiter is not None:
+                    limiter.throttled(throttle_delay)
             response.raise_for_status()
+            if limiter is not None:
+                limiter.succeeded()
+            record(attempt, response)
             return response
         except requests.RequestException as exc:  # pragma: no cover - network failure path
             last_error = exc
+            if response is not None:
+                # Streamed responses hold their pooled connection until closed.
+                response.close()
+            if breaker is not None and getattr(exc, "response", None) is None:
+                breaker.record_failure()
             if attempt == MAX_RETRIES:
                 break
-            sleep_for = BACKOFF_SECONDS * attempt
-            time.sleep(min(sleep_for, 5.0))
+            if throttle_delay is None:
+                time.sleep(backoff_seconds(attempt, BACKOFF_SECONDS, MAX_BACKOFF_SECONDS))
+            elif limiter is None:
+                time.sleep(throttle_delay)
+            # With a limiter the pause is enforced by the next ``acquire``.
+        except BaseException:
+            # Anything else still ends the call: count it so a half-open probe never stays outstanding.
+            if response is not None:
+                response.close()
+            if breaker is not None and not outcome_recorded:
+                breaker.record_failure()
+            raise
+    record(MAX_RETRIES)
     raise VendorRequestError(f"Failed request to {url}: {last_error}")
 
 
+def _vendor_get(vendor: str, endpoint: str, url: str, **kwargs: Any) -> requests.Response:
+    """GET ``url`` under ``vendor``'s shared rate limiter and the ``vendor:endpoint`` breaker."""
+
+    return _retry_request("GET", url, limiter=rate_limiter(vendor), endpoint=f"{vendor}:{endpoint}", **kwargs)
+
+
+def _decoded_body(response: requests.Response) -> IO[bytes]:
+    """The body of a streamed response as a binary stream, decompressed (gzip, deflate, br) as it is read."""
+
+    response.raw.decode_content = True
+    return response.raw
+
+
+@contextmanager
+def _vendor_stream(vendor: str, endpoint: str, url: str, **kwargs: Any) -> Iterator[IO[bytes]]:
+    """Like :func:`_vendor_get`, but yield the body as a binary stream that is decompressed as it is read.
+
+    The compressed body is never buffered whole, and the connection goes back
+    to the pool when the block exits. Retries cover the request up to the
+    response headers; a body that fails mid-read raises
+    :class:`VendorRequestError`. Use :func:`_vendor_read` to retry it instead.
+    """
+
+    with _vendor_get(vendor, endpoint, url, stream=True, **kwargs) as response:
+        try:
+            yield _decoded_body(response)
+        except _BODY_ERRORS as exc:
+            raise VendorRequestError(f"Failed reading response from {url}: {exc}") from exc
+
+
+def _vendor_read(vendor: str, endpoint: str, url: str, read: Callable[[requests.Response], T], **kwargs: Any) -> T:
+    """GET ``url`` as a stream and return ``read(response)``, re-issuing the request if the body fails mid-read.
+
+    ``read`` must consume the body completely. A connection dropped partway,
+    a truncated compressed stream or JSON that ends early is retried with the
+    usual backoff, up to ``VENDOR_HTTP_RETRIES`` reads. The last failure raises
+    :class:`VendorRequestError`, so callers isolate it like a failed request.
+    """
+
+    last_error: Optional[BaseException] = None
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            with _vendor_get(vendor, endpoint, url, stream=True, **kwargs) as response:
+                return read(response)
+        except _BODY_ERRORS as exc:
+            last_error = exc
+            if attempt < MAX_RETRIES:
+                time.sleep(backoff_seconds(attempt, BACKOFF_SECONDS, MAX_BACKOFF_SECONDS))
+    raise VendorRequestError(f"Failed reading response from {url}: {last_error}") from last_error
+
+
+def _vendor_records(
+    vendor: str,
+    endpoint: str,
+    url: str,
+    key: str,
+    metadata: Dict[str, Any],
+    **kwargs: Any,
+) -> List[Any]:
+    """Records of the ``key`` array in a JSON response (see :func:`ingestion.jsonstream.iter_records`).
+
+    Records are parsed straight off the decompressed stream, but the page is
+    only returned once its body has been read to the end. A truncated body is
+    then retried as a whole instead of yielding half a page.
+    """
+
+    def read(response: requests.Response) -> List[Any]:
+        metadata.clear()
+        return list(iter_records(_decoded_body(response), key, metadata))
+
+    return _vendor_read(vendor, endpoint, url, read, **kwargs)
+
+
 @dataclass
 class PolygonClient:
+    vendor: ClassVar[str] = "polygon"
+
     api_key: Optional[str]
     base_url: str = "https://api.polygon.io"
 
@@ -46,21 +306,44 @@ class PolygonClient:
         return cls(api_key=os.getenv("POLYGON_API_KEY"))
 
     def get_aggregates(self, symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
-        params = {
-            "adjusted": "true",
-            "sort": "asc",
-            "limit": 5000,
-        }
-        url = f"{self.base_url}/v2/aggs/ticker/{symbol}/range/1/day/{start:%Y-%m-%d}/{end:%Y-%m-%d}"
+        pages = [page for page in self.iter_aggregate_pages(symbol, start, end) if not page.empty]
+        if not pages:
+            return pd.DataFrame()
+        return pages[0] if len(pages) == 1 else pd.concat(pages, ignore_index=True)
+
+    def iter_aggregate_pages(
+        self,
+        symbol: str,
+        start: datetime,
+        end: datetime,
+        *,
+        multiplier: int = 1,
+        timespan: str = "day",
+    ) -> Iterator[pd.DataFrame]:
+        """Yield one normalised frame per response page, following ``next_url`` to the end."""
+
         if not self.api_key:
-            return self._synthetic_equity_data(symbol, start, end)
-        params["apiKey"] = self.api_key
-        response = _retry_request("GET", url, params=params)
-        payload = response.json()
-        results = payload.get("results", [])
-        if not results:
+            yield self._synthetic_equity_data(symbol, start, end)
+            return
+        url: Optional[str] = (
+            f"{self.base_url}/v2/aggs/ticker/{symbol}/range/{multiplier}/{timespan}/{start:%Y-%m-%d}/{end:%Y-%m-%d}"
+        )
+        params: Dict[str, Any] = {"adjusted": "true", "sort": "asc", "limit": AGGREGATES_PAGE_LIMIT}
+        while url:
+            metadata: Dict[str, Any] = {}
+            records = _vendor_records(
+                self.vendor, "aggregates", url, "results", metadata, params={**params, "apiKey": self.api_key}
+            )
+            yield self._normalize_aggregates(records, symbol)
+            url = metadata.get("next_url")
+            # ``next_url`` already encodes the cursor and query; only the key must be re-sent.
+            params = {}
+
+    @staticmethod
+    def _normalize_aggregates(results: Iterable[Dict[str, Any]], symbol: str) -> pd.DataFrame:
+        frame = pd.DataFrame.from_records(results)
+        if frame.empty:
             return pd.DataFrame()
-        frame = pd.DataFrame(results)
         frame.rename(
             columns={
                 "t": "ts",
@@ -78,72 +361,155 @@ class PolygonClient:
 
     @staticmethod
     def _synthetic_equity_data(symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
-        periods = (end.date() - start.date()).days + 1
-        rows: List[Dict[str, Any]] = []
-        base_price = 100 + random.random() * 20
-        for idx in range(periods):
-            ts = start + timedelta(days=idx)
-            open_price = base_price + random.uniform(-1, 1)
-            close_price = open_price + random.uniform(-2, 2)
-            high_price = max(open_price, close_price) + random.random()
-            low_price = min(open_price, close_price) - random.random()
-            rows.append(
-                {
-                    "ts": ts,
-                    "open": round(open_price, 2),
-                    "high": round(high_price, 2),
-                    "low": round(low_price, 2),
-                    "close": round(close_price, 2),
-                    "volume": int(1_000_000 + random.random() * 50_000),
-                    "symbol": symbol,
-                }
-            )
-        return pd.DataFrame(rows)
+        return default_market().equity_bars([symbol], start, end)
 
 
 @dataclass
 class SECEdgarClient:
+    vendor: ClassVar[str] = "sec_edgar"
+
     user_agent: Optional[str]
     base_url: str = "https://data.sec.gov"
+    tickers_url: str = "https://www.sec.gov/files/company_tickers.json"
+    cache: Optional[HTTPCache] = None
 
     @classmethod
     def from_env(cls) -> "SECEdgarClient":
-        return cls(user_agent=os.getenv("SEC_API_USER_AGENT"))
+        return cls(user_agent=os.getenv("SEC_API_USER_AGENT"), cache=HTTPCache.from_env("EDGAR_CACHE_DIR"))
+
+    def company_tickers(self) -> List[Tuple[str, int]]:
+        """``(ticker, cik)`` pairs from the SEC bulk ticker file, in file order."""
+
+        if not self.user_agent:
+            return []
+        headers = {"User-Agent": self.user_agent}
+        payload = _vendor_get(self.vendor, "company_tickers", self.tickers_url, headers=headers).json()
+        return [(entry["ticker"], int(entry["cik_str"])) for entry in payload.values()]
+
+    def resolve_ciks(self, symbols: Iterable[str]) -> Dict[str, str]:
+        """Map symbols to zero-padded CIKs through the local ticker index, refreshing it when stale.
+
+        If the refresh fails, the stale index on disk is used (see
+        :func:`~ingestion.cik_index.refresh_ticker_index`). Symbols the SEC
+        does not list are omitted. Synthetic filings accept any CIK, so
+        without a user agent every symbol gets a stable synthetic one.
+        """
+
+        symbol_list = list(symbols)
+        if not self.user_agent:
+            return {symbol: self._synthetic_cik(symbol) for symbol in symbol_list}
+        return refresh_ticker_index(self.company_tickers).resolve(symbol_list)
 
     def get_company_facts(self, cik: str) -> Dict[str, Any]:
+        """Return companyfacts for ``cik``.
+
+        With a cache configured (``EDGAR_CACHE_DIR``) the request carries the
+        stored ETag/Last-Modified validators and a ``304 Not Modified`` is served
+        from disk, so unchanged filers cost one empty round trip.
+        """
+
         headers = {"User-Agent": self.user_agent or "enterprize-mm-ingestion"}
         url = f"{self.base_url}/api/xbrl/companyfacts/CIK{cik}.json"
         if not self.user_agent:
             return self._synthetic_company_facts(cik)
-        response = _retry_request("GET", url, headers=headers)
+        if self.cache is None:
+            return _vendor_get(self.vendor, "companyfacts", url, headers=headers).json()
+        response = _vendor_get(
+            self.vendor, "companyfacts", url, headers={**headers, **self.cache.conditional_headers(cik)}
+        )
+        if response.status_code == 304:
+            cached = self.cache.load_json(cik)
+            if cached is not None:
+                return cached
+            response = _vendor_get(self.vendor, "companyfacts", url, headers=headers)
+        self.cache.store(
+            cik,
+            response.content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
         return response.json()
 
+    def extract_company_facts(
+        self,
+        cik: str,
+        concepts: Mapping[str, str] = DEFAULT_CONCEPTS,
+        units: Sequence[str] = DEFAULT_UNITS,
+    ) -> List[Dict[str, Any]]:
+        """Return one row per reported fact of ``concepts`` in one streaming pass (see :func:`extract_facts`)."""
+
+        if self.user_agent and self.cache is None:
+            headers = {"User-Agent": self.user_agent}
+            url = f"{self.base_url}/api/xbrl/companyfacts/CIK{cik}.json"
+
+            def read(response: requests.Response) -> List[Dict[str, Any]]:
+                return extract_facts(_decoded_body(response), concepts, units)
+
+            return _vendor_read(self.vendor, "companyfacts", url, read, headers=headers)
+        with self.open_company_facts(cik) as stream:
+            return extract_facts(stream, concepts, units)
+
+    @contextmanager
+    def open_company_facts(self, cik: str) -> Iterator[IO[bytes]]:
+        """Yield the companyfacts JSON for ``cik`` as a binary stream without buffering it.
+
+        With a cache the body is compressed to disk as it downloads (or reused
+        on ``304``) and the stream reads from the cached file; otherwise it reads
+        the decoded HTTP response directly.
+        """
+
+        if not self.user_agent:
+            yield io.BytesIO(json.dumps(self._synthetic_company_facts(cik)).encode("utf-8"))
+            return
+        headers = {"User-Agent": self.user_agent}
+        url = f"{self.base_url}/api/xbrl/companyfacts/CIK{cik}.json"
+        cached = self._refresh_cache(cik, url, headers) if self.cache is not None else None
+        if cached is not None:
+            with cached:
+                yield cached
+            return
+        with _vendor_stream(self.vendor, "companyfacts", url, headers=headers) as stream:
+            yield stream
+
+    def _refresh_cache(self, cik: str, url: str, headers: Dict[str, str]) -> Optional[IO[bytes]]:
+        assert self.cache is not None
+        conditional = {**headers, **self.cache.conditional_headers(cik)}
+        if _vendor_read(self.vendor, "companyfacts", url, partial(self._store_response, cik), headers=conditional):
+            return self.cache.open(cik)
+        cached = self.cache.open(cik)
+        if cached is not None:
+            return cached
+        _vendor_read(self.vendor, "companyfacts", url, partial(self._store_response, cik), headers=headers)
+        # ``None`` when the body alone exceeds the cache budget and was evicted at once.
+        return self.cache.open(cik)
+
+    def _store_response(self, cik: str, response: requests.Response) -> bool:
+        """Cache the body of a ``200``; ``False`` for a ``304``, whose body is already cached."""
+
+        assert self.cache is not None
+        if response.status_code == 304:
+            return False
+        self.cache.store_stream(
+            cik,
+            response.iter_content(chunk_size=STREAM_CHUNK_BYTES),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return True
+
     @staticmethod
     def _synthetic_company_facts(cik: str) -> Dict[str, Any]:
-        now = datetime.utcnow().date()
-        value = 1_000_000_000 + random.randint(-50_000_000, 50_000_000)
-        return {
-            "cik": cik,
-            "facts": {
-                "IncomeStatement": {
-                    "Revenues": {
-                        "label": "Revenues",
-                        "units": {
-                            "USD": [
-                                {
-                                    "end": now.isoformat(),
-                                    "val": value,
-                                }
-                            ]
-                        },
-                    }
-                }
-            },
-        }
+        return default_market().company_facts(cik)
+
+    @staticmethod
+    def _synthetic_cik(symbol: str) -> str:
+        return format_cik(zlib.crc32(normalize_ticker(symbol).encode("utf-8")))
 
 
 @dataclass
 class RavenPackClient:
+    vendor: ClassVar[str] = "ravenpack"
+
     api_key: Optional[str]
     base_url: str = "https://api.ravenpack.com"
 
@@ -151,31 +517,47 @@ class RavenPackClient:
     def from_env(cls) -> "RavenPackClient":
         return cls(api_key=os.getenv("RAVENPACK_API_KEY"))
 
-    def get_news(self, symbols: Iterable[str]) -> pd.DataFrame:
+    def get_news(self, symbols: Iterable[str], since: Optional[datetime] = None) -> pd.DataFrame:
+        pages = [page for page in self.iter_news_pages(symbols, since) if not page.empty]
+        if not pages:
+            return pd.DataFrame()
+        return pages[0] if len(pages) == 1 else pd.concat(pages, ignore_index=True)
+
+    def iter_news_pages(
+        self,
+        symbols: Iterable[str],
+        since: Optional[datetime] = None,
+        *,
+        page_size: int = NEWS_PAGE_LIMIT,
+    ) -> Iterator[pd.DataFrame]:
+        """Yield one frame per page of stories published after ``since``, following ``next_cursor`` to the end."""
+
+        symbol_list = list(symbols)
         if not self.api_key:
-            return self._synthetic_news(symbols)
+            yield from self._synthetic_news_pages(symbol_list, since, page_size)
+            return
         headers = {"Authorization": f"Bearer {self.api_key}"}
         url = f"{self.base_url}/data/v1/signals"
-        params = {"tickers": ",".join(symbols), "limit": 100}
-        response = _retry_request("GET", url, headers=headers, params=params)
-        payload = response.json()
-        return pd.DataFrame(payload.get("data", []))
+        params: Dict[str, Any] = {"tickers": ",".join(symbol_list), "limit": page_size, "sort": "asc"}
+        if since is not None:
+            params["start_date"] = since.isoformat()
+        while True:
+            metadata: Dict[str, Any] = {}
+            records = _vendor_records(self.vendor, "signals", url, "data", metadata, headers=headers, params=params)
+            page = pd.DataFrame.from_records(records)
+            yield page
+            cursor = metadata.get("next_cursor")
+            if not cursor or page.empty:
+                return
+            params = {**params, "cursor": cursor}
 
     @staticmethod
-    def _synthetic_news(symbols: Iterable[str]) -> pd.DataFrame:
-        now = datetime.utcnow()
-        rows: List[Dict[str, Any]] = []
-        for symbol in symbols:
-            rows.append(
-                {
-                    "symbol": symbol,
-                    "headline": f"Synthetic headline for {symbol}",
-                    "relevance": random.random(),
-                    "sentiment": random.uniform(-1, 1),
-                    "event_time": now.isoformat(),
-                }
-            )
-        return pd.DataFrame(rows)
+    def _synthetic_news_pages(symbols: List[str], since: Optional[datetime], page_size: int) -> Iterator[pd.DataFrame]:
+        frame = default_market().news(symbols)
+        if since is not None:
+            frame = frame.loc[pd.to_datetime(frame["event_time"]) > since].reset_index(drop=True)
+        for offset in range(0, len(frame), page_size):
+            yield frame.iloc[offset : offset + page_size].reset_index(drop=True)
 
 
 @dataclass
@@ -187,13 +569,7 @@ class MacroSignalsClient:
         return cls(api_key=os.getenv("MACRO_SIGNAL_API_KEY"))
 
     def latest_signals(self) -> pd.DataFrame:
-        now = datetime.utcnow()
-        rows = [
-            {"indicator": "inflation", "value": random.uniform(1.5, 3.5), "as_of": now},
-            {"indicator": "gdp_growth", "value": random.uniform(1.0, 3.0), "as_of": now},
-            {"indicator": "rates", "value": random.uniform(2.5, 5.0), "as_of": now},
-        ]
-        return pd.DataFrame(rows)
+        return default_market().macro_signals()
 
 
 @dataclass
@@ -205,19 +581,4 @@ class InsiderActivityClient:
         return cls(api_key=os.getenv("INSIDER_API_KEY"))
 
     def latest_activity(self, symbols: Iterable[str]) -> pd.DataFrame:
-        now = datetime.utcnow()
-        rows = []
-        for symbol in symbols:
-            rows.append(
-                {
-                    "symbol": symbol,
-                    "insider": "Synthetic Insider",
-                    "role": "Director",
-                    "transaction_type": random.choice(["Buy", "Sell"]),
-                    "shares": random.randint(100, 5000),
-                    "transaction_date": now.date(),
-                    "price": random.uniform(50, 250),
-                    "source": "synthetic",
-                }
-            )
-        return pd.DataFrame(rows)
+        return default_market().insider_activity(symbols)
@@ -0,0 +1,128 @@
+"""Single-pass, streaming extraction of XBRL concepts from SEC companyfacts documents."""
+from __future__ import annotations
+
+import json
+from typing import IO, Any, Dict, Iterator, List, Mapping, Sequence, Tuple
+
+try:  # pragma: no cover - optional dependency
+    import ijson  # type: ignore
+except Exception:  # pragma: no cover - executed when ijson isn't available
+    ijson = None  # type: ignore
+
+# XBRL concept -> metric name written to ``raw_fundamentals.metric``.
+DEFAULT_CONCEPTS: Dict[str, str] = {
+    "Revenues": "revenue",
+    "NetIncomeLoss": "net_income",
+    "OperatingIncomeLoss": "operating_income",
+}
+DEFAULT_UNITS: Tuple[str, ...] = ("USD",)
+PREFERRED_TAXONOMIES: Tuple[str, ...] = ("us-gaap", "IncomeStatement")
+
+FactEntry = Tuple[str, str, str, Dict[str, Any]]
+_SCALAR_EVENTS = frozenset({"string", "number", "boolean", "null"})
+
+
+def _iter_streamed_entries(
+    stream: IO[bytes],
+    concepts: Mapping[str, str],
+    units: Sequence[str],
+) -> Iterator[FactEntry]:
+    """Walk ijson events and materialise only entries under wanted concepts/units.
+
+    Prefixes look like ``facts.<taxonomy>.<concept>.units.<unit>.item[.<field>]``;
+    everything outside the wanted concepts is skipped without building objects.
+    """
+
+    wanted_units = set(units)
+    entry: Dict[str, Any] | None = None
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if not prefix.startswith("facts."):
+            continue
+        parts = prefix.split(".", 6)
+        if len(parts) < 6 or parts[2] not in concepts or parts[3] != "units" or parts[5] != "item":
+            continue
+        if parts[4] not in wanted_units:
+            continue
+        if len(parts) == 6:
+            if event == "start_map":
+                entry = {}
+            elif event == "end_map" and entry is not None:
+                yield parts[1], parts[2], parts[4], entry
+                entry = None
+        elif entry is not None and event in _SCALAR_EVENTS:
+            entry[parts[6]] = value
+
+
+def _iter_document_entries(
+    document: Mapping[str, Any],
+    concepts: Mapping[str, str],
+    units: Sequence[str],
+) -> Iterator[FactEntry]:
+    for taxonomy, container in (document.get("facts") or {}).items():
+        if not isinstance(container, dict):
+            continue
+        for concept in concepts:
+            fact = container.get(concept)
+            if not isinstance(fact, dict):
+                continue
+            for unit in units:
+                for entry in (fact.get("units") or {}).get(unit, []):
+                    yield taxonomy, concept, unit, entry
+
+
+def iter_fact_entries(
+    stream: IO[bytes],
+    concepts: Mapping[str, str] = DEFAULT_CONCEPTS,
+    units: Sequence[str] = DEFAULT_UNITS,
+) -> Iterator[FactEntry]:
+    """Yield ``(taxonomy, concept, unit, entry)`` for every wanted fact in one pass over ``stream``.
+
+    Uses incremental parsing when ``ijson`` is installed and falls back to a full
+    ``json.load`` otherwise.
+    """
+
+    if ijson is not None:
+        yield from _iter_streamed_entries(stream, concepts, units)
+    else:
+        yield from _iter_document_entries(json.load(stream), concepts, units)
+
+
+def _taxonomy_rank(taxonomy: str) -> int:
+    try:
+        return PREFERRED_TAXONOMIES.index(taxonomy)
+    except ValueError:
+        return len(PREFERRED_TAXONOMIES)
+
+
+def extract_facts(
+    stream: IO[bytes],
+    concepts: Mapping[str, str] = DEFAULT_CONCEPTS,
+    units: Sequence[str] = DEFAULT_UNITS,
+) -> List[Dict[str, Any]]:
+    """Return ``{"metric", "value", "period_start", "period_end", "fiscal_period", "form"}`` rows per concept.
+
+    When a concept appears in several taxonomies the rows from the preferred
+    one (``us-gaap``, then ``IncomeStatement``, then the first seen) are kept,
+    mirroring how the flows resolved ``Revenues`` before. A 10-Q reports both
+    the quarter and the year to date with the same ``period_end``, so the
+    period start tells the facts apart; instant facts have none and use
+    ``period_end``.
+    """
+
+    best: Dict[str, Tuple[int, str]] = {}
+    rows: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for taxonomy, concept, _unit, entry in iter_fact_entries(stream, concepts, units):
+        rank = _taxonomy_rank(taxonomy)
+        if concept not in best or rank < best[concept][0]:
+            best[concept] = (rank, taxonomy)
+        rows.setdefault((concept, taxonomy), []).append(
+            {
+                "metric": concepts[concept],
+                "value": entry.get("val"),
+                "period_start": entry.get("start", entry.get("end")),
+                "period_end": entry.get("end"),
+                "fiscal_period": entry.get("fp"),
+                "form": entry.get("form"),
+            }
+        )
+    return [row for concept, (_rank, taxonomy) in best.items() for row in rows[(concept, taxonomy)]]
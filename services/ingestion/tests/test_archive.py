@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import importlib
+from datetime import date, datetime
+from functools import partial
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pandas as pd
+
+from ingestion import archive, vendors
+from ingestion.archive import archive_frame, archived_parts, read_archive
+from ingestion.dtypes import compact_frame
+from ingestion.synthetic import SyntheticMarket
+
+KEYS = ("symbol", "ts")
+
+
+def _bars(seed: int) -> pd.DataFrame:
+    bars = SyntheticMarket(seed=seed).equity_bars(["AAPL", "MSFT"], date(2024, 1, 2), date(2024, 1, 12))
+    return compact_frame(bars, "raw_equity_ohlcv")
+
+
+def test_archive_partitions_by_date_and_shard_and_keeps_newest_rows(tmp_path):
+    assert archive_frame("equities", _bars(1)) is None  # INGESTION_ARCHIVE_DIR unset
+    older, newer = _bars(1), _bars(2)
+    first = archive_frame("equities", older, shard=1, fetched_at=datetime(2024, 1, 12, 22), root=tmp_path)
+    archive_frame("equities", newer.iloc[:5], shard=0, fetched_at=datetime(2024, 1, 13, 22), root=tmp_path)
+    archive_frame("equities", older.iloc[:0], fetched_at=datetime(2024, 1, 13, 23), root=tmp_path)
+
+    assert first.relative_to(tmp_path).parts[:3] == ("equities", "date=2024-01-12", "shard=001")
+    assert not list(tmp_path.rglob(".part-*"))
+    window = (date(2024, 1, 12), date(2024, 1, 13))
+    assert len(archived_parts("equities", *window, root=tmp_path)) == 2
+    assert archived_parts("equities", *window, shards=[1], root=tmp_path) == [first]
+
+    replayed = read_archive("equities", *window, key_columns=KEYS, root=tmp_path)
+    assert len(replayed) == len(older) and replayed["symbol"].dtype == "category"
+    expected = pd.concat([older.iloc[5:], newer.iloc[:5]], ignore_index=True)
+    pd.testing.assert_frame_equal(replayed, expected, check_categorical=False)
+    assert read_archive("equities", date(2024, 1, 14), date(2024, 1, 20), root=tmp_path).empty
+
+
+def test_macro_flow_replays_archive_without_vendor_calls(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    db_module = importlib.reload(importlib.import_module("ingestion.db"))
+    flows = importlib.import_module("ingestion.flows")
+    monkeypatch.setattr(flows, "db_session", db_module.db_session)
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    loads = []
+    monkeypatch.setattr(flows, "_load_frame", lambda conn, df, table, **kwargs: loads.append((table, kwargs["mode"])))
+
+    as_of = datetime(2024, 5, 1)
+    for seed in (1, 2):  # the second fetch revises the same observations
+        market = SyntheticMarket(seed=seed)
+        monkeypatch.setattr(market, "macro_signals", partial(SyntheticMarket.macro_signals, market, as_of))
+        monkeypatch.setattr(vendors, "default_market", lambda market=market: market)
+        fetched = flows.fetch_macro_signals.fn()
+
+    def offline():
+        raise AssertionError("replay must not call the vendor")
+
+    monkeypatch.setattr(vendors, "default_market", offline)
+    raw = flows.replay_raw_archive.fn("macro_signals", "raw_macro_signals", datetime.utcnow().date())
+    pd.testing.assert_frame_equal(raw, fetched.sort_values("indicator", ignore_index=True), check_categorical=False)
+
+    flows.load_macro_signals.fn(raw, flows.transform_macro_signals.fn(raw), load_mode="merge")
+    assert loads == [("raw_macro_signals", "merge"), ("macro_regime_signals", "merge")]
+
+
+def test_equity_replay_warms_rolling_features_from_stored_bars(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    db_module = importlib.reload(importlib.import_module("ingestion.db"))
+    flows = importlib.import_module("ingestion.flows")
+    monkeypatch.setattr(flows, "db_session", db_module.db_session)
+    bars = SyntheticMarket(seed=3).equity_bars(["AAPL", "MSFT"], date(2024, 1, 2), date(2024, 3, 29))
+    bars = compact_frame(bars, "raw_equity_ohlcv")
+    replayed = bars["ts"] >= pd.Timestamp("2024-03-01")
+    with db_module.db_session() as conn:
+        db_module.write_dataframe(conn, bars.loc[~replayed], "raw_equity_ohlcv")
+
+    raw = bars.loc[replayed].reset_index(drop=True)
+    history, marks = flows.read_equity_warmup.fn(raw, max(flows.EQUITY_FEATURE_WINDOWS) + 1)
+    warmed = flows.transform_equity_prices.fn(pd.concat([history, raw], ignore_index=True))
+    curated = flows._after_watermarks(warmed, marks).sort_values(["symbol", "ts"], ignore_index=True)
+
+    full = flows.transform_equity_prices.fn(bars)
+    expected = full.loc[full["ts"] >= pd.Timestamp("2024-03-01")].sort_values(["symbol", "ts"], ignore_index=True)
+    assert len(history) == 2 * (max(flows.EQUITY_FEATURE_WINDOWS) + 1)
+    assert curated["volatility_5d"].notna().all()
+    pd.testing.assert_frame_equal(curated, expected, check_categorical=False, check_dtype=False)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import importlib
+from datetime import date, datetime
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pandas as pd
+from sqlalchemy import text
+
+from ingestion.synthetic import SyntheticMarket
+from ingestion.vendors import VendorRequestError
+
+
+class PagedClient:
+    """Serves synthetic bars in two pages per request and can fail on one chunk."""
+
+    def __init__(self, fail_on=None):
+        self.market = SyntheticMarket(seed=5)
+        self.fail_on = fail_on
+        self.requests = []
+
+    def iter_aggregate_pages(self, symbol, start, end):
+        self.requests.append(start.date())
+        if start.date() == self.fail_on:
+            raise VendorRequestError("vendor brownout")
+        bars = self.market.equity_bars([symbol], date(2023, 1, 2), date(2023, 12, 29))
+        bars = bars.loc[(bars["ts"] >= start) & (bars["ts"] <= end)].reset_index(drop=True)
+        half = len(bars) // 2
+        yield bars.iloc[:half]
+        yield bars.iloc[half:]
+
+
+def test_backfill_resumes_from_checkpoints_with_continuous_features(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    importlib.reload(importlib.import_module("ingestion.db"))
+    backfill = importlib.reload(importlib.import_module("ingestion.backfill"))
+    from ingestion.db import db_session, write_dataframe
+    from ingestion.flows import transform_equity_prices
+
+    chunks = backfill.plan_chunks(["AAPL"], date(2023, 1, 1), date(2023, 12, 31), chunk_days=60)
+    assert len(chunks) == 7
+
+    def run(client):
+        return backfill.backfill_symbol(
+            client,
+            "AAPL",
+            backfill.pending_chunks(chunks, "equities"),
+            dataset="equities",
+            raw_table="raw_bars",
+            transform=transform_equity_prices.fn,
+            load_raw=lambda conn, frame: write_dataframe(conn, frame, "raw_bars"),
+            load_curated=lambda conn, frame: write_dataframe(conn, frame, "curated_bars"),
+            tail_rows=5,
+        )
+
+    interrupted = run(PagedClient(fail_on=chunks[3].start))
+    assert interrupted.chunks_loaded == 3 and interrupted.error
+
+    resumed_client = PagedClient()
+    resumed = run(resumed_client)
+    assert resumed.chunks_loaded == 4 and resumed.error is None
+    assert resumed_client.requests == [chunk.start for chunk in chunks[3:]]
+
+    with db_session() as conn:
+        raw = pd.read_sql(text("SELECT * FROM raw_bars ORDER BY ts"), conn, parse_dates=["ts"])
+        curated = pd.read_sql(text("SELECT * FROM curated_bars ORDER BY ts"), conn, parse_dates=["ts"])
+    expected = transform_equity_prices.fn(raw)
+    assert raw["ts"].is_unique
+    pd.testing.assert_frame_equal(
+        curated.reset_index(drop=True),
+        expected.reset_index(drop=True),
+        check_dtype=False,
+        check_categorical=False,
+    )
+
+
+def test_backfilled_chunks_advance_watermarks(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    db_module = importlib.reload(importlib.import_module("ingestion.db"))
+    backfill = importlib.reload(importlib.import_module("ingestion.backfill"))
+    flows = importlib.import_module("ingestion.flows")
+    monkeypatch.setattr(flows, "_load_frame", lambda conn, df, table, **kwargs: None)
+
+    chunks = backfill.plan_chunks(["AAPL"], date(2023, 1, 1), date(2023, 12, 31), chunk_days=60)
+    client = PagedClient(fail_on=chunks[3].start)
+    result = backfill.backfill_symbol(
+        client,
+        "AAPL",
+        chunks,
+        dataset="equities",
+        raw_table="raw_bars",
+        transform=flows.transform_equity_prices.fn,
+        load_raw=lambda conn, frame: db_module.write_dataframe(conn, frame, "raw_bars"),
+        load_curated=flows._load_backfilled_equities,
+        tail_rows=5,
+    )
+    assert result.chunks_loaded == 3
+
+    loaded_until = client.market.equity_bars(["AAPL"], chunks[2].start, chunks[2].end)["ts"].max()
+    with db_module.db_session() as conn:
+        assert db_module.read_symbol_watermarks(conn, "equities") == {"AAPL": loaded_until.to_pydatetime()}
+        assert db_module.read_data_freshness(conn, "equities") == loaded_until.to_pydatetime()
+        db_module.record_symbol_watermarks(conn, dataset="equities", watermarks={"AAPL": datetime(2024, 1, 5)})
+
+    oldest = client.market.equity_bars(["AAPL"], chunks[0].start, chunks[0].end)
+    with db_module.db_session() as conn:  # re-backfilling old history leaves a newer watermark alone
+        flows._load_backfilled_equities(conn, flows.transform_equity_prices.fn(oldest))
+        assert db_module.read_symbol_watermarks(conn, "equities") == {"AAPL": datetime(2024, 1, 5)}
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import importlib
+from datetime import date
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pandas as pd
+from sqlalchemy import text
+
+from ingestion.cdc import changed_rows, frame_hashes
+from ingestion.dtypes import compact_frame
+from ingestion.metrics import flow_metrics
+from ingestion.synthetic import SyntheticMarket
+
+KEYS = ("symbol", "ts")
+
+
+def _bars() -> pd.DataFrame:
+    return SyntheticMarket(seed=3).equity_bars(["AAPL", "MSFT"], date(2024, 1, 2), date(2024, 1, 31))
+
+
+def _db(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    return importlib.reload(importlib.import_module("ingestion.db"))
+
+
+def test_row_hashes_survive_dtype_compaction():
+    bars = _bars()
+    compact = compact_frame(bars, "raw_equity_ohlcv")
+    assert compact["symbol"].dtype == "category" and compact["close"].dtype == "float32"
+
+    shuffled = compact[list(reversed(compact.columns))]
+    assert (frame_hashes(bars, list(bars.columns)) == frame_hashes(shuffled, list(shuffled.columns))).all()
+    assert len(set(frame_hashes(bars, KEYS).tolist())) == len(bars)
+
+
+def test_resent_history_forwards_only_new_or_changed_rows(tmp_path, monkeypatch):
+    db_module = _db(tmp_path, monkeypatch)
+    bars = _bars()
+
+    with db_module.db_session() as conn, flow_metrics("equities") as metrics:
+        assert len(changed_rows(conn, bars, "raw_equity_ohlcv", key_columns=KEYS)) == len(bars)
+        assert changed_rows(conn, compact_frame(bars, "raw_equity_ohlcv"), "raw_equity_ohlcv", key_columns=KEYS).empty
+
+        adjusted = bars.copy()
+        adjusted.loc[3, "close"] += 0.5
+        extra = bars.tail(1).assign(ts=bars["ts"].max() + pd.Timedelta(days=1))
+        resend = pd.concat([adjusted, extra, adjusted.iloc[[3]]], ignore_index=True)
+        changes = changed_rows(conn, resend, "raw_equity_ohlcv", key_columns=KEYS)
+        stored = conn.execute(text("SELECT COUNT(*) FROM cdc_raw_equity_ohlcv")).scalar_one()
+
+    assert changes.index.tolist() == [3, len(bars), len(bars) + 1]
+    assert stored == len(bars) + 1
+    assert metrics.summary()["changes"]["raw_equity_ohlcv"]["changed"] == len(bars) + 2
+
+
+def test_persist_dataset_loads_and_publishes_only_changes(tmp_path, monkeypatch):
+    db_module = _db(tmp_path, monkeypatch)
+    flows = importlib.import_module("ingestion.flows")
+    monkeypatch.setattr(flows, "db_session", db_module.db_session)
+    monkeypatch.setattr(flows, "CDC_ENABLED", True)
+    loads, published = [], []
+    monkeypatch.setattr(flows, "_load_frame", lambda conn, df, table, **kwargs: loads.append((table, len(df))))
+    monkeypatch.setattr(flows, "publish_curated", lambda dataset, frame: published.append(len(frame)))
+    raw = pd.DataFrame({"indicator": ["inflation", "rates"], "value": [2.5, 4.0], "as_of": pd.Timestamp("2024-05-01")})
+    curated = flows.MACRO_PLAN(raw)
+
+    def persist(raw_df, curated_df):
+        loads.clear()
+        flows._persist_dataset(
+            "macro_signals",
+            raw_df,
+            curated_df,
+            raw_table="raw_macro_signals",
+            curated_table="macro_regime_signals",
+            load_mode="merge",
+        )
+        return dict(loads)
+
+    assert persist(raw, curated) == {"raw_macro_signals": 2, "macro_regime_signals": 1}
+    assert persist(raw, curated) == {}
+    assert persist(raw.assign(value=[2.5, 4.25]), curated) == {"raw_macro_signals": 1}
+    assert published == [1, 0, 0]
+    with db_module.db_session() as conn:
+        assert db_module.read_data_freshness(conn, "macro_signals") == pd.Timestamp("2024-05-01")
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pytest
+
+from ingestion import cik_index, vendors
+from ingestion.cik_index import load_ticker_index, refresh_ticker_index, write_ticker_index
+
+BULK = {
+    "0": {"cik_str": 320193, "ticker": "AAPL", "title": "Apple Inc."},
+    "1": {"cik_str": 789019, "ticker": "MSFT", "title": "MICROSOFT CORP"},
+    "2": {"cik_str": 1067983, "ticker": "BRK-B", "title": "BERKSHIRE HATHAWAY INC"},
+    "3": {"cik_str": 1067983, "ticker": "BRK-A", "title": "BERKSHIRE HATHAWAY INC"},
+    "4": {"cik_str": 1652044, "ticker": "GOOGL", "title": "Alphabet Inc."},
+}
+
+
+def _pairs():
+    return [(entry["ticker"], entry["cik_str"]) for entry in BULK.values()]
+
+
+def test_index_resolves_symbols_by_binary_search(tmp_path):
+    index = write_ticker_index(tmp_path / "tickers.idx", _pairs())
+
+    assert len(index) == 5 and list(index.keys) == sorted(index.keys)
+    assert index.resolve(["msft", "BRK.B", "UNKNOWN", "AAPL", "A-VERY-LONG-TICKER"]) == {
+        "msft": "0000789019",
+        "BRK.B": "0001067983",
+        "AAPL": "0000320193",
+    }
+    assert index.lookup("GOOGL") == "0001652044"
+    assert index.lookup("AAP") is None
+
+
+def test_refresh_skips_fresh_index_and_remaps_after_rebuild(tmp_path):
+    path = tmp_path / "tickers.idx"
+    calls = []
+
+    def source():
+        calls.append(1)
+        return _pairs()[: len(calls) + 1]
+
+    first = refresh_ticker_index(source, path)
+    assert refresh_ticker_index(source, path) is first and len(calls) == 1
+
+    rebuilt = refresh_ticker_index(source, path, max_age_hours=0)
+    assert len(calls) == 2 and len(rebuilt) == 3
+    assert load_ticker_index(path) is rebuilt
+    assert first.lookup("AAPL") == "0000320193"  # an open mapping keeps its snapshot
+
+
+def test_edgar_client_resolves_ciks_from_one_bulk_download(tmp_path, monkeypatch):
+    requested = []
+
+    class FakeResponse:
+        status_code = 200
+
+        def json(self):
+            return BULK
+
+    def fake_get(vendor, endpoint, url, **kwargs):
+        requested.append(endpoint)
+        return FakeResponse()
+
+    monkeypatch.setattr(vendors, "_vendor_get", fake_get)
+    monkeypatch.setattr(cik_index, "TICKER_INDEX_PATH", str(tmp_path / "tickers.idx"))
+    client = vendors.SECEdgarClient(user_agent="tests")
+
+    assert client.resolve_ciks(["AAPL", "MSFT", "ZZZZ"]) == {"AAPL": "0000320193", "MSFT": "0000789019"}
+    assert client.resolve_ciks(["GOOGL"]) == {"GOOGL": "0001652044"}
+    assert requested == ["company_tickers"]
+
+    synthetic = vendors.SECEdgarClient(user_agent=None).resolve_ciks(["AAPL", "MSFT"])
+    assert synthetic == vendors.SECEdgarClient(user_agent=None).resolve_ciks(["MSFT", "AAPL"])
+    assert all(len(cik) == 10 for cik in synthetic.values())
+
+
+def test_failed_refresh_serves_the_stale_index(tmp_path, monkeypatch, caplog):
+    def outage(*args, **kwargs):
+        raise vendors.VendorRequestError("Failed request to company_tickers.json")
+
+    monkeypatch.setattr(vendors, "_vendor_get", outage)
+    monkeypatch.setattr(cik_index, "TICKER_INDEX_PATH", str(tmp_path / "tickers.idx"))
+    monkeypatch.setattr(cik_index, "TICKER_INDEX_MAX_AGE_HOURS", 0.0)  # every index on disk is stale
+    client = vendors.SECEdgarClient(user_agent="tests")
+    with pytest.raises(vendors.VendorRequestError):
+        client.resolve_ciks(["AAPL"])  # nothing to fall back to yet
+
+    write_ticker_index(tmp_path / "tickers.idx", _pairs())
+    with caplog.at_level("WARNING", logger="ingestion.cik_index"):
+        assert client.resolve_ciks(["AAPL", "ZZZZ"]) == {"AAPL": "0000320193"}
+    assert "serving the copy built" in caplog.text
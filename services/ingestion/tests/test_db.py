@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import importlib
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+
+def _sqlite_db(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    db_module = importlib.import_module("ingestion.db")
+    importlib.reload(db_module)
+    return db_module
+
+
+def test_write_dataframe_falls_back_to_insert_on_sqlite(tmp_path, monkeypatch):
+    db_module = _sqlite_db(tmp_path, monkeypatch)
+    frame = pd.DataFrame({"symbol": ["AAPL"] * 9000, "close": np.arange(9000, dtype=float)})
+
+    with db_module.db_session() as conn:
+        assert not db_module.supports_copy(conn)
+        db_module.write_dataframe(conn, frame, "raw_equity_ohlcv")
+        db_module.write_dataframe(conn, frame, "raw_equity_ohlcv")
+        count = conn.execute(text("SELECT COUNT(*) FROM raw_equity_ohlcv")).scalar_one()
+
+    assert count == 18000
+
+
+def test_copy_text_chunk_escapes_and_marks_nulls():
+    from ingestion.db import _copy_text_chunk
+
+    frame = pd.DataFrame(
+        {
+            "headline": ["tab\there", "back\\slash", None],
+            "value": [1.5, np.nan, 3.0],
+            "ts": pd.to_datetime(["2024-01-01", "2024-01-02", None]),
+        }
+    )
+    rendered = _copy_text_chunk(frame).splitlines()
+
+    assert rendered[0] == "tab\\there\t1.5\t2024-01-01 00:00:00.000000"
+    assert rendered[1] == "back\\\\slash\t\\N\t2024-01-02 00:00:00.000000"
+    assert rendered[2] == "\\N\t3.0\t\\N"
+
+
+def test_copy_text_chunk_keeps_timezone_offset():
+    from ingestion.db import _copy_text_chunk
+
+    ts = pd.Series(pd.to_datetime(["2024-01-02 09:30", None]).tz_localize("America/New_York"))
+    rendered = _copy_text_chunk(pd.DataFrame({"ts": ts})).splitlines()
+
+    assert rendered == ["2024-01-02 14:30:00.000000+00:00", "\\N"]
+    assert pd.Timestamp(rendered[0]) == ts[0]
+
+
+def test_copy_binary_types_follow_the_table_or_fall_back_to_text():
+    from ingestion.db import _copy_binary_types
+
+    frame = pd.DataFrame(
+        {
+            "symbol": pd.Series(["AAPL"], dtype="category"),
+            "volume": np.array([1_000], dtype="int32"),
+            "close": np.array([185.64], dtype="float32"),
+            "ts": pd.to_datetime(["2024-01-02"]).tz_localize("UTC"),
+        }
+    )
+    table = {"symbol": "text", "volume": "int4", "close": "float8", "ts": "timestamptz"}
+
+    assert _copy_binary_types(frame, table) == ["text", "int4", "float8", "timestamptz"]
+    assert _copy_binary_types(frame, {**table, "close": "numeric"}) is None
+    assert _copy_binary_types(frame, {**table, "ts": "timestamp"}) is None
+
+
+def test_merge_dataframe_is_idempotent(tmp_path, monkeypatch):
+    db_module = _sqlite_db(tmp_path, monkeypatch)
+    first = pd.DataFrame(
+        {
+            "symbol": ["AAPL", "AAPL", "MSFT"],
+            "ts": pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-01"]),
+            "close": [100.0, 101.0, 300.0],
+        }
+    )
+    overlap = pd.DataFrame(
+        {
+            "symbol": ["AAPL", "AAPL"],
+            "ts": pd.to_datetime(["2024-01-02", "2024-01-03"]),
+            "close": [101.5, 102.0],
+        }
+    )
+
+    with db_module.db_session() as conn:
+        db_module.merge_dataframe(conn, first, "raw_equity_ohlcv", key_columns=("symbol", "ts"))
+        db_module.merge_dataframe(conn, first, "raw_equity_ohlcv", key_columns=("symbol", "ts"))
+        db_module.merge_dataframe(conn, overlap, "raw_equity_ohlcv", key_columns=("symbol", "ts"))
+        stored = pd.read_sql(text("SELECT symbol, ts, close FROM raw_equity_ohlcv ORDER BY symbol, ts"), conn)
+
+    assert len(stored) == 4
+    assert stored["close"].tolist() == [100.0, 101.5, 102.0, 300.0]
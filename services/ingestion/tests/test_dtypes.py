@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import importlib
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import inspect, text
+
+from ingestion.dtypes import compact_frame, symbol_dtype, widen_float32
+from ingestion.metrics import flow_metrics
+
+
+def _bars(symbol: str, close: list[float]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "ts": pd.date_range("2024-01-02", periods=len(close), freq="D", tz="America/New_York"),
+            "open": close,
+            "high": close,
+            "low": close,
+            "close": close,
+            "volume": np.full(len(close), 1_250_000.0),
+            "symbol": pd.Series([symbol] * len(close), dtype=object),
+        }
+    )
+
+
+def test_equity_policy_compacts_columns_and_reports_reduction():
+    raw = _bars("AAPL", [185.64, 184.25, 181.91, 181.18])
+    with flow_metrics("equities") as metrics:
+        compact = compact_frame(raw, "raw_equity_ohlcv")
+
+    assert isinstance(compact["symbol"].dtype, pd.CategoricalDtype)
+    assert compact["close"].dtype == np.float32
+    assert str(compact["volume"].dtype) == "Int32"
+    assert compact["ts"].dt.tz is None
+    assert compact["ts"].iloc[0] == pd.Timestamp("2024-01-02 05:00")
+    np.testing.assert_allclose(compact["close"], raw["close"], atol=5e-3)
+    memory = metrics.summary()["memory"]["raw_equity_ohlcv"]
+    assert memory["bytes_after"] < memory["bytes_before"] / 2
+    assert memory["reduction"] > 0.5
+
+
+def test_precision_guard_keeps_wide_types():
+    raw = _bars("BRK.A", [612_241.37, 611_980.12]).assign(volume=[10.5, 12.0])
+    compact = compact_frame(raw, "raw_equity_ohlcv")
+
+    assert compact["close"].dtype == np.float64
+    assert compact["volume"].dtype == np.float64
+    assert isinstance(compact["symbol"].dtype, pd.CategoricalDtype)
+
+
+def test_pinned_symbol_dtype_survives_concat_and_sorts_lexicographically():
+    categories = {"symbol": symbol_dtype(["MSFT", "AAPL"])}
+    parts = [
+        compact_frame(_bars(symbol, [1.0, 2.0]), "raw_equity_ohlcv", categories=categories)
+        for symbol in ("MSFT", "AAPL")
+    ]
+    combined = pd.concat(parts, ignore_index=True)
+
+    assert isinstance(combined["symbol"].dtype, pd.CategoricalDtype)
+    assert combined.sort_values(["symbol", "ts"])["symbol"].tolist() == ["AAPL", "AAPL", "MSFT", "MSFT"]
+    # A symbol outside the pinned universe keeps its value instead of becoming NaN.
+    stray = compact_frame(_bars("NVDA", [1.0]), "raw_equity_ohlcv", categories=categories)
+    assert stray["symbol"].tolist() == ["NVDA"]
+
+
+def test_widen_float32_restores_shortest_decimals():
+    values = [185.64, 0.012345, 1234567.0, -3.5e-7, 0.0, np.nan, 1.0 / 3.0]
+    frame = pd.DataFrame({"value": np.array(values, dtype=np.float32), "count": range(len(values))})
+
+    widened = widen_float32(frame)
+
+    assert widened["value"].dtype == np.float64 and widened["count"].dtype == frame["count"].dtype
+    expected = np.array(values, dtype=np.float32).astype(str).astype(np.float64)
+    np.testing.assert_array_equal(widened["value"].to_numpy(), expected)
+    assert widen_float32(widened) is widened
+
+
+def test_compact_frames_round_trip_through_write_dataframe(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    db_module = importlib.reload(importlib.import_module("ingestion.db"))
+    compact = compact_frame(_bars("AAPL", [185.64, 184.25]), "raw_equity_ohlcv")
+
+    with db_module.db_session() as conn:
+        db_module.write_dataframe(conn, compact, "raw_equity_ohlcv")
+        stored = pd.read_sql(text("SELECT symbol, close, volume FROM raw_equity_ohlcv ORDER BY ts"), conn)
+        column_types = {column["name"]: str(column["type"]) for column in inspect(conn).get_columns("raw_equity_ohlcv")}
+
+    assert stored["symbol"].tolist() == ["AAPL", "AAPL"]
+    assert stored["volume"].tolist() == [1_250_000, 1_250_000]
+    assert stored["close"].tolist() == [185.64, 184.25]
+    assert column_types["volume"] == "BIGINT"
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import pandas as pd
+
+from ingestion.features import equity_rolling_features
+from ingestion.flows import transform_equity_prices
+
+
+def _pandas_reference(raw: pd.DataFrame, window: int) -> pd.DataFrame:
+    ref = raw.copy()
+    ref["return_1d"] = ref.groupby("symbol")["close"].pct_change()
+    ref["volume_ma"] = ref.groupby("symbol")["volume"].transform(lambda s: s.rolling(window, min_periods=1).mean())
+    ref["volatility"] = ref.groupby("symbol")["return_1d"].transform(lambda s: s.rolling(window, min_periods=1).std())
+    return ref
+
+
+def test_equity_rolling_features_match_pandas_groupby_rolling():
+    rng = np.random.default_rng(11)
+    rows = 600
+    raw = pd.DataFrame(
+        {
+            "symbol": rng.choice(["AAPL", "MSFT", "NVDA", "TSLA"], rows),
+            "close": 100 + rng.standard_normal(rows).cumsum(),
+            "volume": rng.integers(1_000_000, 1_100_000, rows).astype(float),
+        }
+    )
+    raw.loc[rng.choice(rows, 20, replace=False), "volume"] = np.nan
+
+    features = equity_rolling_features(raw["symbol"], raw["close"], raw["volume"], windows=(5, 20, 60))
+    for window in (5, 20, 60):
+        ref = _pandas_reference(raw, window)
+        np.testing.assert_allclose(features["return_1d"], ref["return_1d"], rtol=1e-9, equal_nan=True)
+        np.testing.assert_allclose(features[f"volume_ma_{window}"], ref["volume_ma"], rtol=1e-9, equal_nan=True)
+        np.testing.assert_allclose(features[f"volatility_{window}d"], ref["volatility"], rtol=1e-6, equal_nan=True)
+
+
+def test_transform_equity_prices_adds_configured_windows():
+    raw = pd.DataFrame(
+        {
+            "symbol": ["AAPL"] * 30,
+            "ts": pd.date_range("2024-01-01", periods=30, freq="D"),
+            "close": np.linspace(100, 130, 30),
+            "volume": np.full(30, 1_000.0),
+        }
+    )
+    curated = transform_equity_prices.fn(raw, windows=(5, 20))
+    assert list(curated.columns) == [
+        "symbol",
+        "ts",
+        "close",
+        "return_1d",
+        "volume_ma_5",
+        "volatility_5d",
+        "volume_ma_20",
+        "volatility_20d",
+    ]
+    assert len(curated) == 29
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import importlib
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 import sys
@@ -12,6 +13,7 @@ import pytest
 from sqlalchemy import text
 
 from ingestion.flows import (
+    fetch_equity_prices,
     transform_equity_prices,
     transform_fundamentals,
     transform_insider_activity,
@@ -38,6 +40,30 @@ def test_transform_equity_prices_schema():
     assert pytest.approx(curated.iloc[0]["return_1d"], rel=1e-3) == 0.02
 
 
+def test_fetch_equity_prices_concurrent_matches_sequential(monkeypatch):
+    from ingestion import vendors
+
+    def fake_aggregates(self, symbol, start, end):
+        if symbol == "BROKEN":
+            raise vendors.VendorRequestError("boom")
+        return pd.DataFrame(
+            {
+                "ts": pd.date_range(start, periods=3, freq="D"),
+                "close": [1.0, 2.0, 3.0],
+                "volume": [10, 20, 30],
+                "symbol": symbol,
+            }
+        )
+
+    monkeypatch.setattr(vendors.PolygonClient, "get_aggregates", fake_aggregates)
+    symbols = ["MSFT", "BROKEN", "AAPL", "NVDA"]
+    start, end = datetime(2023, 1, 1), datetime(2023, 1, 3)
+    sequential = fetch_equity_prices.fn(symbols, start=start, end=end, max_workers=1)
+    concurrent = fetch_equity_prices.fn(symbols, start=start, end=end, max_workers=4)
+    pd.testing.assert_frame_equal(sequential, concurrent)
+    assert list(concurrent["symbol"].unique()) == ["AAPL", "MSFT", "NVDA"]
+
+
 def test_transform_fundamentals_schema():
     raw = pd.DataFrame(
         {
@@ -137,3 +163,183 @@ def test_record_data_freshness_upsert(tmp_path, monkeypatch):
         )
         result = conn.execute(text("SELECT row_count FROM data_freshness WHERE dataset='equities'"))
         assert result.scalar_one() == 25
+
+
+def test_symbol_watermarks_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    db_module = importlib.import_module("ingestion.db")
+    importlib.reload(db_module)
+
+    with db_module.db_session() as conn:
+        db_module.record_symbol_watermarks(
+            conn,
+            dataset="equities",
+            watermarks={"AAPL": datetime(2024, 1, 5), "MSFT": datetime(2024, 1, 4)},
+        )
+        db_module.record_symbol_watermarks(conn, dataset="equities", watermarks={"AAPL": datetime(2024, 1, 8)})
+        # a rerun of an older window never moves a watermark backwards
+        db_module.record_symbol_watermarks(
+            conn,
+            dataset="equities",
+            watermarks={"AAPL": datetime(2024, 1, 3), "MSFT": datetime(2024, 1, 2, 12, 30)},
+        )
+        marks = db_module.read_symbol_watermarks(conn, "equities", ["AAPL", "MSFT", "NVDA"])
+
+    assert marks == {"AAPL": datetime(2024, 1, 8), "MSFT": datetime(2024, 1, 4)}
+
+
+def test_resolve_watermarks_backfills_symbols_without_their_own(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    db_module = importlib.reload(importlib.import_module("ingestion.db"))
+    flows = importlib.import_module("ingestion.flows")
+    monkeypatch.setattr(flows, "db_session", db_module.db_session)
+    legacy = pd.DataFrame(
+        {"symbol": ["MSFT", "MSFT"], "ts": pd.to_datetime(["2024-01-03", "2024-01-04"]), "close": [370.0, 368.0]}
+    )
+
+    with db_module.db_session() as conn:
+        db_module.write_dataframe(conn, legacy, "raw_equity_ohlcv")
+        db_module.record_data_freshness(conn, dataset="equities", last_updated=datetime(2024, 1, 8), row_count=3)
+        db_module.record_data_freshness(
+            conn, dataset="equities", last_updated=datetime(2024, 1, 2), row_count=1, advance_only=True
+        )
+        db_module.record_symbol_watermarks(conn, dataset="equities", watermarks={"AAPL": datetime(2024, 1, 8)})
+        assert db_module.read_data_freshness(conn, "equities") == datetime(2024, 1, 8)
+
+    marks = flows.resolve_equity_watermarks.fn(["AAPL", "MSFT", "NVDA"])
+
+    assert marks == {"AAPL": datetime(2024, 1, 8), "MSFT": datetime(2024, 1, 4)}  # NVDA: full lookback
+
+
+def test_incremental_overlap_recomputes_rolling_features():
+    from ingestion.flows import _after_watermarks, _rolling_overlap_days
+
+    ts = pd.bdate_range("2024-01-01", periods=40)
+    raw = pd.DataFrame(
+        {
+            "symbol": "AAPL",
+            "ts": ts,
+            "close": [100 + (i % 7) for i in range(40)],
+            "volume": [1_000 + 10 * i for i in range(40)],
+        }
+    )
+    full = transform_equity_prices.fn(raw)
+    watermark = ts[29].to_pydatetime()
+    overlap_start = watermark - timedelta(days=_rolling_overlap_days(5))
+    window = transform_equity_prices.fn(raw.loc[raw["ts"] >= overlap_start].reset_index(drop=True))
+    delta = _after_watermarks(window, {"AAPL": watermark})
+
+    expected = full.loc[full["ts"] > watermark]
+    assert len(delta) == 10
+    pd.testing.assert_frame_equal(delta.reset_index(drop=True), expected.reset_index(drop=True))
+
+
+def test_enterprise_flow_runs_sources_in_parallel_and_reports(monkeypatch):
+    from ingestion import flows
+
+    def slow_source(name, fail=False):
+        def run(*_args, **_kwargs):
+            time.sleep(0.3)
+            if fail:
+                raise ValueError(f"{name} unavailable")
+
+        return run
+
+    monkeypatch.setattr(flows, "equities_ingestion_flow", slow_source("equities"))
+    monkeypatch.setattr(flows, "fundamentals_ingestion_flow", slow_source("fundamentals"))
+    monkeypatch.setattr(flows, "news_nlp_ingestion_flow", slow_source("news", fail=True))
+    monkeypatch.setattr(flows, "macro_signals_ingestion_flow", slow_source("macro"))
+    monkeypatch.setattr(flows, "insider_buyback_ingestion_flow", slow_source("insider"))
+
+    started = time.perf_counter()
+    report = flows.enterprise_ingestion_flow.fn(["AAPL"], parallel=True, raise_on_failure=False)
+    assert time.perf_counter() - started < 1.0
+    assert set(report) == {"equities", "fundamentals", "news_nlp", "macro_signals", "insider_buyback"}
+    assert report["news_nlp"]["status"] == "failed"
+    assert "news unavailable" in report["news_nlp"]["error"]
+    assert all(item["status"] == "completed" for name, item in report.items() if name != "news_nlp")
+
+    with pytest.raises(RuntimeError, match="news_nlp"):
+        flows.enterprise_ingestion_flow.fn(["AAPL"], parallel=False)
+
+
+def test_symbol_shards_are_stable_and_disjoint():
+    from ingestion.sharding import partition_symbols, shard_of, shard_symbols
+
+    universe = [f"SYM{i}" for i in range(200)]
+    parts = partition_symbols(universe, 4)
+
+    assert sorted(symbol for part in parts for symbol in part) == sorted(universe)
+    assert all(shard_symbols(universe, index, 4) == part for index, part in enumerate(parts))
+    assert shard_of("AAPL", 8) == shard_of(" aapl ", 8)
+
+
+def test_merge_shard_freshness_uses_oldest_shard_and_flags_missing(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    db_module = importlib.reload(importlib.import_module("ingestion.db"))
+    from ingestion.sharding import shard_dataset
+
+    names = [shard_dataset("equities", shard, 3) for shard in range(3)]
+    with db_module.db_session() as conn:
+        db_module.record_data_freshness(conn, dataset=names[0], last_updated=datetime(2024, 1, 5), row_count=10)
+        db_module.record_data_freshness(conn, dataset=names[1], last_updated=datetime(2024, 1, 3), row_count=7)
+        partial = db_module.merge_shard_freshness(conn, dataset="equities", shard_datasets=names)
+        db_module.record_data_freshness(conn, dataset=names[2], last_updated=datetime(2024, 1, 4), row_count=1)
+        merged = db_module.merge_shard_freshness(conn, dataset="equities", shard_datasets=names)
+        stored = db_module.read_data_freshness(conn, "equities")
+
+    assert partial["status"] == "partial" and partial["missing_shards"] == [names[2]]
+    assert merged["status"] == "success" and merged["row_count"] == 18
+    assert stored == datetime(2024, 1, 3)
+
+    # A later run in which shard 1 crashed before recording anything.
+    rerun = datetime.utcnow()
+    with db_module.db_session() as conn:
+        for name in (names[0], names[2]):
+            db_module.record_data_freshness(conn, dataset=name, last_updated=datetime(2024, 1, 8), row_count=2)
+        stale = db_module.merge_shard_freshness(conn, dataset="equities", shard_datasets=names, since=rerun)
+    assert stale["status"] == "partial" and stale["missing_shards"] == [names[1]]
+    assert stale["last_updated"] == datetime(2024, 1, 8)
+
+
+def test_sharded_fundamentals_fetch_handles_empty_universe(monkeypatch):
+    from ingestion import flows
+
+    monkeypatch.delenv("SEC_API_USER_AGENT", raising=False)
+    assert flows.fetch_fundamental_filings_sharded.fn([], shards=2).empty
+
+
+def test_sharded_fundamentals_fetch_matches_single_process(monkeypatch):
+    from ingestion import flows
+
+    monkeypatch.delenv("SEC_API_USER_AGENT", raising=False)
+    monkeypatch.setenv("INGESTION_SYNTHETIC_SEED", "7")  # inherited by the spawned workers
+    symbols = ["AAPL", "MSFT", "NVDA", "AMZN", "META"]
+    single = flows.fetch_fundamental_filings.fn(symbols)
+    sharded = flows.fetch_fundamental_filings_sharded.fn(symbols, shards=2, max_processes=2)
+
+    key = list(flows.NATURAL_KEYS["raw_fundamentals"])
+    pd.testing.assert_frame_equal(
+        single.sort_values(key).reset_index(drop=True),
+        sharded.sort_values(key).reset_index(drop=True),
+    )
+
+
+def test_fundamentals_merge_keeps_quarter_and_year_to_date_facts(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    db_module = importlib.reload(importlib.import_module("ingestion.db"))
+    from ingestion.flows import FUNDAMENTALS_COLUMNS, NATURAL_KEYS
+
+    facts = [  # one 10-Q reports the second quarter and the first half with the same period_end
+        ["AAPL", "0000320193", "revenue", 1100.0, "2023-04-01", "2023-06-30", "Q2", "10-Q"],
+        ["AAPL", "0000320193", "revenue", 2100.0, "2023-01-01", "2023-06-30", "Q2", "10-Q"],
+    ]
+    raw = pd.DataFrame(facts, columns=FUNDAMENTALS_COLUMNS)
+    keys = NATURAL_KEYS["raw_fundamentals"]
+
+    with db_module.db_session() as conn:
+        db_module.merge_dataframe(conn, raw, "raw_fundamentals", key_columns=keys)
+        db_module.merge_dataframe(conn, raw, "raw_fundamentals", key_columns=keys)
+        stored = pd.read_sql(text("SELECT period_start, value FROM raw_fundamentals ORDER BY period_start"), conn)
+
+    assert stored.values.tolist() == [["2023-01-01", 2100.0], ["2023-04-01", 1100.0]]
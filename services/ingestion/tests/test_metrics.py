@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pandas as pd
+from sqlalchemy import text
+
+from ingestion.metrics import REGISTRY, MetricsRegistry, flow_metrics, instrument_stage, observe_write
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    registry.inc("ingestion_vendor_retries_total", 2, "Vendor request retries", vendor="polygon")
+    registry.observe("ingestion_stage_seconds", 0.3, "Stage time", buckets=(0.1, 1.0), stage="fetch")
+
+    rendered = registry.render()
+
+    assert "# TYPE ingestion_vendor_retries_total counter" in rendered
+    assert 'ingestion_vendor_retries_total{vendor="polygon"} 2.0' in rendered
+    assert 'ingestion_stage_seconds_bucket{stage="fetch",le="0.1"} 0' in rendered
+    assert 'ingestion_stage_seconds_bucket{stage="fetch",le="1.0"} 1' in rendered
+    assert 'ingestion_stage_seconds_count{stage="fetch"} 1' in rendered
+
+
+def test_instrumented_stages_roll_up_into_flow_summary():
+    @instrument_stage("transform_test_frames")
+    def double(frame: pd.DataFrame) -> pd.DataFrame:
+        return pd.concat([frame, frame], ignore_index=True)
+
+    frame = pd.DataFrame({"symbol": ["AAPL", "MSFT"], "close": [1.0, 2.0]})
+    with flow_metrics("tests") as metrics:
+        double(frame)
+        with observe_write("test_table", 4):
+            pass
+    summary = metrics.summary()
+
+    assert summary["bottleneck_stage"] == "transform_test_frames"
+    stage = summary["stages"]["transform_test_frames"]
+    assert (stage["rows_in"], stage["rows_out"]) == (2, 4)
+    assert stage["peak_frame_bytes"] > 0
+    assert summary["writes"]["test_table"]["rows"] == 4
+    assert REGISTRY.value("ingestion_stage_rows_out_total", stage="transform_test_frames") >= 4
+
+
+def test_data_freshness_stores_run_metrics_and_migrates_old_table(tmp_path, monkeypatch):
+    import importlib
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    db_module = importlib.reload(importlib.import_module("ingestion.db"))
+
+    with db_module.db_session() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE data_freshness (dataset TEXT PRIMARY KEY, last_updated TIMESTAMP NOT NULL, "
+                "row_count INTEGER NOT NULL, status TEXT NOT NULL, updated_at TIMESTAMP NOT NULL)"
+            )
+        )
+        db_module.record_data_freshness(
+            conn,
+            dataset="equities",
+            last_updated=pd.Timestamp("2024-01-05").to_pydatetime(),
+            row_count=3,
+            metrics={"bottleneck_stage": "fetch_equity_prices"},
+        )
+        stored = conn.execute(text("SELECT metrics FROM data_freshness WHERE dataset = 'equities'")).scalar_one()
+        db_module.ensure_freshness_table(conn)  # finds the migrated table complete
+
+    assert json.loads(stored) == {"bottleneck_stage": "fetch_equity_prices"}
+    # Later writes in this process skip the column check.
+    monkeypatch.setattr(db_module, "inspect", None)
+    with db_module.db_session() as conn:
+        db_module.update_freshness_metrics(conn, dataset="equities", metrics={"rows": 3})
+
+
+def test_stored_run_metrics_include_the_load_stage(tmp_path, monkeypatch):
+    import importlib
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    db_module = importlib.reload(importlib.import_module("ingestion.db"))
+    flows = importlib.import_module("ingestion.flows")
+    monkeypatch.setattr(flows, "db_session", db_module.db_session)
+    monkeypatch.setattr(flows, "_load_frame", lambda conn, df, table, **kwargs: None)
+    raw = pd.DataFrame({"indicator": ["inflation"], "value": [2.5], "as_of": pd.to_datetime(["2024-01-31"])})
+
+    with flow_metrics("macro_signals"):
+        flows.load_macro_signals.fn(raw, flows.transform_macro_signals.fn(raw), load_mode="append")
+    with db_module.db_session() as conn:
+        stored = conn.execute(text("SELECT metrics FROM data_freshness WHERE dataset = 'macro_signals'")).scalar_one()
+
+    stages = json.loads(stored)["stages"]
+    assert {"transform_macro_signals", "load_macro_signals"} <= set(stages)
+    assert stages["load_macro_signals"]["peak_rss_bytes"] > 0
+
+
+def test_flow_metrics_runs_when_the_exporter_port_is_taken(monkeypatch, caplog):
+    import socket
+
+    from ingestion import metrics
+
+    with socket.socket() as taken:
+        taken.bind(("0.0.0.0", 0))
+        taken.listen()
+        monkeypatch.setattr(metrics, "METRICS_PORT", str(taken.getsockname()[1]))
+        monkeypatch.setattr(metrics, "_EXPORTER", None)
+        monkeypatch.setattr(metrics, "_EXPORTER_DISABLED", False)
+        with caplog.at_level("WARNING", logger="ingestion.metrics"), flow_metrics("tests"):
+            pass
+
+    assert metrics._EXPORTER is None and metrics._EXPORTER_DISABLED
+    assert "Metrics exporter not started" in caplog.text
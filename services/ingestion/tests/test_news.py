@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import importlib
+import io
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pandas as pd
+import pytest
+
+from ingestion import vendors
+from ingestion.flows import news_sentiment_deltas, transform_news_sentiment
+from ingestion.news import claim_stories, read_news_cursor, sentiment_signals, story_hashes
+from ingestion.synthetic import SyntheticMarket
+
+START = datetime(2024, 3, 1, 14, 0)
+
+
+def _story(symbol, minutes, headline, sentiment, relevance=0.5):
+    event_time = (START + timedelta(minutes=minutes)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return {
+        "symbol": symbol,
+        "headline": headline,
+        "relevance": relevance,
+        "sentiment": sentiment,
+        "event_time": event_time,
+    }
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.raw = io.BytesIO(json.dumps(payload).encode())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _fake_vendor(pages, requests):
+    def fake_get(vendor, endpoint, url, **kwargs):
+        params = dict(kwargs["params"])
+        requests.append(params)
+        index = int(params.get("cursor", 0))
+        payload = {"data": pages[index]}
+        if index + 1 < len(pages):
+            payload["next_cursor"] = str(index + 1)
+        return FakeResponse(payload)
+
+    return fake_get
+
+
+def test_story_hashes_ignore_dtype_and_timestamp_format():
+    stories = pd.DataFrame([_story("AAPL", 0, "a", 0.1), _story("MSFT", 0, "a", 0.1)])
+    compact = stories.assign(
+        symbol=stories["symbol"].astype("category"),
+        event_time=["2024-03-01 09:00:00-05:00", "2024-03-01T14:00:00"],
+    )
+
+    assert story_hashes(stories).tolist() == story_hashes(compact).tolist()
+    assert story_hashes(stories)[0] != story_hashes(stories)[1]
+
+
+def test_ravenpack_pages_through_cursor(monkeypatch):
+    requests = []
+    pages = [[_story("AAPL", 0, "a", 0.1)], [_story("AAPL", 1, "b", 0.2)], []]
+    monkeypatch.setattr(vendors, "_vendor_get", _fake_vendor(pages, requests))
+    client = vendors.RavenPackClient(api_key="key")
+
+    news = client.get_news(["AAPL", "MSFT"], since=START)
+
+    assert news["headline"].tolist() == ["a", "b"]
+    assert [params.get("cursor") for params in requests] == [None, "1", "2"]
+    assert requests[0]["start_date"] == START.isoformat() and requests[0]["tickers"] == "AAPL,MSFT"
+
+    monkeypatch.setattr(vendors, "default_market", lambda: SyntheticMarket(seed=7))
+    synthetic = list(vendors.RavenPackClient(api_key=None).iter_news_pages(["A", "B", "C"], page_size=2))
+    assert [len(page) for page in synthetic] == [2, 1]
+    assert list(vendors.RavenPackClient(api_key=None).iter_news_pages(["A"], datetime.utcnow() + timedelta(1))) == []
+
+
+def test_news_deltas_fold_to_the_batch_averages():
+    raw = pd.DataFrame([_story("AAPL", 0, "a", 0.2), _story("AAPL", 10, "b", 0.4), _story("MSFT", 5, "m", -0.4)])
+
+    deltas = news_sentiment_deltas.fn(raw)
+    averages = transform_news_sentiment.fn(raw)
+
+    assert deltas.set_index("symbol")["sentiment_count"].to_dict() == {"AAPL": 2, "MSFT": 1}
+    folded = sentiment_signals(deltas)
+    pd.testing.assert_series_equal(folded["avg_sentiment"], averages["avg_sentiment"], check_dtype=False, rtol=1e-6)
+    assert folded["article_count"].tolist() == averages["article_count"].tolist()
+
+
+def test_news_batches_fold_into_running_totals_once(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    monkeypatch.setenv("RAVENPACK_API_KEY", "key")
+    db_module = importlib.reload(importlib.import_module("ingestion.db"))
+    flows = importlib.import_module("ingestion.flows")
+    monkeypatch.setattr(flows, "db_session", db_module.db_session)
+    loads = []
+    monkeypatch.setattr(flows, "_load_frame", lambda conn, df, table, **kwargs: loads.append((table, df)))
+
+    def run(pages):
+        requests = []
+        monkeypatch.setattr(vendors, "_vendor_get", _fake_vendor(pages, requests))
+        loads.clear()
+        raw = flows.fetch_news_sentiment.fn(["AAPL", "MSFT"], since=START)
+        flows.load_news_sentiment.fn(raw, flows.news_sentiment_deltas.fn(raw))
+        return raw, dict(loads)
+
+    first = [[_story("AAPL", 0, "a", 0.2), _story("MSFT", 5, "m", -0.4)], [_story("AAPL", 10, "b", 0.4)]]
+    raw, loaded = run(first)
+    assert len(raw) == 3
+    assert loaded["news_sentiment_signals"].set_index("symbol")["avg_sentiment"].to_dict() == pytest.approx(
+        {"AAPL": 0.3, "MSFT": -0.4}, rel=1e-6
+    )
+
+    # The overlap window returns two stored stories and repeats one across pages.
+    second = [[_story("AAPL", 10, "b", 0.4), _story("AAPL", 20, "c", 0.9)], [_story("MSFT", 5, "m", -0.4)]]
+    second[1].append(_story("AAPL", 20, "c", 0.9))
+    raw, loaded = run(second)
+    assert raw["headline"].tolist() == ["c"]
+    signals = loaded["news_sentiment_signals"].iloc[0]
+    assert signals["symbol"] == "AAPL" and signals["article_count"] == 3
+    assert signals["avg_sentiment"] == pytest.approx(0.5, rel=1e-6)
+    assert signals["as_of"] == START + timedelta(minutes=20)
+
+    raw, loaded = run([[_story("AAPL", 20, "c", 0.9)]])
+    assert raw.empty and "news_sentiment_signals" not in loaded
+    with db_module.db_session() as conn:
+        assert read_news_cursor(conn, ["AAPL", "MSFT"]) == START + timedelta(minutes=20)
+        assert read_news_cursor(conn, ["NVDA"]) is None
+        late = pd.DataFrame([_story("MSFT", 5, "m", -0.4), _story("MSFT", 30, "n", 0.1)])
+        assert claim_stories(conn, late).tolist() == [False, True]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import importlib
+import json
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from ingestion import publish
+from ingestion.publish import CuratedPublisher, InMemoryBroker, kafka_config
+
+
+def _curated() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "symbol": pd.Categorical(["AAPL"] * 5 + ["MSFT"] * 3),
+            "ts": pd.date_range("2024-01-02", periods=8, freq="D"),
+            "close": np.array([185.64, 184.25, 181.91, 181.18, 185.56, 370.87, 370.6, 367.94], dtype=np.float32),
+        }
+    )
+
+
+def test_publisher_batches_rows_per_symbol_key():
+    broker = InMemoryBroker(partitions=4)
+    sent = CuratedPublisher(broker, batch_rows=2).publish("equities", _curated())
+
+    messages = broker.messages("ingestion.equities")
+    assert sent == len(messages) == 5  # AAPL: 2+2+1, MSFT: 2+1
+    by_key: dict[bytes, list[dict]] = {}
+    for message in messages:
+        assert dict(message.headers)["dataset"] == b"equities"
+        rows = json.loads(message.value)
+        assert 1 <= len(rows) <= 2
+        by_key.setdefault(message.key, []).extend(rows)
+    assert {message.partition for message in messages if message.key == b"AAPL"} == {messages[0].partition}
+    assert [row["close"] for row in by_key[b"AAPL"]] == [185.64, 184.25, 181.91, 181.18, 185.56]
+    assert [row["ts"][:10] for row in by_key[b"MSFT"]] == ["2024-01-07", "2024-01-08", "2024-01-09"]
+
+
+def test_frames_without_symbols_are_keyed_by_dataset():
+    broker = InMemoryBroker()
+    frame = pd.DataFrame({"as_of": pd.to_datetime(["2024-01-02"]), "regime": ["expansion"]})
+
+    CuratedPublisher(broker).publish("macro_signals", frame)
+
+    (message,) = broker.messages("ingestion.macro_signals")
+    assert message.key == b"macro_signals"
+    assert json.loads(message.value)[0]["regime"] == "expansion"
+
+
+def test_kafka_config_enables_compression_and_batching():
+    config = kafka_config("kafka:9092")
+
+    assert config["bootstrap.servers"] == "kafka:9092"
+    assert config["compression.type"] == publish.KAFKA_COMPRESSION
+    assert config["linger.ms"] > 0
+    assert config["enable.idempotence"] is True
+
+
+def test_persist_dataset_publishes_after_commit(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    db_module = importlib.reload(importlib.import_module("ingestion.db"))
+    flows = importlib.import_module("ingestion.flows")
+    monkeypatch.setattr(flows, "db_session", db_module.db_session)
+    committed_rows = []
+
+    class CheckingBroker(InMemoryBroker):
+        def produce(self, topic, value=None, key=None, headers=None, on_delivery=None):
+            with db_module.get_engine().connect() as conn:
+                committed_rows.append(conn.execute(text("SELECT count(*) FROM curated_test")).scalar_one())
+            super().produce(topic, value=value, key=key, headers=headers, on_delivery=on_delivery)
+
+    broker = CheckingBroker()
+    monkeypatch.setattr(publish, "_PUBLISHER", CuratedPublisher(broker))
+    monkeypatch.setattr(publish, "_CONFIGURED", True)
+
+    curated = _curated()
+    flows._persist_dataset("equities", curated, curated, raw_table="raw_test", curated_table="curated_test")
+
+    assert committed_rows and set(committed_rows) == {len(curated)}
+    assert sum(len(json.loads(message.value)) for message in broker.messages("ingestion.equities")) == len(curated)
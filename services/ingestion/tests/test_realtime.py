@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import importlib
+from dataclasses import replace
+from datetime import date
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import pandas as pd
+
+from ingestion.features import equity_rolling_features
+from ingestion.realtime import OnlineEquityFeatures, ReplayBarFeed, bars_from_frame, run_bar_stream
+from ingestion.synthetic import SyntheticMarket
+from ingestion.vendors import VendorRequestError
+
+WINDOWS = (3, 5)
+
+
+def _bars() -> pd.DataFrame:
+    bars = SyntheticMarket(seed=7).equity_bars(["AAPL", "MSFT"], date(2023, 1, 2), date(2023, 4, 28))
+    bars.loc[bars.index[10], "volume"] = np.nan
+    return bars
+
+
+def _expected(bars: pd.DataFrame) -> pd.DataFrame:
+    ordered = bars.sort_values(["symbol", "ts"], kind="stable").reset_index(drop=True)
+    features = equity_rolling_features(ordered["symbol"], ordered["close"], ordered["volume"], WINDOWS)
+    expected = ordered[["symbol", "ts", "close"]].assign(**features)
+    return expected.loc[expected["return_1d"].notna()].reset_index(drop=True)
+
+
+def _online(rows) -> pd.DataFrame:
+    frame = pd.DataFrame([row for row in rows if row is not None])
+    return frame.sort_values(["symbol", "ts"], kind="stable").reset_index(drop=True)
+
+
+def test_online_features_match_batch_transform():
+    bars = _bars()
+    features = OnlineEquityFeatures(WINDOWS)
+
+    online = _online(features.update(bar) for bar in bars_from_frame(bars))
+
+    pd.testing.assert_frame_equal(online, _expected(bars), check_dtype=False, rtol=1e-9, atol=1e-12)
+
+
+def test_revisions_replace_the_latest_bar_and_late_bars_are_dropped():
+    bars = _bars()
+    features = OnlineEquityFeatures(WINDOWS)
+    rows = {}
+    for bar in bars_from_frame(bars):
+        # Each session first arrives as a partial bar, then is revised to its final values.
+        features.update(replace(bar, close=bar.close * 0.97, volume=bar.volume / 3))
+        rows[(bar.symbol, bar.ts)] = features.update(bar)
+    first = next(bars_from_frame(bars))
+    assert features.update(first) is None and features.late_bars == 1
+
+    pd.testing.assert_frame_equal(_online(rows.values()), _expected(bars), check_dtype=False, rtol=1e-9, atol=1e-12)
+
+
+def test_seeded_state_continues_the_batch_features():
+    bars = _bars()
+    cutoff = bars["ts"].sort_values().unique()[40]
+    history = bars.loc[bars["ts"] < cutoff].groupby("symbol").tail(max(WINDOWS) + 1)
+    features = OnlineEquityFeatures(WINDOWS)
+    features.seed(history)
+
+    online = _online(features.update(bar) for bar in bars_from_frame(bars.loc[bars["ts"] >= cutoff]))
+
+    expected = _expected(bars)
+    expected = expected.loc[expected["ts"] >= cutoff].reset_index(drop=True)
+    pd.testing.assert_frame_equal(online, expected, check_dtype=False, rtol=1e-9, atol=1e-12)
+
+
+def test_run_bar_stream_flushes_micro_batches_on_rows_and_time():
+    bars = _bars()
+    batches = []
+    report = run_bar_stream(
+        ReplayBarFeed(bars),
+        OnlineEquityFeatures(WINDOWS),
+        load_batch=lambda raw, curated: batches.append((len(raw), len(curated))),
+        flush_rows=50,
+        flush_seconds=60,
+    )
+    assert report.bars == len(bars) and report.batches == len(batches) == -(-len(bars) // 50)
+    assert all(raw <= 50 for raw, _ in batches)
+    assert report.curated_rows == len(_expected(bars))
+
+    ticks = iter(range(1000))
+    timed = []
+    feed = [*bars_from_frame(bars.iloc[:4]), None, None]
+    run_bar_stream(
+        feed,
+        OnlineEquityFeatures(WINDOWS),
+        load_batch=lambda raw, curated: timed.append(len(raw)),
+        flush_rows=100,
+        flush_seconds=3,
+        clock=lambda: next(ticks),
+    )
+    assert timed == [3, 1]
+
+
+def test_realtime_flow_replays_into_curated_table(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    monkeypatch.delenv("POLYGON_API_KEY", raising=False)
+    db_module = importlib.reload(importlib.import_module("ingestion.db"))
+    flows = importlib.import_module("ingestion.flows")
+    monkeypatch.setattr(flows, "db_session", db_module.db_session)
+    monkeypatch.setattr(flows, "EQUITY_FEATURE_WINDOWS", WINDOWS)
+    loads = []
+    monkeypatch.setattr(flows, "_load_frame", lambda conn, df, table, **kwargs: loads.append((table, kwargs, len(df))))
+
+    report = flows.realtime_equities_flow.fn(["AAPL", "MSFT"], replay_days=10, flush_rows=4)
+
+    assert report["bars"] > 0 and report["batches"] == -(-report["bars"] // 4)
+    assert {kwargs["mode"] for _, kwargs, _ in loads} == {"merge"}
+    assert sum(rows for table, _, rows in loads if table == "equity_price_factors") == report["curated_rows"]
+    with db_module.get_engine().connect() as conn:
+        assert db_module.read_data_freshness(conn, "equities_realtime") is not None
+        assert db_module.read_data_freshness(conn, "equities") is None
+
+
+def test_realtime_flow_replay_skips_failed_symbols(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'ingestion.sqlite'}")
+    monkeypatch.delenv("POLYGON_API_KEY", raising=False)
+    db_module = importlib.reload(importlib.import_module("ingestion.db"))
+    flows = importlib.import_module("ingestion.flows")
+    monkeypatch.setattr(flows, "db_session", db_module.db_session)
+    monkeypatch.setattr(flows, "EQUITY_FEATURE_WINDOWS", WINDOWS)
+    monkeypatch.setattr(flows, "_load_frame", lambda conn, df, table, **kwargs: None)
+    get_aggregates = flows.PolygonClient.get_aggregates
+
+    def flaky(self, symbol, start, end):
+        if symbol == "BROKEN":
+            raise VendorRequestError("boom")
+        return get_aggregates(self, symbol, start, end)
+
+    monkeypatch.setattr(flows.PolygonClient, "get_aggregates", flaky)
+
+    report = flows.realtime_equities_flow.fn(["AAPL", "BROKEN"], replay_days=10)
+    assert report["bars"] > 0
+
+    empty = flows.realtime_equities_flow.fn(["BROKEN"], replay_days=10)
+    assert empty["bars"] == 0 and empty["batches"] == 0
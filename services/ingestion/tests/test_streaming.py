@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pandas as pd
+
+from ingestion.flows import transform_equity_prices
+from ingestion.streaming import stream_symbols, transform_pages
+from ingestion.synthetic import SyntheticMarket
+from ingestion.vendors import VendorRequestError
+
+
+def _bars(symbol: str) -> pd.DataFrame:
+    return SyntheticMarket(seed=11).equity_bars([symbol], date(2023, 1, 2), date(2023, 6, 30))
+
+
+def _pages(frame: pd.DataFrame, size: int = 17):
+    for offset in range(0, len(frame), size):
+        yield frame.iloc[offset : offset + size].reset_index(drop=True)
+
+
+def test_transform_pages_carries_rolling_state_across_pages():
+    bars = _bars("AAPL")
+    transform = lambda frame: transform_equity_prices.fn(frame, (3, 5))  # noqa: E731
+
+    curated = pd.concat([page for _, page in transform_pages(_pages(bars), transform, tail_rows=5)])
+
+    pd.testing.assert_frame_equal(curated.reset_index(drop=True), transform(bars).reset_index(drop=True))
+
+
+def test_stream_symbols_loads_bounded_batches_and_skips_failed_symbols():
+    symbols = ["AAPL", "MSFT", "BROKEN", "NVDA", "AMZN"]
+    batches = []
+
+    def fetch_pages(symbol):
+        if symbol == "BROKEN":
+            raise VendorRequestError("boom")
+        return _pages(_bars(symbol))
+
+    report = stream_symbols(
+        symbols,
+        fetch_pages,
+        transform=transform_equity_prices.fn,
+        load_batch=lambda raw, curated: batches.append((raw, curated)),
+        tail_rows=5,
+        batch_rows=200,
+        max_workers=3,
+    )
+
+    per_symbol = len(_bars("AAPL"))
+    assert report.failed_symbols == ["BROKEN"]
+    assert report.raw_rows == 4 * per_symbol
+    assert report.batches == len(batches) > 1
+    assert all(len(raw) < 200 + 17 for raw, _ in batches)  # at most one page past the threshold
+    loaded = pd.concat([curated for _, curated in batches], ignore_index=True)
+    assert list(loaded["symbol"].unique()) == ["AAPL", "MSFT", "NVDA", "AMZN"]
+    assert report.curated_rows == len(loaded)
+
+
+def test_stream_symbols_loads_a_long_history_before_it_is_fully_fetched():
+    bars = _bars("AAPL")
+    fetched = []
+    loads = []
+
+    def fetch_pages(symbol):
+        for page in _pages(bars):
+            fetched.append(len(page))
+            yield page
+
+    stream_symbols(
+        ["AAPL"],
+        fetch_pages,
+        transform=transform_equity_prices.fn,
+        load_batch=lambda raw, curated: loads.append((len(fetched), len(raw))),
+        tail_rows=5,
+        batch_rows=34,
+    )
+
+    assert len(loads) > 1 and loads[0][0] < len(fetched)
+    assert sum(rows for _, rows in loads) == len(bars)
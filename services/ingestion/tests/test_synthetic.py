@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pandas as pd
+
+from ingestion.synthetic import SyntheticMarket, universe
+
+
+def test_equity_bars_reproducible_per_seed_and_symbol():
+    start, end = datetime(2020, 1, 1), datetime(2020, 12, 31)
+    symbols = universe(50)
+    first = SyntheticMarket(seed=3).equity_bars(symbols, start, end)
+    second = SyntheticMarket(seed=3).equity_bars(symbols, start, end)
+    alone = SyntheticMarket(seed=3).equity_bars([symbols[7]], start, end)
+    other_seed = SyntheticMarket(seed=4).equity_bars(symbols, start, end)
+
+    pd.testing.assert_frame_equal(first, second)
+    pd.testing.assert_frame_equal(
+        first.loc[first["symbol"] == symbols[7]].reset_index(drop=True),
+        alone,
+    )
+    assert not first["close"].equals(other_seed["close"])
+    assert len(first) == 50 * len(pd.bdate_range(start, end))
+
+
+def test_equity_bars_respect_ohlc_invariants():
+    bars = SyntheticMarket(seed=1).equity_bars(universe(20), datetime(2021, 1, 1), datetime(2021, 6, 30))
+    assert (bars["high"] >= bars[["open", "close"]].max(axis=1)).all()
+    assert (bars["low"] <= bars[["open", "close"]].min(axis=1)).all()
+    assert (bars["volume"] > 0).all()
+
+
+def test_bars_do_not_depend_on_the_requested_window():
+    market = SyntheticMarket(seed=5)
+    year = market.equity_bars(["AAPL", "MSFT"], datetime(2023, 6, 1), datetime(2024, 3, 1))
+    shifted = market.equity_bars(["MSFT"], datetime(2023, 12, 20), datetime(2024, 6, 3))
+
+    overlap = year.merge(shifted, on=["symbol", "ts"], suffixes=("", "_shifted"))
+    assert len(overlap) == len(pd.bdate_range(datetime(2023, 12, 20), datetime(2024, 3, 1)))
+    for column in ("open", "high", "low", "close", "volume"):
+        assert (overlap[column] == overlap[f"{column}_shifted"]).all()
+
+
+def test_news_and_insider_draws_do_not_depend_on_the_universe():
+    market = SyntheticMarket(seed=5)
+    as_of = datetime(2024, 3, 1)
+    news = market.news(["AAPL", "MSFT"], as_of).set_index("symbol")
+    insider = market.insider_activity(["AAPL", "MSFT"], as_of).set_index("symbol")
+
+    pd.testing.assert_frame_equal(market.news(["MSFT"], as_of).set_index("symbol"), news.loc[["MSFT"]])
+    pd.testing.assert_frame_equal(market.insider_activity(["MSFT"], as_of).set_index("symbol"), insider.loc[["MSFT"]])
+
+
+def test_iter_equity_bars_chunks_match_one_frame():
+    market = SyntheticMarket(seed=9)
+    symbols = universe(30)
+    start, end = datetime(2019, 6, 1), datetime(2021, 2, 1)
+    chunks = list(market.iter_equity_bars(symbols, start, end, batch_symbols=7))
+
+    assert len(chunks) == 5 * 3  # symbol batches × calendar years
+    combined = pd.concat(chunks, ignore_index=True).sort_values(["symbol", "ts"], ignore_index=True)
+    pd.testing.assert_frame_equal(combined, market.equity_bars(symbols, start, end))
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingestion.metrics import flow_metrics
+from ingestion.transforms import INSIDER_PLAN, MACRO_PLAN, TransformPlan, aggregate, derive, sort_by, where
+
+
+def _plan() -> TransformPlan:
+    return TransformPlan(
+        "example",
+        steps=(
+            derive("unused", ["a"], ["scratch"], lambda columns: {"scratch": columns["a"] * 2}),
+            where("positive", ["a"], lambda columns: columns["a"] > 0),
+            where("even", ["b"], lambda columns: columns["b"] % 2 == 0),
+            sort_by("key"),
+            derive("total", ["a", "b"], ["total"], lambda columns: {"total": columns["a"] + columns["b"]}),
+        ),
+        output=("key", "total"),
+    )
+
+
+def test_compile_pushes_projection_down_and_skips_dead_steps():
+    plan = _plan()
+
+    assert plan.projection == {"a", "b", "key"}
+    assert [step.name for step in plan.compiled.steps] == ["positive", "even", "sort", "total"]
+    assert INSIDER_PLAN.projection == {"symbol", "transaction_type", "shares", "transaction_date"}
+    with pytest.raises(ValueError, match="sorts more than once"):
+        TransformPlan("twice", steps=(sort_by("a"), sort_by("b")), output=("a",)).compiled
+    with pytest.raises(ValueError, match="reads b after aggregate"):
+        TransformPlan("lost", steps=(aggregate("sum", ["a"], ["a"], dict),), output=("a", "b")).compiled
+
+
+def test_plan_fuses_filters_sorts_once_and_reports_steps():
+    frame = pd.DataFrame(
+        {
+            "key": ["d", "c", None, "a", "b", "e"],
+            "a": [1, 2, 3, -4, 5, 6],
+            "b": [2, 4, 6, 8, 9, 10],
+            "ignored": ["x"] * 6,
+        },
+        index=[10, 11, 12, 13, 14, 15],
+    )
+
+    with flow_metrics("example") as metrics:
+        result, report = _plan().run(frame)
+
+    assert result["key"].tolist()[:3] == ["c", "d", "e"] and pd.isna(result["key"].iloc[3])
+    assert result["total"].tolist() == [6, 3, 16, 9]
+    assert report.projected == ("key", "a", "b")
+    steps = [timing.step for timing in report.steps]
+    assert steps == ["project", "positive", "even", "select", "sort", "total", "output"]
+    assert report.steps[3].rows_out == 4
+    assert metrics.summary()["transforms"]["example.select"]["rows_in"] == 6
+
+
+def test_macro_regime_is_vectorized_and_tolerates_missing_indicators():
+    raw = pd.DataFrame(
+        {
+            "indicator": ["gdp_growth", "inflation", "gdp_growth", "inflation", "gdp_growth", "rates"],
+            "value": [2.5, 2.0, 2.5, np.nan, 1.0, 4.0],
+            "as_of": pd.to_datetime(["2024-01-01"] * 2 + ["2024-02-01"] * 2 + ["2024-03-01"] * 2),
+        }
+    )
+
+    curated = MACRO_PLAN(raw)
+
+    assert list(curated.columns) == ["as_of", "gdp_growth", "inflation", "rates", "regime"]
+    # February has no inflation reading, which compares false like the row-wise rule did.
+    assert curated["regime"].astype(str).tolist() == ["expansion", "slowdown", "slowdown"]
+    assert MACRO_PLAN(raw.loc[raw["indicator"] == "gdp_growth"])["regime"].astype(str).tolist() == [
+        "expansion",
+        "expansion",
+        "slowdown",
+    ]
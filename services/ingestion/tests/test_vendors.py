@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+import sys
+import threading
+
+import pytest
+import requests
+from urllib3.response import HTTPResponse
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from ingestion import resilience, vendors
+from ingestion.http_cache import HTTPCache
+from ingestion.ratelimit import TokenBucket, retry_after_seconds
+from ingestion.resilience import OPEN, CircuitBreaker, hedged_call
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: bytes = b"", headers: dict | None = None):
+        self.status_code = status_code
+        self.content = body
+        self.headers = headers or {}
+        self.closed = False
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} error")
+
+    def iter_content(self, chunk_size=1):
+        for offset in range(0, len(self.content), chunk_size):
+            yield self.content[offset : offset + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_company_facts_served_from_cache_on_304(tmp_path, monkeypatch):
+    document = {"cik": "0000320193", "facts": {"us-gaap": {}}}
+    sent_headers = []
+
+    def fake_request(method, url, **kwargs):
+        sent_headers.append(kwargs["headers"])
+        if kwargs["headers"].get("If-None-Match") == '"v1"':
+            return FakeResponse(304)
+        return FakeResponse(200, json.dumps(document).encode(), {"ETag": '"v1"'})
+
+    monkeypatch.setattr(vendors, "_retry_request", fake_request)
+    client = vendors.SECEdgarClient(user_agent="tests", cache=HTTPCache(tmp_path))
+
+    assert client.get_company_facts("0000320193") == document
+    assert client.get_company_facts("0000320193") == document
+    assert "If-None-Match" not in sent_headers[0]
+    assert sent_headers[1]["If-None-Match"] == '"v1"'
+
+
+def test_http_cache_evicts_least_recently_used(tmp_path):
+    cache = HTTPCache(tmp_path, max_bytes=10_000)
+    payload = os.urandom(4_000)  # incompressible, so each entry takes ~4KB on disk
+    cache.store("a", payload, etag="a")
+    cache.store("b", payload, etag="b")
+    with cache.open("a") as handle:  # touch "a" so "b" becomes least recently used
+        assert handle.read() == payload
+    cache.store("c", payload, etag="c")
+
+    assert cache.conditional_headers("a") == {"If-None-Match": "a"}
+    assert cache.conditional_headers("b") == {}
+    assert cache.total_bytes() <= 10_000
+
+
+def test_extract_company_facts_streams_through_cache(tmp_path, monkeypatch):
+    document = {"facts": {"us-gaap": {"Revenues": {"units": {"USD": [{"end": "2023-06-30", "val": 5}]}}}}}
+    statuses = []
+
+    def fake_request(method, url, **kwargs):
+        assert kwargs["stream"] is True
+        if kwargs["headers"].get("If-None-Match") == '"v1"':
+            statuses.append(304)
+            return FakeResponse(304)
+        statuses.append(200)
+        return FakeResponse(200, json.dumps(document).encode(), {"ETag": '"v1"'})
+
+    monkeypatch.setattr(vendors, "_retry_request", fake_request)
+    client = vendors.SECEdgarClient(user_agent="tests", cache=HTTPCache(tmp_path))
+    expected = [
+        {
+            "metric": "revenue",
+            "value": 5,
+            "period_start": "2023-06-30",
+            "period_end": "2023-06-30",
+            "fiscal_period": None,
+            "form": None,
+        }
+    ]
+
+    assert client.extract_company_facts("0000000001") == expected
+    assert client.extract_company_facts("0000000001") == expected
+    assert statuses == [200, 304]
+
+
+def _compressed_response(payload, *, truncate_to: int | None = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    body = gzip.compress(json.dumps(payload).encode())
+    headers = {"Content-Encoding": "gzip", "Content-Length": str(len(body))}
+    if truncate_to is not None:
+        body = body[:truncate_to]  # the connection drops partway through the body
+    response.raw = HTTPResponse(body=io.BytesIO(body), headers=headers, preload_content=False)
+    return response
+
+
+def test_polygon_pages_stream_and_decompress_incrementally(monkeypatch):
+    next_url = "https://api.polygon.io/v2/aggs/cursor/abc"
+    pages = [
+        {"results": [{"t": 1704171600000, "c": 185.6, "v": 1e6}], "next_url": next_url},
+        {"results": [{"t": 1704258000000, "c": 184.3, "v": 2e6}], "status": "OK"},
+    ]
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append((url, kwargs))
+        return _compressed_response(pages[len(calls) - 1])
+
+    monkeypatch.setattr(vendors, "_retry_request", fake_request)
+    frame = vendors.PolygonClient(api_key="key").get_aggregates("AAPL", datetime(2024, 1, 2), datetime(2024, 1, 3))
+
+    assert frame["close"].tolist() == [185.6, 184.3] and set(frame["symbol"]) == {"AAPL"}
+    assert all(kwargs["stream"] for _, kwargs in calls)
+    assert calls[1][0] == next_url and calls[1][1]["params"] == {"apiKey": "key"}
+    assert "gzip" in vendors.get_session().headers["Accept-Encoding"]
+
+
+def test_truncated_body_is_refetched_then_raises_vendor_error(monkeypatch):
+    page = {"results": [{"t": 1704171600000 + day * 86_400_000, "c": 185.6, "v": 1e6} for day in range(50)]}
+    bodies = [20, None]
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append(url)
+        return _compressed_response(page, truncate_to=bodies.pop(0) if bodies else 20)
+
+    monkeypatch.setattr(vendors, "_retry_request", fake_request)
+    monkeypatch.setattr(vendors.time, "sleep", lambda seconds: None)
+    client = vendors.PolygonClient(api_key="key")
+
+    frame = client.get_aggregates("AAPL", datetime(2024, 1, 2), datetime(2024, 3, 1))
+    assert len(frame) == 50 and len(calls) == 2
+
+    calls.clear()
+    with pytest.raises(vendors.VendorRequestError, match="Failed reading response"):
+        client.get_aggregates("AAPL", datetime(2024, 1, 2), datetime(2024, 3, 1))
+    assert len(calls) == vendors.MAX_RETRIES
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_spaces_requests_and_adapts_to_throttling():
+    clock = FakeClock()
+    bucket = TokenBucket(max_rate=10.0, burst=1.0, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(0.1)
+
+    bucket.throttled(2.0)
+    assert bucket.rate == pytest.approx(5.0)
+    assert bucket.acquire() == pytest.approx(2.0 + 1 / 5.0)  # the pause, then its own slot at the reduced rate
+
+    for _ in range(20):
+        bucket.succeeded()
+    assert bucket.rate == pytest.approx(10.0)
+
+
+def test_callers_queued_behind_a_pause_are_staggered():
+    clock = FakeClock()
+    bucket = TokenBucket(max_rate=10.0, burst=5.0, clock=clock, sleep=lambda seconds: None)
+
+    bucket.throttled(3.0)
+    waits = [bucket.acquire() for _ in range(4)]  # four threads arriving during the pause
+
+    assert waits == pytest.approx([3.0, 3.2, 3.4, 3.6])
+    clock.now = 3.6
+    assert bucket.acquire() == pytest.approx(0.2)
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    now = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+    assert retry_after_seconds("3") == 3.0
+    assert retry_after_seconds("Mon, 01 Jan 2024 12:00:07 GMT", now=now) == 7.0
+    assert retry_after_seconds("garbage") is None
+    assert retry_after_seconds(None) is None
+
+
+def test_retry_request_backs_off_on_429(monkeypatch):
+    throttled = FakeResponse(429, headers={"Retry-After": "4"})
+    responses = [throttled, FakeResponse(200, b"{}")]
+
+    class FakeSession:
+        def request(self, method, url, **kwargs):
+            return responses.pop(0)
+
+    clock = FakeClock()
+    limiter = TokenBucket(max_rate=100.0, clock=clock, sleep=clock.sleep)
+    monkeypatch.setattr(vendors, "get_session", lambda: FakeSession())
+
+    response = vendors._retry_request("GET", "https://vendor.test", limiter=limiter)
+
+    assert response.status_code == 200 and throttled.closed
+    assert clock.now >= 4.0
+    assert limiter.rate < 100.0
+
+
+def test_circuit_breaker_opens_then_probes_after_cooldown():
+    clock = FakeClock()
+    breaker = CircuitBreaker("vendor:test", failure_ratio=0.5, min_calls=4, cooldown=30.0, clock=clock)
+    for _ in range(4):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+    clock.now += 30.0
+    assert breaker.allow_request()  # the single half-open probe
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.allow_request()
+
+
+def test_unexpected_probe_error_reopens_the_breaker(monkeypatch):
+    clock = FakeClock()
+    endpoint = "polygon:test-probe-error"
+    breaker = CircuitBreaker(endpoint, failure_ratio=0.5, min_calls=1, cooldown=30.0, clock=clock)
+    monkeypatch.setitem(resilience._BREAKERS, endpoint, breaker)
+    breaker.record_failure()
+
+    class BrokenSession:
+        def request(self, method, url, **kwargs):
+            raise ValueError("malformed URL")  # not a requests.RequestException
+
+    monkeypatch.setattr(vendors, "get_session", lambda: BrokenSession())
+    clock.now += 30.0
+    with pytest.raises(ValueError):
+        vendors._retry_request("GET", "https://vendor.test", endpoint=endpoint)
+
+    assert breaker.state == OPEN
+    clock.now += 30.0
+    assert breaker.allow_request()  # a fresh probe after the next cool-down
+
+
+def test_retry_request_fails_fast_while_circuit_is_open(monkeypatch):
+    calls = []
+
+    class FailingSession:
+        def request(self, method, url, **kwargs):
+            calls.append(url)
+            raise requests.ConnectionError("brownout")
+
+    monkeypatch.setattr(vendors, "get_session", lambda: FailingSession())
+    monkeypatch.setattr(vendors.time, "sleep", lambda seconds: None)
+    endpoint = "polygon:test-fail-fast"
+    for _ in range(4):
+        with pytest.raises(vendors.VendorRequestError):
+            vendors._retry_request("GET", "https://vendor.test", endpoint=endpoint)
+    attempted = len(calls)
+
+    with pytest.raises(vendors.CircuitOpenError):
+        vendors._retry_request("GET", "https://vendor.test", endpoint=endpoint)
+    assert len(calls) == attempted
+
+
+def test_hedged_call_returns_backup_when_primary_stalls():
+    release = threading.Event()
+    discarded = []
+    calls = []
+
+    def call():
+        calls.append(None)
+        if len(calls) == 1:
+            release.wait(5)
+            return "primary"
+        return "backup"
+
+    assert hedged_call(call, 0.01, discard=discarded.append) == "backup"
+    release.set()
+    for _ in range(100):
+        if discarded:
+            break
+        threading.Event().wait(0.01)
+    assert discarded == ["primary"]
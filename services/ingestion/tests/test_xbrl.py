@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pytest
+
+from ingestion import xbrl
+
+DOCUMENT = {
+    "cik": 320193,
+    "entityName": "Example Corp",
+    "facts": {
+        "dei": {"EntityCommonStockSharesOutstanding": {"units": {"shares": [{"end": "2023-06-30", "val": 1}]}}},
+        "IncomeStatement": {
+            "Revenues": {"units": {"USD": [{"end": "2023-03-31", "val": 1.0}]}},
+        },
+        "us-gaap": {
+            "Revenues": {
+                "label": "Revenues",
+                "units": {
+                    "USD": [
+                        {"end": "2023-03-31", "val": 1000, "form": "10-Q"},
+                        {"end": "2023-06-30", "val": 1100, "form": "10-Q"},
+                    ]
+                },
+            },
+            "NetIncomeLoss": {"units": {"USD": [{"end": "2023-06-30", "val": -25}]}},
+            "AccountsPayableCurrent": {"units": {"USD": [{"end": "2023-06-30", "val": 7}]}},
+        },
+    },
+}
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_extract_facts_pulls_requested_concepts_in_one_pass(monkeypatch, streaming):
+    if not streaming:
+        monkeypatch.setattr(xbrl, "ijson", None)
+    elif xbrl.ijson is None:
+        pytest.skip("ijson not installed")
+    stream = io.BytesIO(json.dumps(DOCUMENT).encode())
+
+    rows = xbrl.extract_facts(stream)
+
+    assert sorted((row["metric"], row["period_end"], row["value"]) for row in rows) == [
+        ("net_income", "2023-06-30", -25),
+        ("revenue", "2023-03-31", 1000),
+        ("revenue", "2023-06-30", 1100),
+    ]
@@ -4,12 +4,156 @@ CREATE TABLE IF NOT EXISTS symbols (
   symbol TEXT UNIQUE NOT NULL,
   name TEXT
 );
+
+-- Monthly range partitions. Partitions are built standalone and then
+-- ATTACHed, which takes a weaker lock on the parent than CREATE ... PARTITION OF.
+-- Rows waiting in the DEFAULT partition for the new month are moved into the
+-- new partition in the same transaction.
+CREATE OR REPLACE FUNCTION ensure_monthly_partitions(
+  parent regclass,
+  first_month date,
+  last_month date,
+  time_column text DEFAULT 'ts'
+) RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+  parent_schema text;
+  parent_name text;
+  default_part regclass;
+  month_start date := date_trunc('month', first_month)::date;
+  month_end date;
+  part_name text;
+  created integer := 0;
+BEGIN
+  SELECT n.nspname, c.relname INTO parent_schema, parent_name
+  FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+  WHERE c.oid = parent;
+  SELECT i.inhrelid::regclass INTO default_part
+  FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+  WHERE i.inhparent = parent AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT';
+
+  WHILE month_start <= last_month LOOP
+    month_end := (month_start + interval '1 month')::date;
+    part_name := format('%s_p%s', parent_name, to_char(month_start, 'YYYYMM'));
+    IF to_regclass(format('%I.%I', parent_schema, part_name)) IS NULL THEN
+      EXECUTE format(
+        'CREATE TABLE %I.%I (LIKE %s INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        parent_schema, part_name, parent
+      );
+      -- A matching CHECK lets ATTACH skip its validation scan.
+      EXECUTE format(
+        'ALTER TABLE %I.%I ADD CONSTRAINT %I CHECK (%I >= %L AND %I < %L)',
+        parent_schema, part_name, part_name || '_bounds', time_column, month_start, time_column, month_end
+      );
+      IF default_part IS NOT NULL THEN
+        EXECUTE format(
+          'WITH moved AS (DELETE FROM %s WHERE %I >= %L AND %I < %L RETURNING *) INSERT INTO %I.%I SELECT * FROM moved',
+          default_part, time_column, month_start, time_column, month_end, parent_schema, part_name
+        );
+      END IF;
+      EXECUTE format(
+        'ALTER TABLE %s ATTACH PARTITION %I.%I FOR VALUES FROM (%L) TO (%L)',
+        parent, parent_schema, part_name, month_start, month_end
+      );
+      EXECUTE format('ALTER TABLE %I.%I DROP CONSTRAINT %I', parent_schema, part_name, part_name || '_bounds');
+      created := created + 1;
+    END IF;
+    month_start := month_end;
+  END LOOP;
+  RETURN created;
+END;
+$$;
+
+-- Detach (and optionally drop) monthly partitions that end on or before
+-- ``older_than``. Detached tables stay queryable for archiving.
+CREATE OR REPLACE FUNCTION detach_monthly_partitions(
+  parent regclass,
+  older_than date,
+  drop_detached boolean DEFAULT false
+) RETURNS integer LANGUAGE plpgsql AS $$
+DECLARE
+  part record;
+  detached integer := 0;
+BEGIN
+  FOR part IN
+    SELECT i.inhrelid::regclass AS rel,
+           to_date(substring(c.relname FROM '_p([0-9]{6})$'), 'YYYYMM') AS month_start
+    FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = parent AND c.relname ~ '_p[0-9]{6}$'
+  LOOP
+    IF (part.month_start + interval '1 month')::date <= older_than THEN
+      EXECUTE format('ALTER TABLE %s DETACH PARTITION %s', parent, part.rel);
+      IF drop_detached THEN
+        EXECUTE format('DROP TABLE %s', part.rel);
+      END IF;
+      detached := detached + 1;
+    END IF;
+  END LOOP;
+  RETURN detached;
+END;
+$$;
+
+-- Price bars: range-partitioned by month on ts, with a symbol-major primary
+-- key for per-symbol history reads and a BRIN index on ts for time-range
+-- scans. Prices are stored as double precision.
 CREATE TABLE IF NOT EXISTS ohlcv (
   ts TIMESTAMP NOT NULL,
-  symbol_id INT REFERENCES symbols(id),
-  open NUMERIC, high NUMERIC, low NUMERIC, close NUMERIC, volume NUMERIC,
-  PRIMARY KEY (ts, symbol_id)
-);
+  symbol_id INT NOT NULL REFERENCES symbols(id),
+  open DOUBLE PRECISION,
+  high DOUBLE PRECISION,
+  low DOUBLE PRECISION,
+  close DOUBLE PRECISION,
+  volume DOUBLE PRECISION,
+  PRIMARY KEY (symbol_id, ts)
+) PARTITION BY RANGE (ts);
+
+-- Create partitions from the oldest row waiting in ohlcv_default (e.g. a
+-- backfill) through ``months_ahead`` months from now. With ``retain_months``,
+-- detach partitions older than that. Runs daily through pg_cron when
+-- available; otherwise through the ingestion flow ``ohlcv_partition_maintenance``.
+CREATE OR REPLACE FUNCTION ohlcv_maintain_partitions(
+  months_ahead integer DEFAULT 3,
+  retain_months integer DEFAULT NULL
+) RETURNS void LANGUAGE plpgsql AS $$
+DECLARE
+  first_month date := date_trunc('month', now())::date;
+  last_month date := (date_trunc('month', now()) + make_interval(months => months_ahead))::date;
+BEGIN
+  IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('ohlcv')) IS DISTINCT FROM 'p' THEN
+    RAISE NOTICE 'ohlcv is not partitioned; run sql-scripts/migrations/001_partition_ohlcv.sql';
+    RETURN;
+  END IF;
+  IF to_regclass('ohlcv_default') IS NOT NULL THEN
+    SELECT LEAST(first_month, min(ts)::date), GREATEST(last_month, max(ts)::date)
+    INTO first_month, last_month
+    FROM ohlcv_default;
+  END IF;
+  PERFORM ensure_monthly_partitions('ohlcv', first_month, last_month);
+  IF retain_months IS NOT NULL THEN
+    PERFORM detach_monthly_partitions(
+      'ohlcv', (date_trunc('month', now()) - make_interval(months => retain_months))::date
+    );
+  END IF;
+END;
+$$;
+
+DO $$
+BEGIN
+  -- Skipped on databases that still have the legacy unpartitioned table.
+  IF (SELECT relkind FROM pg_class WHERE oid = 'ohlcv'::regclass) = 'p' THEN
+    CREATE TABLE IF NOT EXISTS ohlcv_default PARTITION OF ohlcv DEFAULT;
+    CREATE INDEX IF NOT EXISTS ohlcv_ts_brin ON ohlcv USING brin (ts);
+    PERFORM ohlcv_maintain_partitions();
+  END IF;
+  IF current_setting('shared_preload_libraries', true) LIKE '%pg_cron%' THEN
+    BEGIN
+      CREATE EXTENSION IF NOT EXISTS pg_cron;
+      PERFORM cron.schedule('ohlcv-partitions', '15 0 * * *', 'SELECT ohlcv_maintain_partitions()');
+    EXCEPTION WHEN OTHERS THEN
+      RAISE NOTICE 'pg_cron scheduling skipped: %', SQLERRM;
+    END;
+  END IF;
+END;
+$$;
 CREATE TABLE IF NOT EXISTS news (
   id BIGSERIAL PRIMARY KEY,
   ts TIMESTAMP NOT NULL,
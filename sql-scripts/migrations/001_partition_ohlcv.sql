@@ -0,0 +1,137 @@
+-- Online migration of a legacy ohlcv table (NUMERIC columns, PRIMARY KEY (ts, symbol_id))
+-- to the partitioned layout in create_schema.sql.
+--
+--   psql "$DATABASE_URL" -f sql-scripts/migrations/001_partition_ohlcv.sql
+--
+-- Readers and writers keep using ohlcv throughout. A trigger mirrors every
+-- write into ohlcv_partitioned. History is copied one month per transaction,
+-- then both tables are compared month by month. The swap takes an exclusive
+-- lock only for the renames. The old table is kept as ohlcv_legacy for
+-- rollback. The script is safe to rerun if it stops part-way.
+\set ON_ERROR_STOP on
+
+SELECT relkind = 'p' AS ohlcv_already_partitioned FROM pg_class WHERE oid = 'ohlcv'::regclass \gset
+\if :ohlcv_already_partitioned
+  \echo 'ohlcv is already partitioned; nothing to migrate.'
+  \quit
+\endif
+
+-- Installs the partition helpers; leaves a legacy ohlcv untouched.
+\ir ../create_schema.sql
+
+CREATE TABLE IF NOT EXISTS ohlcv_partitioned (
+  ts TIMESTAMP NOT NULL,
+  symbol_id INT NOT NULL REFERENCES symbols(id),
+  open DOUBLE PRECISION,
+  high DOUBLE PRECISION,
+  low DOUBLE PRECISION,
+  close DOUBLE PRECISION,
+  volume DOUBLE PRECISION,
+  PRIMARY KEY (symbol_id, ts)
+) PARTITION BY RANGE (ts);
+CREATE TABLE IF NOT EXISTS ohlcv_partitioned_default PARTITION OF ohlcv_partitioned DEFAULT;
+CREATE INDEX IF NOT EXISTS ohlcv_partitioned_ts_brin ON ohlcv_partitioned USING brin (ts);
+
+-- 1. Mirror live writes so nothing committed during the copy is lost.
+CREATE OR REPLACE FUNCTION ohlcv_mirror_to_partitioned() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    DELETE FROM ohlcv_partitioned WHERE symbol_id = OLD.symbol_id AND ts = OLD.ts;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO ohlcv_partitioned (ts, symbol_id, open, high, low, close, volume)
+    VALUES (NEW.ts, NEW.symbol_id, NEW.open, NEW.high, NEW.low, NEW.close, NEW.volume)
+    ON CONFLICT (symbol_id, ts) DO UPDATE SET
+      open = EXCLUDED.open,
+      high = EXCLUDED.high,
+      low = EXCLUDED.low,
+      close = EXCLUDED.close,
+      volume = EXCLUDED.volume;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+DROP TRIGGER IF EXISTS ohlcv_mirror ON ohlcv;
+CREATE TRIGGER ohlcv_mirror
+  AFTER INSERT OR UPDATE OR DELETE ON ohlcv
+  FOR EACH ROW EXECUTE FUNCTION ohlcv_mirror_to_partitioned();
+
+-- 2. Pre-create a partition for every month of history plus the usual headroom.
+SELECT ensure_monthly_partitions(
+  'ohlcv_partitioned',
+  COALESCE((SELECT min(ts) FROM ohlcv)::date, current_date),
+  GREATEST(COALESCE((SELECT max(ts) FROM ohlcv)::date, current_date), (current_date + interval '3 months')::date)
+);
+
+-- 3. Copy history one month per transaction. Rows already written by the
+--    trigger are newer and win (DO NOTHING). Rows deleted from ohlcv while a
+--    month was being copied are removed again by the anti-join.
+CREATE OR REPLACE PROCEDURE ohlcv_copy_to_partitioned() LANGUAGE plpgsql AS $$
+DECLARE
+  month_start timestamp;
+  last_ts timestamp;
+BEGIN
+  SELECT date_trunc('month', min(ts)), max(ts) INTO month_start, last_ts FROM ohlcv;
+  WHILE month_start IS NOT NULL AND month_start <= last_ts LOOP
+    INSERT INTO ohlcv_partitioned (ts, symbol_id, open, high, low, close, volume)
+    SELECT ts, symbol_id, open::float8, high::float8, low::float8, close::float8, volume::float8
+    FROM ohlcv
+    WHERE ts >= month_start AND ts < month_start + interval '1 month'
+    ON CONFLICT (symbol_id, ts) DO NOTHING;
+    DELETE FROM ohlcv_partitioned p
+    WHERE p.ts >= month_start AND p.ts < month_start + interval '1 month'
+      AND NOT EXISTS (SELECT 1 FROM ohlcv o WHERE o.symbol_id = p.symbol_id AND o.ts = p.ts);
+    COMMIT;
+    month_start := month_start + interval '1 month';
+  END LOOP;
+END;
+$$;
+CALL ohlcv_copy_to_partitioned();
+
+-- 4. Verify before swapping; rerun this script if a month does not match.
+DO $$
+DECLARE
+  mismatched text;
+BEGIN
+  SELECT string_agg(to_char(month, 'YYYY-MM'), ', ') INTO mismatched
+  FROM (
+    SELECT date_trunc('month', ts) AS month, count(*) AS n FROM ohlcv GROUP BY 1
+  ) legacy
+  FULL JOIN (
+    SELECT date_trunc('month', ts) AS month, count(*) AS n FROM ohlcv_partitioned GROUP BY 1
+  ) migrated USING (month)
+  WHERE legacy.n IS DISTINCT FROM migrated.n;
+  IF mismatched IS NOT NULL THEN
+    RAISE EXCEPTION 'ohlcv row counts differ for months: %', mismatched;
+  END IF;
+END;
+$$;
+
+-- 5. Swap under a short exclusive lock; the trigger kept both tables in step.
+BEGIN;
+LOCK TABLE ohlcv IN ACCESS EXCLUSIVE MODE;
+DROP TRIGGER ohlcv_mirror ON ohlcv;
+ALTER TABLE ohlcv RENAME TO ohlcv_legacy;
+ALTER TABLE ohlcv_legacy RENAME CONSTRAINT ohlcv_pkey TO ohlcv_legacy_pkey;
+ALTER TABLE ohlcv_partitioned RENAME TO ohlcv;
+ALTER TABLE ohlcv RENAME CONSTRAINT ohlcv_partitioned_pkey TO ohlcv_pkey;
+ALTER INDEX ohlcv_partitioned_ts_brin RENAME TO ohlcv_ts_brin;
+DO $$
+DECLARE
+  part record;
+BEGIN
+  -- Partition names must follow the parent for ensure_monthly_partitions.
+  FOR part IN
+    SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'ohlcv'::regclass
+  LOOP
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', part.relname, replace(part.relname, 'ohlcv_partitioned', 'ohlcv'));
+  END LOOP;
+END;
+$$;
+COMMIT;
+
+DROP PROCEDURE ohlcv_copy_to_partitioned();
+DROP FUNCTION ohlcv_mirror_to_partitioned();
+SELECT ohlcv_maintain_partitions();
+-- Once the new table is verified in production: DROP TABLE ohlcv_legacy;
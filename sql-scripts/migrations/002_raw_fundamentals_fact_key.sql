@@ -0,0 +1,25 @@
+-- Re-key raw_fundamentals on (symbol, metric, period_start, period_end, form).
+--
+--   psql "$DATABASE_URL" -f sql-scripts/migrations/002_raw_fundamentals_fact_key.sql
+--
+-- The old key (symbol, metric, period_end) merged a 10-Q's quarterly and
+-- year-to-date facts into one row. Rows loaded under the old key carry no
+-- period start or form and are removed with their change-data-capture store;
+-- the next fundamentals_ingestion run reloads every fact from companyfacts.
+\set ON_ERROR_STOP on
+
+DO $$
+BEGIN
+  IF to_regclass('raw_fundamentals') IS NULL THEN
+    RAISE NOTICE 'raw_fundamentals does not exist yet; nothing to migrate.';
+    RETURN;
+  END IF;
+  ALTER TABLE raw_fundamentals
+    ADD COLUMN IF NOT EXISTS period_start TEXT,
+    ADD COLUMN IF NOT EXISTS fiscal_period TEXT,
+    ADD COLUMN IF NOT EXISTS form TEXT;
+  DROP INDEX IF EXISTS ux_raw_fundamentals_symbol_metric_period_end;
+  DELETE FROM raw_fundamentals WHERE form IS NULL;
+  DROP TABLE IF EXISTS cdc_raw_fundamentals;
+END
+$$;